@@ -0,0 +1,322 @@
+# agenda_engine.py
+# SAL - Motor da agenda (sem Tk): modelo, leitura do grade.xlsx, AGORA/PRÓXIMAS e status de horários
+# Tudo recebe o "agora" como parâmetro (quem chama usa o clock.py) → o mesmo código serve
+# a UI (sal.py), o simulador (simulate.py) e testes/benchmarks sem display.
+# ✅ aula que vira a meia-noite (fim <= início → fim no dia seguinte)
+# ✅ dia da aula resolvido entre ontem/hoje/amanhã (aula de ontem 23:00–01:00 ainda é AGORA)
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, date as dt_date, time as dt_time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+
+
+NEXT_WINDOW_MIN = 120     # PRÓXIMAS = começam nas próximas 2h
+NEXT_PROGRESS_FLOOR = 0.02
+MAX_CARDS = 6             # por seção
+
+DAY_CODES = ("SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM")   # datetime.weekday()
+DAY_TO_WD = {code: i for i, code in enumerate(DAY_CODES)}
+
+THEME_DAY_FROM_H = 6      # tema claro de 06:00 até 17:59
+THEME_DAY_TO_H = 17
+
+
+# -------------------------
+# Data model
+# -------------------------
+
+@dataclass
+class ClassItem:
+    day: str          # SEG TER QUA QUI SEX SAB DOM
+    start: str        # HH:MM
+    end: str          # HH:MM
+    activity: str
+    teacher: str
+    location: str
+    tag: str          # MENOR/GERAL/...
+
+
+# -------------------------
+# Time parsing helpers (tolerante)
+# -------------------------
+
+def parse_hhmm(s: str) -> Optional[int]:
+    """
+    Aceita:
+    - "HH:MM"
+    - "HH:MM:SS"
+    """
+    try:
+        s = str(s).strip()
+        if not s:
+            return None
+        parts = s.split(":")
+        if len(parts) < 2:
+            return None
+        hh = int(parts[0])
+        mm = int(parts[1])
+        if 0 <= hh <= 23 and 0 <= mm <= 59:
+            return hh * 60 + mm
+        return None
+    except Exception:
+        return None
+
+
+def _parse_time_obj(s: str) -> Optional[dt_time]:
+    m = parse_hhmm(s)
+    if m is None:
+        return None
+    return dt_time(hour=m // 60, minute=m % 60)
+
+
+def fmt_hhmm(mins: Optional[int]) -> str:
+    if mins is None:
+        return "—"
+    hh = mins // 60
+    mm = mins % 60
+    if mm == 0:
+        return f"{hh:02d}H"
+    return f"{hh:02d}:{mm:02d}"
+
+
+def day_code(now: datetime) -> str:
+    return DAY_CODES[now.weekday()]
+
+
+def is_day_theme(now: datetime) -> bool:
+    return THEME_DAY_FROM_H <= now.hour <= THEME_DAY_TO_H
+
+
+# -------------------------
+# Horários de funcionamento
+# -------------------------
+
+# Fonte única: card de horários (HoursCard), perfil de energia (power.py) e simulador.
+HOURS_ITEMS = [
+    {
+        "name": "CLUBE",
+        "rules": {
+            "SEG": ("06:00", "22:00"),
+            "TER": ("06:00", "22:00"),
+            "QUA": ("06:00", "22:00"),
+            "QUI": ("06:00", "22:00"),
+            "SEX": ("06:00", "22:00"),
+            "SAB": ("08:00", "20:00"),
+            "DOM": ("09:00", "20:00"),
+        },
+        "lines": "SEG–QUI  6H–22H\nSEX      6H–22H\nSÁB      8H–20H\nDOM/FER  9H–20H",
+    },
+    {
+        "name": "SECRETARIA",
+        "rules": {
+            "SEG": ("08:00", "20:00"),
+            "TER": ("08:00", "20:00"),
+            "QUA": ("08:00", "20:00"),
+            "QUI": ("08:00", "20:00"),
+            "SEX": ("08:00", "20:00"),
+            "SAB": ("08:00", "20:00"),
+            "DOM": ("09:00", "20:00"),
+        },
+        "lines": "SEG–QUI  8H–20H\nSEX      8H–20H\nSÁB      8H–20H\nDOM/FER  9H–20H",
+    },
+    {
+        "name": "ACADEMIA",
+        "rules": {
+            "SEG": ("06:00", "21:30"),
+            "TER": ("06:00", "21:30"),
+            "QUA": ("06:00", "21:30"),
+            "QUI": ("06:00", "21:30"),
+            "SEX": ("06:00", "21:00"),
+            "SAB": ("08:00", "12:00"),
+            "DOM": (None, None),
+        },
+        "lines": "SEG–QUI  06:00–21:30\nSEX      06:00–21:00\nSÁB      08:00–12:00\nDOM      FECHADO",
+    }
+]
+
+
+def hours_status(item: dict, now: datetime) -> Tuple[bool, Optional[int], Optional[int]]:
+    """(aberto?, abertura_min, fechamento_min) do item de HOURS_ITEMS no dia de now."""
+    open_s, close_s = item["rules"].get(day_code(now), (None, None))
+    open_m = parse_hhmm(open_s) if open_s else None
+    close_m = parse_hhmm(close_s) if close_s else None
+    if open_m is None or close_m is None:
+        return False, open_m, close_m
+    now_min = now.hour * 60 + now.minute
+    return open_m <= now_min < close_m, open_m, close_m
+
+
+def hours_labels(item: dict, now: datetime) -> Tuple[bool, str, str]:
+    """(aberto?, status, linha de baixo) como aparecem no card: "ABERTO AGORA" / "FECHA ÀS 22H"."""
+    is_open, open_m, close_m = hours_status(item, now)
+    if is_open:
+        return True, "ABERTO AGORA", f"FECHA ÀS {fmt_hhmm(close_m)}"
+    if open_m is not None:
+        return False, "FECHADO AGORA", f"ABRE ÀS {fmt_hhmm(open_m)}"
+    return False, "FECHADO AGORA", "SEM ATENDIMENTO"
+
+
+# -------------------------
+# Excel read
+# -------------------------
+
+SHEET_NAME = "SAL"
+EXPECTED_HEADERS = ["DIA", "INICIO", "FIM", "ATIVIDADE", "PROFESSOR", "LOCAL", "TAG"]
+
+
+def _normalize_header(v: object) -> str:
+    return str(v or "").strip().upper()
+
+
+def load_classes_from_excel(path: str) -> List[ClassItem]:
+    wb = load_workbook(path, data_only=True)
+    if SHEET_NAME not in wb.sheetnames:
+        raise RuntimeError(f"Aba '{SHEET_NAME}' não encontrada.")
+    ws = wb[SHEET_NAME]
+
+    header_row = None
+    headers: List[str] = []
+    for r in range(1, 6):
+        vals = [_normalize_header(ws.cell(row=r, column=c).value) for c in range(1, 30)]
+        if "DIA" in vals and "INICIO" in vals and "FIM" in vals:
+            header_row = r
+            headers = vals
+            break
+    if header_row is None:
+        header_row = 1
+        headers = [_normalize_header(ws.cell(row=1, column=c).value) for c in range(1, 30)]
+
+    def col_idx(name: str) -> Optional[int]:
+        name = name.upper()
+        if name in headers:
+            return headers.index(name) + 1
+        return None
+
+    c_dia = col_idx("DIA")
+    c_ini = col_idx("INICIO")
+    c_fim = col_idx("FIM")
+    c_ativ = col_idx("ATIVIDADE")
+    c_prof = col_idx("PROFESSOR")
+    c_loc = col_idx("LOCAL")
+    c_tag = col_idx("TAG")
+
+    if not (c_dia and c_ini and c_fim and c_ativ):
+        raise RuntimeError("Cabeçalhos necessários não encontrados na aba SAL.")
+
+    items: List[ClassItem] = []
+    for r in range(header_row + 1, ws.max_row + 1):
+        dia = str(ws.cell(row=r, column=c_dia).value or "").strip().upper()
+        ini = str(ws.cell(row=r, column=c_ini).value or "").strip()
+        fim = str(ws.cell(row=r, column=c_fim).value or "").strip()
+        ativ = str(ws.cell(row=r, column=c_ativ).value or "").strip()
+
+        if not dia or not ini or not fim or not ativ:
+            continue
+
+        prof = str(ws.cell(row=r, column=c_prof).value or "").strip() if c_prof else ""
+        loc = str(ws.cell(row=r, column=c_loc).value or "").strip() if c_loc else ""
+        tag = str(ws.cell(row=r, column=c_tag).value or "").strip().upper() if c_tag else ""
+
+        items.append(ClassItem(dia, ini, fim, ativ, prof, loc, tag))
+
+    return items
+
+
+# -------------------------
+# Day mapping + midnight-safe datetime placement
+# -------------------------
+
+def _best_date_for_daycode(now: datetime, day_code: str) -> Optional[dt_date]:
+    dc = (day_code or "").strip().upper()
+    if dc not in DAY_TO_WD:
+        return None
+    target_wd = DAY_TO_WD[dc]
+    candidates = [now.date() - timedelta(days=1), now.date(), now.date() + timedelta(days=1)]
+    for d in candidates:
+        if d.weekday() == target_wd:
+            return d
+    return now.date()
+
+
+def _item_interval_debug(now: datetime, it: ClassItem) -> Tuple[Optional[Tuple[datetime, datetime]], str]:
+    base_date = _best_date_for_daycode(now, it.day)
+    if base_date is None:
+        return None, "invalid_day"
+
+    t_start = _parse_time_obj(it.start)
+    t_end = _parse_time_obj(it.end)
+    if t_start is None or t_end is None:
+        return None, "invalid_time"
+
+    start_dt = datetime.combine(base_date, t_start)
+    end_dt = datetime.combine(base_date, t_end)
+
+    if end_dt <= start_dt:
+        end_dt = end_dt + timedelta(days=1)
+
+    return (start_dt, end_dt), "ok"
+
+
+# -------------------------
+# AGORA / PRÓXIMAS
+# -------------------------
+
+def compute_now_next(items: Sequence[ClassItem], now_dt: datetime,
+                     window_min: int = NEXT_WINDOW_MIN,
+                     limit: int = MAX_CARDS) -> Tuple[List[Tuple], List[Tuple], Dict[str, int]]:
+    """
+    → (agora, próximas, descartes)
+    Cada card: (start, end, activity, teacher, location, tag, progress, track)
+    track = (t0, t1, floor) em epoch (barra anda sozinha pelo relógio no ProgressAnimator):
+    - AGORA: (início, fim, 0.0)
+    - PRÓXIMAS: (início - janela, início, NEXT_PROGRESS_FLOOR)
+    descartes = {"invalid_day": n, "invalid_time": n, "other": n}
+    """
+    window_end = now_dt + timedelta(minutes=window_min)
+
+    now_list = []
+    next_list = []
+    discards = {"invalid_day": 0, "invalid_time": 0, "other": 0}
+
+    for it in items:
+        interval, reason = _item_interval_debug(now_dt, it)
+        if not interval:
+            discards[reason if reason in discards else "other"] += 1
+            continue
+
+        start_dt, end_dt = interval
+
+        if start_dt <= now_dt < end_dt:
+            total = (end_dt - start_dt).total_seconds()
+            done = (now_dt - start_dt).total_seconds()
+            progress = 0.0 if total <= 0 else max(0.0, min(1.0, done / total))
+            track = (start_dt.timestamp(), end_dt.timestamp(), 0.0)
+            now_list.append((it.start, it.end, it.activity, it.teacher, it.location, it.tag,
+                             progress, track, end_dt, start_dt))
+
+        elif now_dt <= start_dt <= window_end:
+            total_win = (window_end - now_dt).total_seconds()
+            remaining = (start_dt - now_dt).total_seconds()
+            if total_win <= 0:
+                progress_next = 0.0
+            else:
+                progress_next = 1.0 - (remaining / total_win)
+                progress_next = max(0.0, min(1.0, progress_next))
+
+            progress_next = max(NEXT_PROGRESS_FLOOR, progress_next)
+            # mesma conta como reta no tempo: 0 em (início - janela), 1 no início
+            track = ((start_dt - timedelta(minutes=window_min)).timestamp(), start_dt.timestamp(),
+                     NEXT_PROGRESS_FLOOR)
+            next_list.append((it.start, it.end, it.activity, it.teacher, it.location, it.tag,
+                              progress_next, track, end_dt, start_dt))
+
+    now_list.sort(key=lambda t: t[8])   # end_dt
+    next_list.sort(key=lambda t: t[9])  # start_dt
+
+    now_cards = [t[:8] for t in now_list]
+    next_cards = [t[:8] for t in next_list]
+    return now_cards[:limit], next_cards[:limit], discards
@@ -0,0 +1,316 @@
+# assets.py
+# SAL - Gerenciador de imagens (graphics/)
+# - indexa graphics/ 1x por processo (nada de os.path.exists a cada chamada)
+# - variantes no tamanho EXATO pedido (Pillow, Lanczos), sem subsample inteiro
+# - cache em disco: <sha1 da origem>_<w>x<h>.png → boot e troca de tema não decodificam/reamostram nada
+# - cache em memória das PhotoImage já criadas
+# Tamanho exato depende do Pillow (requirements.txt). Sem Pillow: variante já no cache em disco, ou o
+# subsample inteiro antigo do Tk (nada de reamostragem em Python puro na thread da UI nem em fundo);
+# o preload do boot loga 1 aviso [ASSET] para achar quiosques degradados.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image  # type: ignore  # requirements.txt: variantes no tamanho exato (Lanczos)
+except Exception:
+    Image = None
+
+
+ASSET_CACHE_DIRNAME = "asset_cache"
+ASSET_INDEX_FILENAME = "asset_index.json"
+ASSET_EXTS = (".png", ".gif", ".ppm", ".pgm")
+
+_PNG_SIG = b"\x89PNG\r\n\x1a\n"
+
+
+# -------------------------
+# PNG (cabeçalho)
+# -------------------------
+
+def png_size(path: str) -> Optional[Tuple[int, int]]:
+    """Largura/altura lendo só o cabeçalho IHDR."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(24)
+        if head[:8] != _PNG_SIG or head[12:16] != b"IHDR":
+            return None
+        return struct.unpack(">II", head[16:24])
+    except Exception:
+        return None
+
+
+def fit_box(sw: int, sh: int, bw: int, bh: int) -> Tuple[int, int]:
+    """Maior tamanho que cabe em bw x bh mantendo a proporção (nunca amplia)."""
+    scale = min(bw / float(sw), bh / float(sh), 1.0)
+    return max(1, int(round(sw * scale))), max(1, int(round(sh * scale)))
+
+
+# -------------------------
+# Asset manager
+# -------------------------
+
+class AssetManager:
+    """
+    path(*bases)              → 1º arquivo existente (índice em memória)
+    cached_path(base, box)    → variante no tamanho exato, se já estiver no disco
+    resized_path(base, box)   → idem, gerando (síncrono, Pillow) se faltar
+    photo(master, base, box)  → PhotoImage (cache em memória; só a thread do Tk chama)
+    preload(master, specs)    → aquece o cache no boot
+    warm(specs)               → gera variantes em fundo (thread; não toca no Tk; só com Pillow)
+    """
+
+    def __init__(self, graphics_dir: str, cache_root: str, logger=None):
+        self.graphics_dir = graphics_dir
+        self.cache_dir = os.path.join(cache_root, ASSET_CACHE_DIRNAME)
+        self.logger = logger
+
+        self._index: Optional[Dict[str, str]] = None       # "sun" / "sun.png" → caminho
+        self._hashes: Dict[str, str] = {}                  # caminho → sha1 (hex)
+        self._photos: Dict[Tuple[str, int, int], Tuple[object, bool]] = {}   # key → (img, exato?)
+        self._lock = threading.Lock()
+
+        self._warm_queue: List[Tuple[str, Tuple[int, int]]] = []
+        self._warm_thread: Optional[threading.Thread] = None
+        self.generation = 0        # +1 a cada variante gerada em fundo (a UI recarrega ao ver mudar)
+
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.mem_hits = 0
+        self._warned_no_pil = False
+
+    # ---- índice ----
+
+    def index(self) -> Dict[str, str]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index()
+            return self._index
+
+    def _build_index(self) -> Dict[str, str]:
+        idx: Dict[str, str] = {}
+        try:
+            names = sorted(os.listdir(self.graphics_dir))
+        except Exception:
+            names = []
+        for name in names:
+            root, ext = os.path.splitext(name)
+            if ext.lower() not in ASSET_EXTS:
+                continue
+            p = os.path.join(self.graphics_dir, name)
+            idx[name] = p
+            if ext.lower() == ".png" or root not in idx:
+                idx[root] = p   # "sun" → sun.png (PNG tem prioridade sobre sun.gif)
+        self._load_hashes(idx)
+        return idx
+
+    def _index_file(self) -> str:
+        return os.path.join(self.cache_dir, ASSET_INDEX_FILENAME)
+
+    def _load_hashes(self, idx: Dict[str, str]) -> None:
+        """sha1 por arquivo; reaproveita o salvo se tamanho+mtime não mudaram (não relê as imagens)."""
+        try:
+            with open(self._index_file(), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except Exception:
+            saved = {}
+
+        fresh: Dict[str, dict] = {}
+        for p in sorted(set(idx.values())):
+            try:
+                st = os.stat(p)
+            except Exception:
+                continue
+            name = os.path.basename(p)
+            prev = saved.get(name) or {}
+            if prev.get("size") == st.st_size and prev.get("mtime") == int(st.st_mtime) and prev.get("sha1"):
+                digest = prev["sha1"]
+            else:
+                try:
+                    with open(p, "rb") as f:
+                        digest = hashlib.sha1(f.read()).hexdigest()
+                except Exception:
+                    continue
+            self._hashes[p] = digest
+            fresh[name] = {"size": st.st_size, "mtime": int(st.st_mtime), "sha1": digest}
+
+        if fresh != saved:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = self._index_file() + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(fresh, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self._index_file())
+            except Exception:
+                pass
+
+    def path(self, *bases: str) -> Optional[str]:
+        idx = self.index()
+        for base in bases:
+            p = idx.get(base)
+            if p:
+                return p
+        return None
+
+    # ---- variantes redimensionadas ----
+
+    def target_size(self, src: str, box: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        size = png_size(src)
+        if size is None:
+            return None
+        return fit_box(size[0], size[1], box[0], box[1])
+
+    def cached_path(self, base: str, box: Tuple[int, int]) -> Optional[str]:
+        """Variante já no disco (não gera nada)."""
+        out = self._variant_path(base, box)
+        return out if out and os.path.exists(out) else None
+
+    def _variant_path(self, base: str, box: Tuple[int, int]) -> Optional[str]:
+        src = self.path(base)
+        if not src:
+            return None
+        digest = self._hashes.get(src)
+        tsize = self.target_size(src, box)
+        if not digest or tsize is None:
+            return None
+        return os.path.join(self.cache_dir, f"{digest[:16]}_{tsize[0]}x{tsize[1]}.png")
+
+    def resized_path(self, base: str, box: Tuple[int, int]) -> Optional[str]:
+        """Variante no disco; gera (síncrono) se faltar. Sem Pillow → só o que já estiver no disco."""
+        out = self._variant_path(base, box)
+        if not out:
+            return None
+        if os.path.exists(out):
+            self.disk_hits += 1
+            return out
+        if Image is None:
+            return None
+
+        src = self.path(base)
+        tw, th = self.target_size(src, box)
+        self.disk_misses += 1
+        t0 = time.perf_counter()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with Image.open(src) as im:
+                im = im.convert("RGBA").resize((tw, th), Image.LANCZOS)
+                tmp = out + ".tmp"
+                im.save(tmp, format="PNG")
+                os.replace(tmp, out)
+        except Exception as e:
+            if self.logger:
+                self.logger(f"[ASSET] Resize error base={base} {type(e).__name__}: {e}")
+            return None
+
+        if self.logger:
+            self.logger(f"[ASSET] Resized base={base} size={tw}x{th} "
+                        f"ms={(time.perf_counter() - t0) * 1000.0:.0f}")
+        return out
+
+    # ---- PhotoImage ----
+
+    def photo(self, master, base: str, box: Tuple[int, int], fallbacks: Iterable[str] = ()):
+        """
+        PhotoImage de base (ou do 1º fallback existente) cabendo em box; None se nada existir.
+        Variante ainda não gerada e sem Pillow → subsample inteiro (caminho antigo).
+        """
+        import tkinter as tk
+
+        for name in (base,) + tuple(fallbacks):
+            if not self.path(name):
+                continue
+            key = (name, int(box[0]), int(box[1]))
+            hit = self._photos.get(key)
+            if hit is not None and hit[1]:
+                self.mem_hits += 1
+                return hit[0]
+            try:
+                p = self.cached_path(name, box)
+                if p is None and Image is not None:
+                    p = self.resized_path(name, box)   # Pillow: rápido o bastante para a thread do Tk
+                if p:
+                    img, exact = tk.PhotoImage(master=master, file=p), True
+                elif hit is not None:
+                    return hit[0]                      # subsample já carregado
+                else:
+                    img, exact = self._subsample_fallback(master, self.path(name), box), False
+            except Exception as e:
+                if self.logger:
+                    self.logger(f"[ASSET] Load error base={name} {type(e).__name__}: {e}")
+                continue
+            self._photos[key] = (img, exact)
+            return img
+        return None
+
+    @staticmethod
+    def _subsample_fallback(master, path: str, box: Tuple[int, int]):
+        """Sem Pillow (ou formato sem tamanho no IHDR): caminho antigo (subsample inteiro)."""
+        import tkinter as tk
+        img = tk.PhotoImage(master=master, file=path)
+        factor = max(1, -(-img.width() // max(1, box[0])), -(-img.height() // max(1, box[1])))
+        return img.subsample(factor, factor) if factor > 1 else img
+
+    def preload(self, master, specs: Iterable[Tuple[str, Tuple[int, int]]]) -> None:
+        """Boot: cria já as PhotoImage de specs = [(base, box), ...] (thread do Tk)."""
+        if Image is None and not self._warned_no_pil:
+            self._warned_no_pil = True
+            if self.logger:
+                self.logger("[ASSET] WARN Pillow not installed → exact-size variants off "
+                            "(Tk subsample fallback); pip install -r requirements.txt")
+        t0 = time.perf_counter()
+        n = sum(1 for base, box in specs if self.photo(master, base, box) is not None)
+        if self.logger:
+            self.logger(f"[ASSET] Preload n={n} ms={(time.perf_counter() - t0) * 1000.0:.0f} "
+                        f"disk_hits={self.disk_hits} disk_misses={self.disk_misses}")
+
+    def warm(self, specs: Iterable[Tuple[str, Tuple[int, int]]]) -> None:
+        """Gera variantes no disco numa thread de fundo (sem Tk: só arquivos). Sem Pillow: nada."""
+        if Image is None:
+            return
+        with self._lock:
+            for spec in specs:
+                if spec not in self._warm_queue:
+                    self._warm_queue.append(spec)
+            if self._warm_thread is not None and self._warm_thread.is_alive():
+                return
+            self._warm_thread = threading.Thread(target=self._warm_worker, name="sal-assets", daemon=True)
+            self._warm_thread.start()
+
+    def _warm_worker(self) -> None:
+        while True:
+            with self._lock:
+                if not self._warm_queue:
+                    return
+                base, box = self._warm_queue.pop(0)
+            if self.cached_path(base, box) is None and self.resized_path(base, box):
+                self.generation += 1
+
+    def prune(self) -> int:
+        """Apaga variantes cujo arquivo de origem mudou/sumiu (hash não está mais no índice)."""
+        self.index()
+        live = {h[:16] for h in self._hashes.values()}
+        removed = 0
+        try:
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".png"):
+                    continue
+                if name.split("_", 1)[0] not in live:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                        removed += 1
+                    except Exception:
+                        pass
+        except Exception:
+            pass
+        return removed
+
+    def stats(self) -> dict:
+        return {"indexed": len(self.index()), "photos": len(self._photos),
+                "mem_hits": self.mem_hits, "disk_hits": self.disk_hits, "disk_misses": self.disk_misses}
@@ -0,0 +1,97 @@
+# clock.py
+# SAL - Relógio injetável
+# O que depende de "agora" (cabeçalho, tema, AGORA/PRÓXIMAS, horários, energia, barras)
+# pergunta aqui em vez de chamar datetime.now()/time.time() direto:
+# - SystemClock  → relógio real (padrão)
+# - ManualClock  → parado num instante; set()/advance() (headless, simulação)
+# - OffsetClock  → relógio real deslocado (SAL_FAKE_NOW="2026-03-02T07:30" → teste manual na tela)
+# Logs, caches e timeouts continuam no relógio real (time.time()/perf_counter()).
+
+from __future__ import annotations
+
+import os
+import time as _time
+from datetime import datetime
+from typing import Union
+
+
+When = Union[float, int, datetime, str]
+
+
+def to_ts(when: When) -> float:
+    """epoch (s) a partir de epoch, datetime local ou 'YYYY-MM-DDTHH:MM[:SS]'."""
+    if isinstance(when, datetime):
+        return when.timestamp()
+    if isinstance(when, str):
+        return datetime.fromisoformat(when.strip()).timestamp()
+    return float(when)
+
+
+class SystemClock:
+    name = "system"
+
+    def time(self) -> float:
+        return _time.time()
+
+
+class ManualClock(SystemClock):
+    """Parado até alguém mover (set/advance)."""
+    name = "manual"
+
+    def __init__(self, start: When):
+        self._t = to_ts(start)
+
+    def time(self) -> float:
+        return self._t
+
+    def set(self, when: When) -> None:
+        self._t = to_ts(when)
+
+    def advance(self, seconds: float) -> None:
+        self._t += float(seconds)
+
+
+class OffsetClock(SystemClock):
+    """Relógio real começando em start (o tempo continua andando)."""
+    name = "offset"
+
+    def __init__(self, start: When):
+        self.offset = to_ts(start) - _time.time()
+
+    def time(self) -> float:
+        return _time.time() + self.offset
+
+
+_current: SystemClock = SystemClock()
+
+
+def install(clock: SystemClock) -> SystemClock:
+    """Troca o relógio global; devolve o anterior (para restaurar)."""
+    global _current
+    prev = _current
+    _current = clock
+    return prev
+
+
+def get() -> SystemClock:
+    return _current
+
+
+def time() -> float:
+    return _current.time()
+
+
+def now() -> datetime:
+    return datetime.fromtimestamp(_current.time())
+
+
+def localtime() -> _time.struct_time:
+    return _time.localtime(_current.time())
+
+
+_fake = os.environ.get("SAL_FAKE_NOW", "").strip()
+if _fake:
+    try:
+        install(OffsetClock(_fake))
+    except Exception:
+        pass
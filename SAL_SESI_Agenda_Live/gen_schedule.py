@@ -0,0 +1,177 @@
+# gen_schedule.py
+# SAL - Gerador de grade.xlsx sintética (teste de escala / benchmarks)
+# Mesmo layout da aba SAL: DIA | INICIO | FIM | ATIVIDADE | PROFESSOR | LOCAL | TAG
+# - determinístico por seed (mesmos parâmetros → mesmo arquivo, byte a byte)
+# - write_only do openpyxl: linhas vão direto para o disco (100k+ linhas sem estourar memória)
+# - parâmetros: linhas, unidades, locais, professores, % de aulas que viram a meia-noite,
+#   % de linhas malformadas (dia/hora inválidos, célula vazia) e deslocamento do cabeçalho
+# O app só lê .xlsx (agenda_engine.load_classes_from_excel) → é o único formato gerado.
+#
+# Uso:
+#   python gen_schedule.py --rows 5000 --out grade_5k.xlsx
+#   python gen_schedule.py --rows 200000 --venues 4 --locations 30 --teachers 120 \
+#       --midnight 0.02 --malformed 0.01 --header-offset 2 --seed 42 --out grade_200k.xlsx
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from agenda_engine import DAY_CODES, EXPECTED_HEADERS, SHEET_NAME
+
+
+GEN_FIXED_TS = datetime(2026, 1, 1, 0, 0, 0)     # docProps/zip: sem data real → bytes estáveis
+ZIP_FIXED_DATE = (2026, 1, 1, 0, 0, 0)
+_MODIFIED_RE = re.compile(rb"(<dcterms:modified[^>]*>)[^<]*(</dcterms:modified>)")
+
+ACTIVITIES = (
+    "NATAÇÃO", "HIDROGINÁSTICA", "MUSCULAÇÃO", "PILATES", "FUNCIONAL", "JUDÔ", "KARATÊ",
+    "BALLET", "DANÇA DE SALÃO", "ZUMBA", "VÔLEI", "FUTSAL", "BASQUETE", "GINÁSTICA RÍTMICA",
+    "YOGA", "ALONGAMENTO", "TÊNIS", "CIRCUITO", "SPINNING", "RECREAÇÃO",
+)
+LEVELS = ("INICIANTE", "INTERMEDIÁRIO", "AVANÇADO", "INFANTIL", "ADULTO", "TERCEIRA IDADE")
+FIRST_NAMES = (
+    "Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Isabela", "João",
+    "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Paulo", "Queila", "Rafael", "Sofia", "Tiago",
+)
+LAST_NAMES = ("Silva", "Souza", "Costa", "Oliveira", "Pereira", "Lima", "Gomes", "Ribeiro", "Almeida", "Rocha")
+ROOMS = ("PISCINA", "SALA", "QUADRA", "TATAME", "ESTÚDIO", "ACADEMIA", "GINÁSIO")
+TAGS = ("GERAL", "MENOR")
+DURATIONS = (45, 50, 60, 60, 60, 90)
+MIDNIGHT_DURATIONS = (60, 90, 120)
+
+
+@dataclass
+class GenSpec:
+    rows: int = 1000
+    venues: int = 1
+    locations: int = 12
+    teachers: int = 40
+    midnight: float = 0.0         # fração de aulas que terminam depois da meia-noite
+    malformed: float = 0.0        # fração de linhas inválidas
+    header_offset: int = 0        # linhas antes do cabeçalho (o leitor procura nas linhas 1..5)
+    seed: int = 1
+
+
+def _fmt(m: int) -> str:
+    m %= 24 * 60
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def generate_rows(spec: GenSpec) -> Iterator[List[Optional[str]]]:
+    """Linhas de dados (sem cabeçalho), em ordem estável para o mesmo seed."""
+    rnd = random.Random(spec.seed)
+    teachers = [f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+                + (f" {i // (len(FIRST_NAMES) * len(LAST_NAMES)) + 1}" if i >= len(FIRST_NAMES) * len(LAST_NAMES) else "")
+                for i in range(max(1, spec.teachers))]
+    locations = [f"{ROOMS[i % len(ROOMS)]} {i // len(ROOMS) + 1}" for i in range(max(1, spec.locations))]
+    venues = [f"UNIDADE {i + 1}" for i in range(max(1, spec.venues))]
+
+    for _ in range(spec.rows):
+        day = rnd.choice(DAY_CODES)
+        if spec.midnight > 0 and rnd.random() < spec.midnight:
+            dur = rnd.choice(MIDNIGHT_DURATIONS)
+            # início em [24h - dur + 15min, 23:45] → fim sempre depois de 00:00 (fim < início na planilha)
+            start = rnd.randrange(24 * 60 - dur + 15, 23 * 60 + 46, 15)
+            end = start + dur
+        else:
+            start = rnd.randrange(6 * 60, 21 * 60 + 1, 15)          # 06:00–21:00
+            end = start + rnd.choice(DURATIONS)
+        activity = f"{rnd.choice(ACTIVITIES)} {rnd.choice(LEVELS)}"
+        teacher = rnd.choice(teachers)
+        location = rnd.choice(locations)
+        if len(venues) > 1:
+            location = f"{rnd.choice(venues)} - {location}"
+        tag = TAGS[1] if "INFANTIL" in activity else rnd.choice(TAGS)
+        row: List[Optional[str]] = [day, _fmt(start), _fmt(end), activity, teacher, location, tag]
+
+        if spec.malformed > 0 and rnd.random() < spec.malformed:
+            kind = rnd.randrange(5)
+            if kind == 0:
+                row[0] = rnd.choice(("XYZ", "SEGUNDA", "S3G"))       # dia inválido
+            elif kind == 1:
+                row[1] = rnd.choice(("25:00", "7h", "abc"))          # início inválido
+            elif kind == 2:
+                row[2] = rnd.choice(("", "99:99"))                   # fim vazio/inválido
+            elif kind == 3:
+                row[3] = None                                        # sem atividade (linha ignorada)
+            else:
+                row[0] = row[0].lower() + " "                        # só formatação (o leitor normaliza)
+        yield row
+
+
+def write_schedule(path: str, spec: GenSpec) -> int:
+    """Grava o .xlsx em modo streaming; devolve o nº de linhas de dados."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    wb.properties.creator = "gen_schedule"
+    wb.properties.created = GEN_FIXED_TS
+    ws = wb.create_sheet(SHEET_NAME)
+
+    for i in range(max(0, spec.header_offset)):
+        ws.append([f"GRADE SINTÉTICA seed={spec.seed} rows={spec.rows}"] if i == 0 else [])
+    ws.append(list(EXPECTED_HEADERS))
+    n = 0
+    for row in generate_rows(spec):
+        ws.append(row)
+        n += 1
+
+    tmp = path + ".tmp"
+    wb.save(tmp)
+    _normalize_zip(tmp, path)
+    os.remove(tmp)
+    return n
+
+
+def _normalize_zip(src: str, dst: str) -> None:
+    """Regrava o zip com data fixa nas entradas e no docProps (o openpyxl carimba a hora do save)."""
+    stamp = GEN_FIXED_TS.strftime("%Y-%m-%dT%H:%M:%SZ").encode("ascii")
+    with zipfile.ZipFile(src, "r") as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info.filename)
+            if info.filename == "docProps/core.xml":
+                data = _MODIFIED_RE.sub(lambda m: m.group(1) + stamp + m.group(2), data)
+            fixed = zipfile.ZipInfo(info.filename, date_time=ZIP_FIXED_DATE)
+            fixed.compress_type = zipfile.ZIP_DEFLATED
+            fixed.external_attr = info.external_attr
+            zout.writestr(fixed, data)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Gera grade.xlsx sintética (aba SAL)")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--rows", type=int, default=1000)
+    ap.add_argument("--venues", type=int, default=1, help="unidades (prefixo no LOCAL quando > 1)")
+    ap.add_argument("--locations", type=int, default=12)
+    ap.add_argument("--teachers", type=int, default=40)
+    ap.add_argument("--midnight", type=float, default=0.0, help="fração que vira a meia-noite (0..1)")
+    ap.add_argument("--malformed", type=float, default=0.0, help="fração de linhas inválidas (0..1)")
+    ap.add_argument("--header-offset", type=int, default=0, help="linhas antes do cabeçalho (leitor: até 4)")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    spec = GenSpec(rows=args.rows, venues=args.venues, locations=args.locations, teachers=args.teachers,
+                   midnight=args.midnight, malformed=args.malformed,
+                   header_offset=args.header_offset, seed=args.seed)
+    if spec.header_offset > 4:
+        print(f"aviso: header-offset={spec.header_offset} > 4 — o app só procura o cabeçalho nas linhas 1..5",
+              file=sys.stderr)
+
+    t0 = time.perf_counter()
+    n = write_schedule(args.out, spec)
+    ms = (time.perf_counter() - t0) * 1000.0
+    print(f"out={args.out} rows={n} bytes={os.path.getsize(args.out)} ms={ms:.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
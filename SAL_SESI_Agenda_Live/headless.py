@@ -0,0 +1,419 @@
+# headless.py
+# SAL - Modo headless: roda o SALApp num display virtual (Xvfb), com relógio injetado,
+# e grava snapshots + tempos de tick para detectar regressões de layout e de desempenho.
+# Por instante pedido (--at):
+# - layout.json : árvore de widgets (classe, geometria, texto) + itens dos canvases → diff exato
+# - *.ps        : PostScript de cada canvas visível (Tk puro, sem ferramenta externa)
+# - screen.png  : screenshot do display (Pillow ImageGrab, ou `import`/`xwd` se existirem)
+# Depois roda N ticks com o relógio avançando 1s e mede tick/commit (FrameMonitor) e CPU.
+# --baseline DIR compara com uma execução anterior (layout diferente / p95 acima do limite → exit 1).
+# DATA_DIR vai para uma pasta temporária (LOCALAPPDATA redirecionado antes do import do sal) e o
+# watchdog é desligado após o boot: o harness não mexe no hang.log/state.json do quiosque.
+# Sem --weather não há rede nenhuma (nem o prefetch de DNS do boot): snapshots reproduzíveis.
+#
+# Uso (Linux):
+#   python headless.py --out /tmp/sal_snap
+#   python headless.py --at 2026-03-02T07:30 --at 2026-03-02T19:10 --size 1920x1080 --ticks 300
+#   python headless.py --out /tmp/new --baseline /tmp/sal_snap --threshold 0.25
+# No Windows (sem Xvfb) usa o display real numa janela do tamanho pedido.
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import clock as clock_mod
+from perfmon import TICK_PHASES
+from perfstats import summarize
+
+
+HEADLESS_SETTLE_S = 0.4          # deixa os debounces (_layout 33ms) e o after_idle rodarem
+HEADLESS_XVFB_WAIT_S = 5.0
+HEADLESS_DISPLAY_FIRST = 99
+PERF_THRESHOLD = 0.25            # p95 do tick pode piorar até 25% (e +1ms) antes de acusar
+PERF_ABS_SLACK_MS = 1.0
+
+DEFAULT_TIMES = ("07:30", "12:00", "19:30", "23:30")   # manhã, tarde, noite (tema), fechado
+
+
+# -------------------------
+# Display virtual
+# -------------------------
+
+def _free_display() -> int:
+    n = HEADLESS_DISPLAY_FIRST
+    while os.path.exists(f"/tmp/.X{n}-lock") or os.path.exists(f"/tmp/.X11-unix/X{n}"):
+        n += 1
+    return n
+
+
+def ensure_display(size: Tuple[int, int], force_xvfb: bool = False) -> Optional[subprocess.Popen]:
+    """Sobe um Xvfb do tamanho pedido se não houver DISPLAY (ou se forçado). None = usa o display atual."""
+    if sys.platform.startswith("win") or sys.platform == "darwin":
+        return None
+    if os.environ.get("DISPLAY") and not force_xvfb:
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("sem DISPLAY e Xvfb não encontrado (apt install xvfb)")
+
+    n = _free_display()
+    proc = subprocess.Popen(
+        [xvfb, f":{n}", "-screen", "0", f"{size[0]}x{size[1]}x24", "-nolisten", "tcp", "-dpi", "96"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    atexit.register(_stop_proc, proc)
+
+    deadline = time.monotonic() + HEADLESS_XVFB_WAIT_S
+    while time.monotonic() < deadline:
+        if os.path.exists(f"/tmp/.X11-unix/X{n}"):
+            break
+        if proc.poll() is not None:
+            raise RuntimeError(f"Xvfb saiu com código {proc.returncode}")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{n}"
+    return proc
+
+
+def _stop_proc(proc: subprocess.Popen) -> None:
+    try:
+        proc.terminate()
+        proc.wait(timeout=3)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+
+def _text_of(w) -> Optional[str]:
+    try:
+        return str(w.cget("text"))
+    except Exception:
+        return None
+
+
+def dump_layout(root) -> List[Dict[str, Any]]:
+    """Lista plana (ordem da árvore) com geometria absoluta; canvases incluem os itens visíveis."""
+    out: List[Dict[str, Any]] = []
+
+    def walk(w) -> None:
+        try:
+            mapped = bool(w.winfo_ismapped())
+        except Exception:
+            return
+        ent: Dict[str, Any] = {
+            "path": str(w),
+            "class": w.winfo_class(),
+            "mapped": mapped,
+            "geom": [w.winfo_rootx(), w.winfo_rooty(), w.winfo_width(), w.winfo_height()] if mapped else None,
+        }
+        text = _text_of(w)
+        if text:
+            ent["text"] = text
+        if ent["class"] == "Canvas" and mapped:
+            items = []
+            for item in w.find_all():
+                if w.itemcget(item, "state") == "hidden":
+                    continue
+                kind = w.type(item)
+                it: Dict[str, Any] = {"type": kind, "bbox": list(w.bbox(item) or ())}
+                if kind == "text":
+                    it["text"] = w.itemcget(item, "text")
+                    it["font"] = w.itemcget(item, "font")
+                items.append(it)
+            ent["items"] = items
+        out.append(ent)
+        for child in w.winfo_children():
+            walk(child)
+
+    walk(root)
+    return out
+
+
+def dump_postscript(root, out_dir: str) -> List[str]:
+    files = []
+
+    def walk(w) -> None:
+        for child in w.winfo_children():
+            if child.winfo_class() == "Canvas" and child.winfo_ismapped():
+                name = str(child).strip(".").replace(".", "_").replace("!", "") or "root"
+                p = os.path.join(out_dir, f"{name}.ps")
+                try:
+                    child.postscript(file=p, colormode="color")
+                    files.append(p)
+                except Exception:
+                    pass
+            walk(child)
+
+    walk(root)
+    return files
+
+
+def screenshot(path: str) -> Optional[str]:
+    """PNG do display inteiro; melhor esforço (Pillow → ImageMagick import → xwd)."""
+    display = os.environ.get("DISPLAY")
+    try:
+        from PIL import ImageGrab  # type: ignore
+        img = ImageGrab.grab(xdisplay=display) if display else ImageGrab.grab()
+        img.save(path)
+        return path
+    except Exception:
+        pass
+    if display and shutil.which("import"):
+        r = subprocess.run(["import", "-display", display, "-window", "root", path],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=20)
+        if r.returncode == 0:
+            return path
+    if display and shutil.which("xwd"):
+        xwd_path = os.path.splitext(path)[0] + ".xwd"
+        r = subprocess.run(["xwd", "-root", "-silent", "-display", display, "-out", xwd_path],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=20)
+        if r.returncode == 0:
+            if shutil.which("convert"):
+                subprocess.run(["convert", xwd_path, path], timeout=20,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                if os.path.exists(path):
+                    os.remove(xwd_path)
+                    return path
+            return xwd_path
+    return None
+
+
+# -------------------------
+# Execução
+# -------------------------
+
+def settle(app, seconds: float = HEADLESS_SETTLE_S) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.update()
+        time.sleep(0.01)
+    app.update_idletasks()
+
+
+def drive_to(app, clk: clock_mod.ManualClock, when: datetime) -> None:
+    """Coloca a UI no estado de `when` (mesmas tarefas que o scheduler rodaria)."""
+    clk.set(when)
+    app._tick_power()
+    app._tick_theme()
+    app._tick()
+    app.vm.flush()
+    settle(app)
+
+
+def run_perf(app, clk: clock_mod.ManualClock, ticks: int) -> Dict[str, Any]:
+    """N ticks com o relógio andando 1s por tick; ms por tick (inclui commit do view-model)."""
+    frame_ms: List[float] = []
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    for _ in range(ticks):
+        clk.advance(1.0)
+        t0 = time.perf_counter()
+        app._tick()
+        app.update_idletasks()     # commit em lote (after_idle) entra na conta
+        frame_ms.append((time.perf_counter() - t0) * 1000.0)
+        app.update()
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    mon = app.perf.summary()
+    out: Dict[str, Any] = {
+        "ticks": ticks,
+        "frame_ms": summarize(frame_ms),
+        "tick_ms": mon.get("tick", {}).get("stats", {}),
+        "commit_ms": mon.get("commit", {}).get("stats", {}),
+        "phases_ms": {k: mon[k]["stats"] for k in TICK_PHASES if k in mon},
+        "cpu_s": round(cpu, 4),
+        "wall_s": round(wall, 4),
+        "cpu_pct": round(100.0 * cpu / wall, 1) if wall > 0 else 0.0,
+    }
+    try:
+        import resource
+        out["maxrss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        pass
+    return out
+
+
+def compare(report: Dict[str, Any], base_dir: str, out_dir: str, threshold: float) -> List[str]:
+    """Diferenças contra uma execução anterior (mesmos instantes/tamanho)."""
+    problems: List[str] = []
+    try:
+        with open(os.path.join(base_dir, "report.json"), "r", encoding="utf-8") as f:
+            base = json.load(f)
+    except Exception as e:
+        return [f"baseline unreadable: {type(e).__name__}: {e}"]
+
+    if base.get("size") != report.get("size"):
+        problems.append(f"size differs: base={base.get('size')} now={report.get('size')}")
+
+    for snap in report.get("snapshots", []):
+        label = snap["label"]
+        try:
+            with open(os.path.join(base_dir, label, "layout.json"), "r", encoding="utf-8") as f:
+                old = {e["path"]: e for e in json.load(f)}
+            with open(os.path.join(out_dir, label, "layout.json"), "r", encoding="utf-8") as f:
+                new = {e["path"]: e for e in json.load(f)}
+        except Exception:
+            problems.append(f"{label}: missing layout in baseline")
+            continue
+        diffs = []
+        for path in sorted(set(old) | set(new)):
+            a, b = old.get(path), new.get(path)
+            if a is None or b is None:
+                diffs.append(f"{path} {'added' if a is None else 'removed'}")
+            elif a != b:
+                keys = [k for k in set(a) | set(b) if a.get(k) != b.get(k)]
+                diffs.append(f"{path} changed {sorted(keys)}")
+        if diffs:
+            problems.append(f"{label}: layout changed in {len(diffs)} widget(s): " + "; ".join(diffs[:8]))
+
+    old_p95 = (base.get("perf") or {}).get("frame_ms", {}).get("p95")
+    new_p95 = (report.get("perf") or {}).get("frame_ms", {}).get("p95")
+    if old_p95 is not None and new_p95 is not None:
+        if new_p95 > old_p95 * (1.0 + threshold) and new_p95 - old_p95 > PERF_ABS_SLACK_MS:
+            problems.append(f"perf: frame p95 {old_p95:.2f}ms → {new_p95:.2f}ms (>{threshold:.0%})")
+    return problems
+
+
+def _parse_size(s: str) -> Tuple[int, int]:
+    w, h = s.lower().split("x", 1)
+    return int(w), int(h)
+
+
+def _instants(ats: List[str]) -> List[datetime]:
+    if ats:
+        return [datetime.fromisoformat(a) for a in ats]
+    today = datetime.now().strftime("%Y-%m-%d")
+    return [datetime.fromisoformat(f"{today}T{t}") for t in DEFAULT_TIMES]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="SAL headless: snapshots + tempos de tick")
+    ap.add_argument("--at", action="append", default=[], help="instante local YYYY-MM-DDTHH:MM (repetível)")
+    ap.add_argument("--size", default="1920x1080")
+    ap.add_argument("--out", default=None, help="pasta de saída (padrão: ./headless_<data-hora>)")
+    ap.add_argument("--excel", default=None, help="grade.xlsx alternativa")
+    ap.add_argument("--ticks", type=int, default=120, help="ticks medidos após os snapshots (0 = não mede)")
+    ap.add_argument("--weather", action="store_true", help="busca o clima de verdade (padrão: sem rede)")
+    ap.add_argument("--xvfb", action="store_true", help="usa Xvfb mesmo com DISPLAY definido")
+    ap.add_argument("--no-screenshot", action="store_true")
+    ap.add_argument("--baseline", default=None, help="pasta de uma execução anterior para comparar")
+    ap.add_argument("--threshold", type=float, default=PERF_THRESHOLD)
+    args = ap.parse_args(argv)
+
+    size = _parse_size(args.size)
+    instants = _instants(args.at)
+    ensure_display(size, force_xvfb=args.xvfb)
+
+    clk = clock_mod.ManualClock(instants[0])
+    clock_mod.install(clk)
+
+    out_dir = os.path.abspath(args.out or "headless_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+
+    tmp = tempfile.mkdtemp(prefix="sal_headless_")
+    old_lad = os.environ.get("LOCALAPPDATA")
+    os.environ["LOCALAPPDATA"] = tmp     # sal.log/state.json/hang.log dentro da pasta temporária
+    try:
+        return run(args, size, instants, clk, out_dir)
+    finally:
+        if old_lad is None:
+            os.environ.pop("LOCALAPPDATA", None)
+        else:
+            os.environ["LOCALAPPDATA"] = old_lad
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(args, size: Tuple[int, int], instants: List[datetime], clk, out_dir: str) -> int:
+    import sal   # depois do relógio/display/LOCALAPPDATA: o módulo lê o ambiente no import
+
+    if args.excel:
+        sal.EXCEL_PATH = os.path.abspath(args.excel)
+    sal.DNS_PREFETCH = args.weather    # sem --weather: nenhum acesso à rede (nem DNS, nem dns_cache.json)
+
+    boot0 = time.perf_counter()
+    app = sal.SALApp()
+    # o harness dirige o tempo: nada de after() do scheduler disparando no meio do snapshot
+    app.sched.stop()
+    # sem batidas do scheduler o watchdog dispararia (dump + execv do próprio harness)
+    app.watchdog.stop()
+    app.attributes("-fullscreen", False)
+    app.geometry(f"{size[0]}x{size[1]}+0+0")
+    if args.weather:
+        app._tick_weather()            # padrão: sem rede (card de clima fica no placeholder/cache)
+    settle(app)
+    boot_ms = (time.perf_counter() - boot0) * 1000.0
+
+    report: Dict[str, Any] = {
+        "size": list(size),
+        "build": sal.SAL_UI_BUILD,
+        "excel": sal.EXCEL_PATH,
+        "items": len(app.all_items),
+        "boot_ms": round(boot_ms, 1),
+        "snapshots": [],
+    }
+
+    for when in instants:
+        label = when.strftime("%Y%m%d_%H%M")
+        snap_dir = os.path.join(out_dir, label)
+        os.makedirs(snap_dir, exist_ok=True)
+        drive_to(app, clk, when)
+
+        layout = dump_layout(app)
+        with open(os.path.join(snap_dir, "layout.json"), "w", encoding="utf-8") as f:
+            json.dump(layout, f, ensure_ascii=False, indent=1)
+        ps = dump_postscript(app, snap_dir)
+        shot = None if args.no_screenshot else screenshot(os.path.join(snap_dir, "screen.png"))
+        report["snapshots"].append({
+            "label": label, "at": when.isoformat(timespec="minutes"),
+            "theme": app.theme.name, "power": app.power_mode,
+            "postscript": [os.path.basename(p) for p in ps],
+            "screenshot": os.path.basename(shot) if shot else None,
+        })
+        print(f"{label} theme={app.theme.name:<5} power={app.power_mode:<6} widgets={len(layout)} "
+              f"ps={len(ps)} screenshot={'yes' if shot else 'no'}")
+
+    if args.ticks > 0:
+        drive_to(app, clk, instants[0])
+        report["perf"] = run_perf(app, clk, args.ticks)
+        p = report["perf"]
+        print(f"perf ticks={p['ticks']} frame p50={p['frame_ms'].get('p50', 0):.2f}ms "
+              f"p95={p['frame_ms'].get('p95', 0):.2f}ms max={p['frame_ms'].get('max', 0):.2f}ms "
+              f"cpu={p['cpu_pct']}%")
+
+    problems: List[str] = []
+    if args.baseline:
+        problems = compare(report, args.baseline, out_dir, args.threshold)
+        report["regressions"] = problems
+
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    try:
+        app.destroy()
+    except Exception:
+        pass
+
+    for p in problems:
+        print("REGRESSION", p)
+    print(f"out={out_dir}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+# healthmon.py
+# SAL - Vigia de vazamentos para semanas de uptime (memória e handles)
+# Só stdlib (sem tkinter aqui: recebe a janela raiz e usa winfo_children / tk.call).
+# A cada amostra (padrão 10 min) mede:
+# - rss_kb          memória residente (Linux /proc, Windows GetProcessMemoryInfo; senão ru_maxrss)
+# - py_kb           tracemalloc (SAL_TRACEMALLOC=N frames; desligado por padrão) + top alocadores
+# - widgets         árvore de widgets Tk (recursivo a partir da raiz)
+# - canvas_items    itens somados de todos os Canvas (cards retidos não podem crescer)
+# - images          "image names" do Tk (PhotoImage sem dono continua aqui)
+# - after           callbacks pendentes ("after info")
+# - threads         threading.active_count()
+# - gc_objects      objetos rastreados pelo gc
+# - handles / gdi / user   (Windows) handles do processo, objetos GDI e USER
+# Cada amostra vira 1 linha [HEALTH] no log e 1 linha JSON em DATA_DIR/health/health_YYYY-MM.jsonl.
+# ✅ crescimento monotônico (N amostras seguidas sem cair e acima do mínimo) → [HEALTH] WARN (com cooldown)
+# ✅ resumo de tendência (variação/dia) a cada HEALTH_SUMMARY_EVERY amostras
+# ✅ relatório do mês (prova de memória estável): python healthmon.py report <pasta ou .jsonl>
+#
+# Uso:
+#   python healthmon.py report %LOCALAPPDATA%\SAL_SESI_Agenda_Live\health
+#   python healthmon.py report health_2026-10.jsonl --json health_report.json
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from perfstats import percentile
+
+
+HEALTH_INTERVAL_S = 600.0        # 1 amostra a cada 10 min (~4.300 por mês)
+HEALTH_MONO_SAMPLES = 12         # 12 amostras seguidas sem cair (~2h) → suspeita
+HEALTH_WARN_COOLDOWN_S = 6 * 3600
+HEALTH_SUMMARY_EVERY = 36        # resumo de tendência a cada ~6h
+HEALTH_HISTORY = 1008            # ~7 dias de amostras em memória (tendência)
+HEALTH_KEEP_FILES = 3            # meses de JSONL mantidos
+HEALTH_TOP_N = 5                 # alocadores no log (tracemalloc)
+
+# crescimento mínimo (última - primeira da sequência) para alertar; abaixo disso é ruído
+HEALTH_MIN_GROWTH = {
+    "rss_kb": 8 * 1024,
+    "py_kb": 4 * 1024,
+    "widgets": 10,
+    "canvas_items": 20,
+    "images": 4,
+    "after": 8,
+    "threads": 3,
+    "gc_objects": 5000,
+    "handles": 50,
+    "gdi": 20,
+    "user": 20,
+}
+HEALTH_METRICS = tuple(HEALTH_MIN_GROWTH)
+
+
+# -------------------------
+# Medidas (best-effort; None quando a plataforma não oferece)
+# -------------------------
+
+def rss_kb() -> Tuple[Optional[int], str]:
+    """(memória residente em KB, fonte)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024, "statm"
+    except Exception:
+        pass
+    if sys.platform == "win32":
+        try:
+            c = _win_counters()
+            if c.get("rss_kb") is not None:
+                return c["rss_kb"], "psapi"
+        except Exception:
+            pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (peak // 1024 if sys.platform == "darwin" else peak), "maxrss"
+    except Exception:
+        return None, "none"
+
+
+def _win_counters() -> Dict[str, Optional[int]]:
+    """Windows: working set, handles do processo, objetos GDI/USER (vazamento de PhotoImage/janela aparece aqui)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    out: Dict[str, Optional[int]] = {"rss_kb": None, "handles": None, "gdi": None, "user": None}
+    k32 = ctypes.windll.kernel32
+    proc = k32.GetCurrentProcess()
+
+    pmc = PROCESS_MEMORY_COUNTERS()
+    pmc.cb = ctypes.sizeof(pmc)
+    if ctypes.windll.psapi.GetProcessMemoryInfo(proc, ctypes.byref(pmc), pmc.cb):
+        out["rss_kb"] = int(pmc.WorkingSetSize) // 1024
+
+    n = wintypes.DWORD()
+    if k32.GetProcessHandleCount(proc, ctypes.byref(n)):
+        out["handles"] = int(n.value)
+
+    user32 = ctypes.windll.user32
+    out["gdi"] = int(user32.GetGuiResources(proc, 0))    # GR_GDIOBJECTS
+    out["user"] = int(user32.GetGuiResources(proc, 1))   # GR_USEROBJECTS
+    return out
+
+
+def tk_counts(root) -> Dict[str, Optional[int]]:
+    """widgets / canvas_items / images / after a partir da raiz Tk (precisa rodar na thread do Tk)."""
+    out: Dict[str, Optional[int]] = {"widgets": None, "canvas_items": None, "images": None, "after": None}
+    if root is None:
+        return out
+    try:
+        widgets = 0
+        items = 0
+        stack = list(root.winfo_children())
+        while stack:
+            w = stack.pop()
+            widgets += 1
+            try:
+                if w.winfo_class() == "Canvas":
+                    items += len(w.find_all())
+            except Exception:
+                pass
+            stack.extend(w.winfo_children())
+        out["widgets"] = widgets
+        out["canvas_items"] = items
+    except Exception:
+        pass
+    try:
+        out["images"] = len(root.tk.splitlist(root.tk.call("image", "names")))
+    except Exception:
+        pass
+    try:
+        out["after"] = len(root.tk.splitlist(root.tk.call("after", "info")))
+    except Exception:
+        pass
+    return out
+
+
+# -------------------------
+# Tendência
+# -------------------------
+
+def slope_per_day(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Mínimos quadrados: variação por dia (pontos = (epoch, valor))."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    t0 = points[0][0]
+    xs = [(t - t0) / 86400.0 for t, _ in points]
+    ys = [v for _, v in points]
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    den = sum((x - mx) ** 2 for x in xs)
+    if den <= 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den
+
+
+def monotonic_growth(values: List[float], min_growth: float) -> bool:
+    """Nenhuma queda na sequência e crescimento total acima do mínimo."""
+    if len(values) < 2:
+        return False
+    if any(b < a for a, b in zip(values, values[1:])):
+        return False
+    return values[-1] - values[0] >= min_growth
+
+
+# -------------------------
+# Monitor
+# -------------------------
+
+class HealthMonitor:
+    """
+    Chamado pelo scheduler na thread do Tk:
+        mon = HealthMonitor(root, logger=log, out_dir=os.path.join(DATA_DIR, "health"))
+        sched.every("health", mon.interval_s, mon.sample)
+    """
+    def __init__(self, root=None, logger=None, out_dir: Optional[str] = None,
+                 interval_s: float = HEALTH_INTERVAL_S,
+                 mono_samples: int = HEALTH_MONO_SAMPLES,
+                 tracemalloc_frames: Optional[int] = None):
+        self.root = root
+        self.logger = logger
+        self.out_dir = out_dir
+        self.interval_s = float(interval_s)
+        self.mono_samples = max(3, int(mono_samples))
+
+        self.samples = 0
+        self.history: Dict[str, Deque[Tuple[float, float]]] = {m: deque(maxlen=HEALTH_HISTORY)
+                                                               for m in HEALTH_METRICS}
+        self._last_warn: Dict[str, float] = {}
+        self._file: Optional[str] = None
+        self._t_boot = time.time()
+
+        if tracemalloc_frames is None:
+            try:
+                tracemalloc_frames = int(os.environ.get("SAL_TRACEMALLOC", "0") or 0)
+            except ValueError:
+                tracemalloc_frames = 0
+        self._tm_frames = max(0, tracemalloc_frames)
+        self._tm_base = None
+        if self._tm_frames:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self._tm_frames)
+            self._tm_base = tracemalloc.take_snapshot()
+
+    def _log(self, msg: str) -> None:
+        if self.logger:
+            self.logger(msg)
+
+    # ---- amostra ----
+
+    def measure(self) -> Dict[str, Any]:
+        now = time.time()
+        rss, src = rss_kb()
+        s: Dict[str, Any] = {"ts": round(now, 1), "uptime_s": round(now - self._t_boot),
+                             "rss_kb": rss, "rss_src": src}
+        s.update(tk_counts(self.root))
+        s["threads"] = threading.active_count()
+        s["gc_objects"] = len(gc.get_objects())
+        if sys.platform == "win32":
+            try:
+                w = _win_counters()
+                s["handles"], s["gdi"], s["user"] = w["handles"], w["gdi"], w["user"]
+            except Exception:
+                pass
+        if self._tm_frames:
+            import tracemalloc
+            cur, peak = tracemalloc.get_traced_memory()
+            s["py_kb"] = cur // 1024
+            s["py_peak_kb"] = peak // 1024
+        return s
+
+    def _top_allocators(self) -> List[str]:
+        import tracemalloc
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        stats = snap.compare_to(self._tm_base, "lineno")[:HEALTH_TOP_N]
+        out = []
+        for st in stats:
+            fr = st.traceback[0]
+            out.append(f"{os.path.basename(fr.filename)}:{fr.lineno} "
+                       f"+{st.size_diff // 1024}KB n={st.count_diff:+d} total={st.size // 1024}KB")
+        return out
+
+    def sample(self) -> Dict[str, Any]:
+        try:
+            s = self.measure()
+        except Exception as e:
+            self._log(f"[HEALTH] sample error {type(e).__name__}: {e}")
+            return {}
+        self.samples += 1
+
+        parts = [f"{m}={s[m]}" for m in HEALTH_METRICS if s.get(m) is not None]
+        self._log(f"[HEALTH] n={self.samples} uptime_h={s['uptime_s'] / 3600.0:.1f} " + " ".join(parts))
+
+        if self._tm_frames:
+            try:
+                top = self._top_allocators()
+                s["top"] = top
+                for line in top:
+                    self._log(f"[HEALTH] alloc {line}")
+            except Exception as e:
+                self._log(f"[HEALTH] tracemalloc error {type(e).__name__}: {e}")
+
+        for m in HEALTH_METRICS:
+            v = s.get(m)
+            if v is not None:
+                self.history[m].append((s["ts"], float(v)))
+        self._check_growth(s["ts"])
+
+        if self.samples % HEALTH_SUMMARY_EVERY == 0:
+            self.log_trends()
+        self._persist(s)
+        return s
+
+    def _check_growth(self, now: float) -> None:
+        for m in HEALTH_METRICS:
+            hist = self.history[m]
+            if len(hist) < self.mono_samples:
+                continue
+            window = [v for _, v in list(hist)[-self.mono_samples:]]
+            if not monotonic_growth(window, HEALTH_MIN_GROWTH[m]):
+                continue
+            if now - self._last_warn.get(m, -1e18) < HEALTH_WARN_COOLDOWN_S:
+                continue
+            self._last_warn[m] = now
+            slope = slope_per_day(list(hist))
+            self._log(f"[HEALTH] WARN monotonic growth metric={m} samples={self.mono_samples} "
+                      f"from={window[0]:.0f} to={window[-1]:.0f}"
+                      + (f" per_day={slope:+.1f}" if slope is not None else ""))
+
+    def trends(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for m, hist in self.history.items():
+            if len(hist) < 2:
+                continue
+            pts = list(hist)
+            slope = slope_per_day(pts)
+            out[m] = {"first": pts[0][1], "last": pts[-1][1],
+                      "min": min(v for _, v in pts), "max": max(v for _, v in pts),
+                      "per_day": round(slope, 2) if slope is not None else None}
+        return out
+
+    def log_trends(self) -> None:
+        t = self.trends()
+        if not t:
+            return
+        parts = [f"{m}({v['first']:.0f}->{v['last']:.0f} per_day={v['per_day']:+.1f})"
+                 for m, v in t.items() if v["per_day"] is not None]
+        self._log("[HEALTH] trend " + " ".join(parts))
+
+    # ---- JSONL ----
+
+    def _persist(self, s: Dict[str, Any]) -> None:
+        if not self.out_dir:
+            return
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, time.strftime("health_%Y-%m.jsonl", time.localtime(s["ts"])))
+            if path != self._file:
+                self._file = path
+                self.prune()
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(s, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except Exception as e:
+            self._log(f"[HEALTH] persist error {type(e).__name__}: {e}")
+
+    def prune(self) -> int:
+        removed = 0
+        try:
+            files = sorted(n for n in os.listdir(self.out_dir)
+                           if n.startswith("health_") and n.endswith(".jsonl"))
+            for name in files[:-HEALTH_KEEP_FILES]:
+                try:
+                    os.remove(os.path.join(self.out_dir, name))
+                    removed += 1
+                except Exception:
+                    pass
+        except Exception:
+            pass
+        return removed
+
+
+# -------------------------
+# Relatório (linha de comando)
+# -------------------------
+
+def load_samples(paths: List[str]) -> List[Dict[str, Any]]:
+    files: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(os.path.join(p, n) for n in sorted(os.listdir(p))
+                         if n.startswith("health_") and n.endswith(".jsonl"))
+        else:
+            files.append(p)
+    out = []
+    for fp in files:
+        with open(fp, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+    out.sort(key=lambda s: s.get("ts", 0))
+    return out
+
+
+def report(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Por métrica: mediana dos primeiros 10% vs últimos 10% das amostras (robusto a picos),
+    inclinação/dia e veredito "flat"/"growing" (crescimento acima do mínimo da métrica).
+    Um reboot (uptime voltou) não atrapalha: as medianas comparam o começo e o fim do período.
+    """
+    res: Dict[str, Any] = {"samples": len(samples)}
+    if not samples:
+        return res
+    res["from"] = time.strftime("%Y-%m-%d %H:%M", time.localtime(samples[0]["ts"]))
+    res["to"] = time.strftime("%Y-%m-%d %H:%M", time.localtime(samples[-1]["ts"]))
+    res["days"] = round((samples[-1]["ts"] - samples[0]["ts"]) / 86400.0, 2)
+    res["max_uptime_h"] = round(max(s.get("uptime_s", 0) for s in samples) / 3600.0, 1)
+
+    metrics: Dict[str, Any] = {}
+    for m in HEALTH_METRICS:
+        pts = [(s["ts"], float(s[m])) for s in samples if s.get(m) is not None]
+        if len(pts) < 2:
+            continue
+        k = max(1, len(pts) // 10)
+        head = percentile([v for _, v in pts[:k]], 50)
+        tail = percentile([v for _, v in pts[-k:]], 50)
+        slope = slope_per_day(pts)
+        growth = (tail or 0.0) - (head or 0.0)
+        metrics[m] = {
+            "start": head, "end": tail, "growth": round(growth, 1),
+            "min": min(v for _, v in pts), "max": max(v for _, v in pts),
+            "per_day": round(slope, 2) if slope is not None else None,
+            "verdict": "growing" if growth >= HEALTH_MIN_GROWTH[m] else "flat",
+        }
+    res["metrics"] = metrics
+    res["ok"] = all(v["verdict"] == "flat" for v in metrics.values())
+    return res
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Relatório de saúde do SAL (health_*.jsonl)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("report", help="tendência por métrica (memória estável?)")
+    rp.add_argument("paths", nargs="+", help="pasta health/ ou arquivos .jsonl")
+    rp.add_argument("--json", default=None, help="grava o relatório em JSON")
+    args = ap.parse_args(argv)
+
+    res = report(load_samples(args.paths))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=2)
+    if not res.get("samples"):
+        print("nenhuma amostra")
+        return 2
+
+    print(f"samples={res['samples']} from={res['from']} to={res['to']} days={res['days']} "
+          f"max_uptime_h={res['max_uptime_h']}")
+    print(f"{'metric':<14} {'start':>12} {'end':>12} {'per_day':>10} {'max':>12}  verdict")
+    for m, v in res["metrics"].items():
+        print(f"{m:<14} {v['start']:>12.0f} {v['end']:>12.0f} {v['per_day'] or 0:>+10.1f} {v['max']:>12.0f}  {v['verdict']}")
+    print("OK: estável" if res["ok"] else "ATENÇÃO: crescimento contínuo")
+    return 0 if res["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+# metno_standin.py
+# SAL - Stand-in local do api.met.no (testes/benchmarks offline do cliente de clima)
+# Serve payloads de locationforecast gravados (ou sintéticos), um /v1/forecast
+# sintético no formato do Open-Meteo (provider alternativo) e injeta falhas:
+# - latency:<s>     → atrasa a resposta
+# - timeout         → segura a conexão sem responder (até o cliente desistir)
+# - status:<code>   → 5xx / 429 (429 manda Retry-After)
+# - truncate        → Content-Length completo, corpo pela metade, fecha a conexão
+# - 304             → Not Modified (passos "ok" também respondem 304 a If-Modified-Since)
+# - ok              → resposta normal
+# As falhas seguem um plano cíclico (1 passo por requisição); --alt-fault define
+# um plano separado para a rota do Open-Meteo.
+#
+# Uso:
+#   python metno_standin.py --port 8765 --payload-dir gravados/ --fault ok --fault status:503
+#   SAL_WEATHER_BASE_URL=http://127.0.0.1:8765 python sal.py
+# Payload real para --payload-dir (o weather_cache.json do quiosque não tem mais o payload cru):
+#   curl -A "SAL/1.0 contato@exemplo" --compressed -o gravados/sp.json \
+#     "https://api.met.no/weatherapi/locationforecast/2.0/compact?lat=-23.55&lon=-46.63"
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import gzip
+import json
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+FORECAST_PATH = "/weatherapi/locationforecast/2.0/compact"
+OPENMETEO_PATH = "/v1/forecast"
+
+
+# -------------------------
+# Payloads
+# -------------------------
+
+def synth_locationforecast(lat: float, lon: float, hours: int = 90,
+                           start_ts: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Payload no formato do locationforecast/2.0/compact (determinístico).
+    ~90 entradas como o real: horárias no começo, depois de 6 em 6h.
+    """
+    if start_ts is None:
+        start_ts = int(time.time()) // 3600 * 3600
+    symbols = ["clearsky_day", "fair_day", "partlycloudy_day", "cloudy",
+               "lightrain", "rain", "heavyrainshowersandthunder_day", "fog"]
+
+    series = []
+    t = start_ts
+    for i in range(hours):
+        step = 3600 if i < 60 else 6 * 3600
+        temp = 22.0 + 6.0 * math.sin((i % 24) / 24.0 * 2 * math.pi)
+        data: Dict[str, Any] = {
+            "instant": {"details": {
+                "air_pressure_at_sea_level": 1013.2,
+                "air_temperature": round(temp, 1),
+                "cloud_area_fraction": float((i * 7) % 100),
+                "relative_humidity": float(60 + (i * 3) % 35),
+                "wind_from_direction": float((i * 11) % 360),
+                "wind_speed": round(1.5 + (i % 5) * 0.4, 1),
+            }},
+            "next_6_hours": {
+                "summary": {"symbol_code": symbols[(i // 6) % len(symbols)]},
+                "details": {"precipitation_amount": float(i % 4)},
+            },
+        }
+        if i < 60:
+            data["next_1_hours"] = {
+                "summary": {"symbol_code": symbols[i % len(symbols)]},
+                "details": {"precipitation_amount": float(i % 3) / 10.0},
+            }
+            data["next_12_hours"] = {"summary": {"symbol_code": symbols[(i // 12) % len(symbols)]}}
+        series.append({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t)),
+            "data": data,
+        })
+        t += step
+
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat, 880]},
+        "properties": {
+            "meta": {
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start_ts)),
+                "units": {"air_temperature": "celsius", "precipitation_amount": "mm"},
+            },
+            "timeseries": series,
+        },
+    }
+
+
+def synth_openmeteo(lat: float, lon: float, days: int = 3,
+                    start_ts: Optional[int] = None) -> Dict[str, Any]:
+    """Payload no formato do Open-Meteo /v1/forecast (hourly, timezone=UTC)."""
+    if start_ts is None:
+        start_ts = int(time.time())
+    day0 = start_ts // 86400 * 86400
+    codes = [0, 1, 2, 3, 45, 61, 63, 80, 95]
+    times, temps, wcodes = [], [], []
+    for i in range(days * 24):
+        t = day0 + i * 3600
+        times.append(time.strftime("%Y-%m-%dT%H:%M", time.gmtime(t)))
+        temps.append(round(21.0 + 5.0 * math.sin((i % 24) / 24.0 * 2 * math.pi), 1))
+        wcodes.append(codes[(i // 3) % len(codes)])
+    return {
+        "latitude": lat, "longitude": lon, "timezone": "UTC",
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C", "weather_code": "wmo code"},
+        "hourly": {"time": times, "temperature_2m": temps, "weather_code": wcodes},
+    }
+
+
+def load_recorded_payloads(payload_dir: str) -> List[bytes]:
+    """
+    Lê *.json gravados: payload cru do locationforecast (captura com curl) ou weather_cache.json
+    LEGADO ({"ts":..., "payload": {...}}). O cache atual guarda só o forecast compacto
+    ({"forecast": ...}) → não serve de payload e é ignorado.
+    """
+    out: List[bytes] = []
+    for name in sorted(os.listdir(payload_dir)):
+        if not name.lower().endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(payload_dir, name), "r", encoding="utf-8") as f:
+                obj = json.load(f)
+        except Exception:
+            continue
+        if isinstance(obj, dict) and isinstance(obj.get("payload"), dict):
+            obj = obj["payload"]
+        if isinstance(obj, dict) and "properties" in obj:
+            out.append(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+    return out
+
+
+# -------------------------
+# Fault plan
+# -------------------------
+
+@dataclass
+class Fault:
+    kind: str                  # ok | latency | timeout | status | truncate | not_modified
+    delay: float = 0.0         # latency (s)
+    status: int = 200          # status
+    retry_after: int = 30      # 429
+
+
+def parse_fault(spec: str) -> Fault:
+    """'ok' | 'latency:1.5' | 'timeout' | 'status:503' | 'status:429' | 'truncate' | '304'"""
+    s = (spec or "").strip().lower()
+    if s in ("", "ok"):
+        return Fault("ok")
+    if s == "timeout":
+        return Fault("timeout")
+    if s == "truncate":
+        return Fault("truncate")
+    if s in ("304", "not_modified"):
+        return Fault("not_modified")
+    kind, _, arg = s.partition(":")
+    if kind == "latency":
+        return Fault("latency", delay=float(arg or 1.0))
+    if kind == "status":
+        return Fault("status", status=int(arg or 503))
+    raise ValueError(f"fault inválido: {spec!r}")
+
+
+class FaultPlan:
+    """Plano cíclico de falhas (thread-safe). Lista vazia = sempre ok."""
+
+    def __init__(self, faults: Optional[List[Fault]] = None):
+        self._lock = threading.Lock()
+        self._faults: List[Fault] = list(faults or [])
+        self._i = 0
+
+    def set(self, faults: List[Fault]) -> None:
+        with self._lock:
+            self._faults = list(faults)
+            self._i = 0
+
+    def next(self) -> Fault:
+        with self._lock:
+            if not self._faults:
+                return Fault("ok")
+            f = self._faults[self._i % len(self._faults)]
+            self._i += 1
+            return f
+
+
+# -------------------------
+# Server
+# -------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "metno-standin/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # silencioso (o benchmark mede, não loga)
+        if self.server.verbose:  # type: ignore[attr-defined]
+            super().log_message(fmt, *args)
+
+    def _send_body(self, status: int, body: bytes, extra: Optional[Dict[str, str]] = None,
+                   truncate: bool = False) -> None:
+        st: StandinServer = self.server  # type: ignore[assignment]
+        headers = dict(extra or {})
+
+        if "gzip" in (self.headers.get("Accept-Encoding") or "").lower() and body:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+
+        if truncate:
+            self.wfile.write(body[: max(1, len(body) // 2)])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+        st.bytes_sent += len(body)
+
+    def do_GET(self):
+        st: StandinServer = self.server  # type: ignore[assignment]
+        st.requests += 1
+        url = urlparse(self.path)
+
+        if url.path not in st.routes:
+            self._send_body(404, b'{"error":"not found"}')
+            return
+
+        fault = st.plan_for(url.path).next()
+        if fault.kind == "latency":
+            st.stop_event.wait(fault.delay)
+        elif fault.kind == "timeout":
+            st.stop_event.wait(st.hang_seconds)
+            self.close_connection = True
+            return
+
+        if fault.kind == "status":
+            extra = {"Retry-After": str(fault.retry_after)} if fault.status == 429 else {}
+            self._send_body(fault.status, json.dumps({"error": f"injected {fault.status}"}).encode(), extra)
+            return
+
+        q = parse_qs(url.query)
+        body, last_mod = st.routes[url.path](q)
+        lm_header = email.utils.formatdate(last_mod, usegmt=True)
+        ims = self.headers.get("If-Modified-Since")
+
+        not_modified = fault.kind == "not_modified"
+        if ims and fault.kind == "ok":
+            try:
+                ims_ts = email.utils.parsedate_to_datetime(ims).timestamp()
+                not_modified = int(ims_ts) >= int(last_mod)
+            except Exception:
+                pass
+
+        if not_modified:
+            self.send_response(304)
+            self.send_header("Last-Modified", lm_header)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        extra = {
+            "Last-Modified": lm_header,
+            "Expires": email.utils.formatdate(time.time() + 1800, usegmt=True),
+        }
+        self._send_body(200, body, extra, truncate=(fault.kind == "truncate"))
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Servidor local. routes: path → fn(query) -> (body_bytes, last_modified_ts).
+    start()/stop() rodam em thread própria (para benchmarks in-process).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 payloads: Optional[List[bytes]] = None,
+                 plan: Optional[FaultPlan] = None,
+                 hang_seconds: float = 60.0,
+                 verbose: bool = False,
+                 bump_last_modified: bool = False):
+        super().__init__((host, port), _Handler)
+        self.plan = plan or FaultPlan()
+        self.hang_seconds = hang_seconds
+        self.verbose = verbose
+        self.stop_event = threading.Event()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.last_modified = int(time.time()) // 60 * 60
+        self.bump_last_modified = bump_last_modified   # "dado novo" a cada requisição (sem 304)
+
+        self._payloads = list(payloads or [])
+        self._pi = 0
+        self._plock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.routes = {FORECAST_PATH: self._metno_route, OPENMETEO_PATH: self._openmeteo_route}
+        # plano por rota (ex.: só o met.no lento); sem entrada → self.plan
+        self.route_plans: Dict[str, FaultPlan] = {}
+
+    def plan_for(self, path: str) -> FaultPlan:
+        return self.route_plans.get(path) or self.plan
+
+    def handle_error(self, request, client_address):
+        # cliente desistiu (timeout/latência injetados) → esperado, não polui a saída
+        exc = sys.exc_info()[1]
+        if isinstance(exc, (BrokenPipeError, ConnectionResetError, ConnectionAbortedError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _metno_route(self, q: Dict[str, List[str]]) -> Tuple[bytes, int]:
+        with self._plock:
+            if self.bump_last_modified:
+                self.last_modified += 1
+            if self._payloads:
+                body = self._payloads[self._pi % len(self._payloads)]
+                self._pi += 1
+                return body, self.last_modified
+        lat = float((q.get("lat") or ["0"])[0])
+        lon = float((q.get("lon") or ["0"])[0])
+        body = json.dumps(synth_locationforecast(lat, lon, start_ts=self.last_modified // 3600 * 3600)).encode()
+        return body, self.last_modified
+
+    def _openmeteo_route(self, q: Dict[str, List[str]]) -> Tuple[bytes, int]:
+        lat = float((q.get("latitude") or ["0"])[0])
+        lon = float((q.get("longitude") or ["0"])[0])
+        return json.dumps(synth_openmeteo(lat, lon)).encode(), self.last_modified
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Stand-in local do api.met.no (locationforecast)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--payload-dir", default=None, help="pasta com payloads gravados (*.json)")
+    ap.add_argument("--fault", action="append", default=[],
+                    help="passo do plano (repetível): ok | latency:S | timeout | status:CODE | truncate | 304")
+    ap.add_argument("--alt-fault", action="append", default=[],
+                    help="plano só da rota Open-Meteo (mesma sintaxe de --fault)")
+    ap.add_argument("--hang", type=float, default=60.0, help="segundos segurando a conexão no 'timeout'")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    payloads = load_recorded_payloads(args.payload_dir) if args.payload_dir else []
+    plan = FaultPlan([parse_fault(f) for f in args.fault])
+    srv = StandinServer(args.host, args.port, payloads=payloads, plan=plan,
+                        hang_seconds=args.hang, verbose=args.verbose)
+    if args.alt_fault:
+        srv.route_plans[OPENMETEO_PATH] = FaultPlan([parse_fault(f) for f in args.alt_fault])
+    print(f"metno-standin em {srv.base_url} payloads={len(payloads) or 'sintético'} "
+          f"faults={args.fault or ['ok']}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop_event.set()
+        srv.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+# perfmon.py
+# SAL - Orçamento de frame do loop Tk (instrumentação do _tick)
+# Só stdlib (sem tkinter aqui: o app chama begin/phase/end).
+# Mede:
+# - duração de cada fase do _tick (cabeçalho, horários, agora/próximas, cards, clima)
+# - duração de cada tarefa do scheduler (task.<nome>: tema, Excel, housekeeping, ...)
+# - atraso do event loop: horário agendado do after() vs horário real do callback
+# - histogramas (buckets fixos) + janela móvel com percentis (perfstats.RollingStats)
+# Loga um resumo periódico e um alerta (com o detalhamento por fase) quando o orçamento estoura.
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from perfstats import RollingStats, fmt_summary
+
+
+TICK_PHASES = ("header", "hours", "now_next", "cards", "weather")
+
+TICK_BUDGET_MS = 50.0          # _tick inteiro (1 frame "caro" já aparece como engasgo)
+LAG_BUDGET_MS = 250.0          # after(1000) chegando atrasado
+COMMIT_BUDGET_MS = 30.0        # commit em lote do view-model (after_idle)
+
+PERF_SUMMARY_INTERVAL_S = 300  # resumo no log a cada 5 min
+PERF_ALERT_COOLDOWN_S = 60     # no máx. 1 alerta por minuto (por tipo)
+PERF_WINDOW = 600              # ~10 min de ticks na janela móvel
+
+# limites superiores (ms) dos buckets do histograma; o último é "acima disso"
+HIST_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Contagem por bucket fixo (acumulada desde o boot; barato: 1 busca linear curta)."""
+    def __init__(self, bounds=HIST_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, ms: float) -> None:
+        for i, b in enumerate(self.bounds):
+            if ms <= b:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        out = {f"<={b}": c for b, c in zip(self.bounds, self.counts)}
+        out[f">{self.bounds[-1]}"] = self.counts[-1]
+        return out
+
+    def compact(self) -> str:
+        """'<=1:120 <=2:30 ... >1000:0' só com buckets não vazios (para o log)."""
+        parts = [f"{k}:{v}" for k, v in self.as_dict().items() if v]
+        return " ".join(parts) or "-"
+
+
+class FrameMonitor:
+    """
+    Uso no _tick:
+        mon.begin_tick(expected_at)      # expected_at = perf_counter() previsto pelo after()
+        with mon.phase("header"): ...
+        mon.end_tick()
+    e fora do tick: mon.record("commit", ms).
+    """
+    def __init__(self, logger=None,
+                 tick_budget_ms: float = TICK_BUDGET_MS,
+                 lag_budget_ms: float = LAG_BUDGET_MS,
+                 summary_interval_s: float = PERF_SUMMARY_INTERVAL_S,
+                 window: int = PERF_WINDOW):
+        self.logger = logger
+        self.tick_budget_ms = tick_budget_ms
+        self.lag_budget_ms = lag_budget_ms
+        self.budgets: Dict[str, float] = {"tick": tick_budget_ms, "lag": lag_budget_ms,
+                                          "commit": COMMIT_BUDGET_MS}
+        self.summary_interval_s = summary_interval_s
+
+        self.stats: Dict[str, RollingStats] = {}
+        self.hists: Dict[str, Histogram] = {}
+        for name in ("tick", "lag", "commit") + TICK_PHASES:
+            self.stats[name] = RollingStats(window)
+            self.hists[name] = Histogram()
+
+        self.ticks = 0
+        self.over_budget: Dict[str, int] = {}
+
+        self._tick_t0: Optional[float] = None
+        self._cur: Dict[str, float] = {}
+        self._last_summary = time.monotonic()
+        self._last_alert: Dict[str, float] = {}
+
+    # ---- gravação ----
+
+    def record(self, name: str, ms: float) -> None:
+        st = self.stats.get(name)
+        if st is None:
+            st = self.stats[name] = RollingStats(PERF_WINDOW)
+            self.hists[name] = Histogram()
+        st.add(ms)
+        self.hists[name].add(ms)
+
+        budget = self.budgets.get(name)
+        if budget is not None and ms > budget:
+            self.over_budget[name] = self.over_budget.get(name, 0) + 1
+            if name != "tick":   # o tick alerta no end_tick (com as fases)
+                self._alert(name, f"{name}_ms={ms:.1f} budget_ms={budget:.0f}")
+
+    def begin_tick(self, expected_at: Optional[float] = None) -> None:
+        now = time.perf_counter()
+        if expected_at is not None:
+            self.record("lag", max(0.0, (now - expected_at) * 1000.0))
+        self._tick_t0 = now
+        self._cur = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            self._cur[name] = self._cur.get(name, 0.0) + ms
+            self.record(name, ms)
+
+    def end_tick(self) -> Optional[float]:
+        if self._tick_t0 is None:
+            return None
+        total = (time.perf_counter() - self._tick_t0) * 1000.0
+        self._tick_t0 = None
+        self.ticks += 1
+        self.record("tick", total)
+
+        if total > self.tick_budget_ms:
+            breakdown = " ".join(f"{k}={v:.1f}" for k, v in
+                                 sorted(self._cur.items(), key=lambda kv: kv[1], reverse=True))
+            self._alert("tick", f"tick_ms={total:.1f} budget_ms={self.tick_budget_ms:.0f} | {breakdown}")
+
+        if time.monotonic() - self._last_summary >= self.summary_interval_s:
+            self.log_summary()
+        return total
+
+    # ---- saída ----
+
+    def _alert(self, kind: str, msg: str) -> None:
+        now = time.monotonic()
+        if now - self._last_alert.get(kind, -1e9) < PERF_ALERT_COOLDOWN_S:
+            return
+        self._last_alert[kind] = now
+        if self.logger:
+            self.logger(f"[PERF] Budget exceeded kind={kind} {msg}")
+
+    def summary(self) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        for name, st in self.stats.items():
+            if len(st):
+                out[name] = {
+                    "stats": st.summary(),
+                    "hist": self.hists[name].as_dict(),
+                    "over_budget": self.over_budget.get(name, 0),
+                }
+        return out
+
+    def summary_lines(self) -> List[str]:
+        lines = [
+            f"[PERF] ticks={self.ticks} tick[{fmt_summary(self.stats['tick'].summary())}] "
+            f"lag[{fmt_summary(self.stats['lag'].summary())}] "
+            f"commit[{fmt_summary(self.stats['commit'].summary())}] "
+            f"over_budget={self.over_budget or {}}",
+            f"[PERF] tick_hist {self.hists['tick'].compact()} | lag_hist {self.hists['lag'].compact()}",
+        ]
+        phases = []
+        for name in TICK_PHASES:
+            s = self.stats[name].summary(pcts=(50, 95))
+            if s.get("n"):
+                phases.append(f"{name}(p95={s['p95']:.1f} max={s['max']:.1f})")
+        if phases:
+            lines.append("[PERF] phases_ms " + " ".join(phases))
+        tasks = []
+        for name, st in sorted(self.stats.items()):
+            if name.startswith("task.") and len(st):
+                s = st.summary(pcts=(95,))
+                tasks.append(f"{name[5:]}(n={int(s['n'])} p95={s['p95']:.1f} max={s['max']:.1f})")
+        if tasks:
+            lines.append("[PERF] tasks_ms " + " ".join(tasks))
+        return lines
+
+    def log_summary(self) -> None:
+        self._last_summary = time.monotonic()
+        if not self.logger:
+            return
+        for line in self.summary_lines():
+            self.logger(line)
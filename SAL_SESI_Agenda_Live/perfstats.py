@@ -0,0 +1,78 @@
+# perfstats.py
+# SAL - Estatísticas simples de desempenho (percentis / janela móvel)
+# Só stdlib. Usado pelos harnesses de benchmark e pela instrumentação do cliente de clima.
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: Iterable[float], p: float) -> Optional[float]:
+    """
+    Percentil com interpolação linear (p em 0..100).
+    Retorna None para lista vazia.
+    """
+    data = sorted(values)
+    if not data:
+        return None
+    if len(data) == 1:
+        return float(data[0])
+    p = max(0.0, min(100.0, float(p)))
+    k = (len(data) - 1) * (p / 100.0)
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    frac = k - lo
+    return float(data[lo] + (data[hi] - data[lo]) * frac)
+
+
+def summarize(values: Iterable[float], pcts=(50, 90, 95, 99)) -> Dict[str, float]:
+    """
+    Resumo: n, min, max, mean e pXX.
+    Lista vazia → {"n": 0}.
+    """
+    data = sorted(values)
+    if not data:
+        return {"n": 0}
+    out: Dict[str, float] = {
+        "n": len(data),
+        "min": float(data[0]),
+        "max": float(data[-1]),
+        "mean": float(sum(data) / len(data)),
+    }
+    for p in pcts:
+        out[f"p{p}"] = percentile(data, p)  # type: ignore[assignment]
+    return out
+
+
+def fmt_summary(s: Dict[str, float], unit: str = "ms", keys=("p50", "p95", "max")) -> str:
+    """Formata um resumo em 'p50=1.2ms p95=3.4ms max=9.0ms' (para log)."""
+    if not s or not s.get("n"):
+        return "n=0"
+    parts = [f"n={int(s['n'])}"]
+    for k in keys:
+        v = s.get(k)
+        if v is not None:
+            parts.append(f"{k}={v:.1f}{unit}")
+    return " ".join(parts)
+
+
+class RollingStats:
+    """
+    Janela móvel dos últimos N valores (deque com maxlen).
+    Barato para add(); o custo de ordenar fica no summary().
+    """
+    def __init__(self, maxlen: int = 100):
+        self._values: deque = deque(maxlen=maxlen)
+
+    def add(self, value: float) -> None:
+        self._values.append(float(value))
+
+    def values(self) -> List[float]:
+        return list(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def summary(self, pcts=(50, 90, 95, 99)) -> Dict[str, float]:
+        return summarize(self._values, pcts=pcts)
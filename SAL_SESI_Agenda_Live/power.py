@@ -0,0 +1,138 @@
+# power.py
+# SAL - Perfil de energia do quiosque (PCs sempre ligados)
+# Modos:
+# - full   → UI completa, tick de 1s, clima, animações
+# - hidden → clube aberto mas janela não visível (minimizada/encoberta): tick lento, sem animações
+# - closed → fora do horário: tela mínima, tick lento, sem clima/animações (opcional: apagar o monitor)
+# O horário vem das mesmas regras do card de horários (HOURS_ITEMS no sal.py):
+# ativo = [abertura - POWER_WAKE_BEFORE_MIN, fechamento + POWER_GRACE_AFTER_MIN), pela união dos itens.
+# Só stdlib; apagar o monitor é melhor esforço (Windows: SC_MONITORPOWER; X11: xset dpms).
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+POWER_WAKE_BEFORE_MIN = 15       # volta ao modo completo 15 min antes de abrir
+POWER_GRACE_AFTER_MIN = 10       # segura o modo completo um pouco depois de fechar
+POWER_LOW_TICK_S = 60.0          # tick nos modos econômicos (relógio HH:MM)
+
+# SAL_LOWPOWER=0 desliga o perfil (sempre full); SAL_LOWPOWER_BLANK=1 apaga o monitor quando fechado
+POWER_ENABLED = os.environ.get("SAL_LOWPOWER", "1").strip() != "0"
+POWER_BLANK = os.environ.get("SAL_LOWPOWER_BLANK", "").strip() == "1"
+
+MODE_FULL = "full"
+MODE_HIDDEN = "hidden"
+MODE_CLOSED = "closed"
+
+DAY_CODES = ("SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM")   # datetime.weekday()
+
+
+def _hhmm_to_min(s: Optional[str]) -> Optional[int]:
+    if not s:
+        return None
+    try:
+        hh, mm = str(s).strip().split(":")[:2]
+        return int(hh) * 60 + int(mm)
+    except Exception:
+        return None
+
+
+class OpeningHours:
+    """
+    Janela de funcionamento por dia = união (menor abertura, maior fechamento) dos itens.
+    items: [{"name": ..., "rules": {"SEG": ("06:00", "22:00"), ..., "DOM": (None, None)}}, ...]
+    """
+    def __init__(self, items: List[dict]):
+        self._by_day: Dict[str, Tuple[int, int]] = {}
+        for code in DAY_CODES:
+            opens: List[int] = []
+            closes: List[int] = []
+            for it in items:
+                o, c = it.get("rules", {}).get(code, (None, None))
+                om, cm = _hhmm_to_min(o), _hhmm_to_min(c)
+                if om is not None and cm is not None and om < cm:
+                    opens.append(om)
+                    closes.append(cm)
+            if opens:
+                self._by_day[code] = (min(opens), max(closes))
+
+    def window(self, day: datetime) -> Optional[Tuple[datetime, datetime]]:
+        w = self._by_day.get(DAY_CODES[day.weekday()])
+        if not w:
+            return None
+        midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(minutes=w[0]), midnight + timedelta(minutes=w[1])
+
+    def is_active(self, now: datetime, before_min: int = 0, after_min: int = 0) -> bool:
+        # ontem entra na conta se a folga depois do fechamento passar da meia-noite
+        for d in (now - timedelta(days=1), now):
+            w = self.window(d)
+            if w and w[0] - timedelta(minutes=before_min) <= now < w[1] + timedelta(minutes=after_min):
+                return True
+        return False
+
+    def next_open(self, now: datetime) -> Optional[datetime]:
+        """Próxima abertura estritamente depois de now (até 8 dias à frente)."""
+        for i in range(0, 8):
+            w = self.window(now + timedelta(days=i))
+            if w and w[0] > now:
+                return w[0]
+        return None
+
+
+class PowerPolicy:
+    """mode(now, visible) → MODE_FULL | MODE_HIDDEN | MODE_CLOSED."""
+    def __init__(self, hours: OpeningHours,
+                 wake_before_min: int = POWER_WAKE_BEFORE_MIN,
+                 grace_after_min: int = POWER_GRACE_AFTER_MIN,
+                 enabled: bool = POWER_ENABLED):
+        self.hours = hours
+        self.wake_before_min = wake_before_min
+        self.grace_after_min = grace_after_min
+        self.enabled = enabled
+
+    def mode(self, now: datetime, visible: bool = True) -> str:
+        if not self.enabled:
+            return MODE_FULL
+        if not self.hours.is_active(now, self.wake_before_min, self.grace_after_min):
+            return MODE_CLOSED
+        if not visible:
+            return MODE_HIDDEN
+        return MODE_FULL
+
+
+def display_power(on: bool, logger=None) -> bool:
+    """
+    Liga/desliga o monitor (melhor esforço).
+    - Windows: PostMessage(HWND_BROADCAST, WM_SYSCOMMAND, SC_MONITORPOWER, 2/-1)
+      (Post, não Send: uma janela travada de outro app não pode travar o SAL)
+    - X11: xset dpms force off/on
+    """
+    try:
+        if sys.platform.startswith("win"):
+            import ctypes
+            HWND_BROADCAST = 0xFFFF
+            WM_SYSCOMMAND = 0x0112
+            SC_MONITORPOWER = 0xF170
+            ctypes.windll.user32.PostMessageW(HWND_BROADCAST, WM_SYSCOMMAND, SC_MONITORPOWER, 2 if not on else -1)
+            if on:
+                # alguns drivers só acordam com "input": mexe o mouse 0px
+                ctypes.windll.user32.mouse_event(0x0001, 0, 0, 0, 0)
+            return True
+        if os.environ.get("DISPLAY") and shutil.which("xset"):
+            subprocess.run(["xset", "dpms", "force", "on" if on else "off"],
+                           timeout=5, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+    except Exception as e:
+        if logger:
+            logger(f"[POWER] Display power error {type(e).__name__}: {e}")
+        return False
+    if logger:
+        logger("[POWER] Display power not supported on this platform")
+    return False
@@ -0,0 +1,321 @@
+# profiling.py
+# SAL - Perfil sob demanda no próprio quiosque (sem anexar profiler de fora)
+# Desligado por padrão: sem nada armado, cada gancho custa 1 consulta a um dict vazio.
+# Alvos (cProfile, acumula N execuções e grava 1 perfil):
+# - ticks      N execuções do _tick (padrão 300 ≈ 5 min)
+# - excel      leitura do grade.xlsx (_reload_excel_if_needed força a releitura quando armado)
+# - weather    busca do clima (thread do worker)
+# - sample     amostrador de pilhas (sys._current_frames a cada PROFILE_SAMPLE_MS na thread do Tk);
+#              overhead baixo para deixar ligado — N = segundos (0 = até desligar)
+# Como armar:
+# - ambiente:   SAL_PROFILE="ticks:300,excel,weather:2,sample:600"
+# - arquivo:    DATA_DIR/profile.flag com o mesmo texto (lido 1x por minuto e apagado)
+# - atalho:     Ctrl+Alt+Shift+P → ticks:300 | Ctrl+Alt+Shift+S → liga/desliga o amostrador
+# Saída em DATA_DIR/profiles: <stamp>_<alvo>.prof (pstats/snakeviz) + .txt (top cumulativo/próprio);
+# amostrador: <stamp>_sample.folded (flamegraph.pl / speedscope) + .txt (top funções).
+# ✅ 1 cProfile ativo por vez (Python 3.12+ recusa o segundo) → alvo fica armado para a próxima vez
+# ✅ mantém só os PROFILE_KEEP arquivos mais novos
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+PROFILE_TARGETS = ("ticks", "excel", "weather", "sample")
+PROFILE_DEFAULT_COUNT = {"ticks": 300, "excel": 1, "weather": 1, "sample": 0}
+PROFILE_SAMPLE_MS = 10.0           # 100 Hz só na thread do Tk
+PROFILE_SAMPLE_FLUSH_S = 300.0     # amostrador contínuo grava a cada 5 min
+PROFILE_SAMPLE_MAX_STACKS = 20_000 # pilhas distintas (acima disso agrega em "<outras>")
+PROFILE_SAMPLE_DEPTH = 64
+PROFILE_TOP_N = 40
+PROFILE_KEEP = 40
+
+
+def parse_spec(spec: str) -> Dict[str, int]:
+    """'ticks:300,excel,sample' → {'ticks': 300, 'excel': 1, 'sample': 0}; alvos desconhecidos são ignorados."""
+    out: Dict[str, int] = {}
+    for part in (spec or "").replace(";", ",").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, n = part.partition(":")
+        name = name.strip()
+        if name not in PROFILE_TARGETS:
+            continue
+        try:
+            out[name] = int(n) if n.strip() else PROFILE_DEFAULT_COUNT[name]
+        except ValueError:
+            out[name] = PROFILE_DEFAULT_COUNT[name]
+    return out
+
+
+def _stamp() -> str:
+    return time.strftime("%Y%m%d_%H%M%S")
+
+
+# -------------------------
+# Amostrador de pilhas
+# -------------------------
+
+class StackSampler:
+    """Thread daemon que lê a pilha de 1 thread (a do Tk) a intervalos fixos e conta pilhas iguais."""
+
+    def __init__(self, thread_id: int, interval_ms: float = PROFILE_SAMPLE_MS):
+        self.thread_id = thread_id
+        self.interval_s = max(0.001, interval_ms / 1000.0)
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self.samples = 0
+        self.started = time.time()
+        self._stop = threading.Event()
+        self._th: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._th = threading.Thread(target=self._run, name="sal-sampler", daemon=True)
+        self._th.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._th is not None:
+            self._th.join(timeout=1.0)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self.thread_id == me:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILE_SAMPLE_DEPTH:
+                co = frame.f_code
+                stack.append(f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})")
+                frame = frame.f_back
+            key = tuple(reversed(stack))
+            with self._lock:
+                if key not in self.stacks and len(self.stacks) >= PROFILE_SAMPLE_MAX_STACKS:
+                    key = ("<outras>",)
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def drain(self) -> Tuple[Dict[Tuple[str, ...], int], int, float]:
+        """(pilhas, amostras, segundos) desde o último drain; zera os contadores."""
+        with self._lock:
+            stacks, n, t0 = self.stacks, self.samples, self.started
+            self.stacks, self.samples, self.started = {}, 0, time.time()
+        return stacks, n, time.time() - t0
+
+
+def sample_report(stacks: Dict[Tuple[str, ...], int], samples: int, seconds: float) -> str:
+    own: Dict[str, int] = {}
+    incl: Dict[str, int] = {}
+    for stack, n in stacks.items():
+        if stack:
+            own[stack[-1]] = own.get(stack[-1], 0) + n
+        for fn in set(stack):
+            incl[fn] = incl.get(fn, 0) + n
+    total = max(1, samples)
+    lines = [f"samples={samples} seconds={seconds:.1f} stacks={len(stacks)}", "",
+             f"Top {PROFILE_TOP_N} (próprio):"]
+    for fn, n in sorted(own.items(), key=lambda kv: kv[1], reverse=True)[:PROFILE_TOP_N]:
+        lines.append(f"  {100.0 * n / total:6.2f}%  {n:>7}  {fn}")
+    lines += ["", f"Top {PROFILE_TOP_N} (inclusivo):"]
+    for fn, n in sorted(incl.items(), key=lambda kv: kv[1], reverse=True)[:PROFILE_TOP_N]:
+        lines.append(f"  {100.0 * n / total:6.2f}%  {n:>7}  {fn}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------------
+# Ganchos
+# -------------------------
+
+class ProfileHooks:
+    """
+    No app:
+        PROF.run("ticks", self._tick)            # sem alvo armado → só chama fn()
+        PROF.run("excel", load_classes_from_excel, path)
+    """
+
+    def __init__(self, out_dir: str, logger=None, tk_thread_id: Optional[int] = None):
+        self.out_dir = out_dir
+        self.logger = logger
+        self.tk_thread_id = tk_thread_id or threading.main_thread().ident
+        self.pending: Dict[str, int] = {}        # alvo → execuções restantes (vazio = desligado)
+        self._prof: Dict[str, cProfile.Profile] = {}
+        self._runs: Dict[str, int] = {}
+        self._t0: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.sampler: Optional[StackSampler] = None
+        self._sample_until = 0.0
+        self._sample_flush_at = 0.0
+
+    def _log(self, msg: str) -> None:
+        if self.logger:
+            self.logger(msg)
+
+    # ---- armar ----
+
+    def arm(self, target: str, count: Optional[int] = None, source: str = "api") -> None:
+        if target not in PROFILE_TARGETS:
+            return
+        n = PROFILE_DEFAULT_COUNT[target] if count is None else int(count)
+        if target == "sample":
+            self.start_sampler(n, source)
+            return
+        with self._lock:
+            self.pending[target] = max(1, n)
+        self._log(f"[PROF] Armed target={target} runs={max(1, n)} source={source}")
+
+    def apply_spec(self, spec: str, source: str = "env") -> None:
+        for target, n in parse_spec(spec).items():
+            self.arm(target, n, source)
+
+    def check_flag_file(self, path: str) -> bool:
+        """profile.flag → arma e apaga (1 os.path.exists por chamada quando não existe)."""
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                spec = f.read()
+            os.remove(path)
+        except Exception as e:
+            self._log(f"[PROF] Flag file error {type(e).__name__}: {e}")
+            return False
+        self.apply_spec(spec or "ticks", source="flag")
+        return True
+
+    # ---- cProfile ----
+
+    def run(self, target: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if target not in self.pending:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            prof = self._prof.get(target)
+            if prof is None:
+                prof = self._prof[target] = cProfile.Profile()
+                self._runs[target] = 0
+                self._t0[target] = time.time()
+        try:
+            prof.enable()
+        except ValueError as e:   # outro cProfile ativo (3.12+)
+            self._log(f"[PROF] Skipped target={target} reason={e}")
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            self._after_run(target)
+
+    def _after_run(self, target: str) -> None:
+        with self._lock:
+            self._runs[target] += 1
+            left = self.pending.get(target, 1) - 1
+            if left > 0:
+                self.pending[target] = left
+                return
+            self.pending.pop(target, None)
+            prof = self._prof.pop(target)
+            runs = self._runs.pop(target)
+            wall = time.time() - self._t0.pop(target)
+        self._dump_profile(target, prof, runs, wall)
+
+    def _dump_profile(self, target: str, prof: cProfile.Profile, runs: int, wall: float) -> None:
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            base = os.path.join(self.out_dir, f"{_stamp()}_{target}")
+            prof.dump_stats(base + ".prof")
+            buf = io.StringIO()
+            buf.write(f"target={target} runs={runs} wall_s={wall:.1f}\n\n")
+            st = pstats.Stats(prof, stream=buf).strip_dirs()
+            st.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            st.sort_stats("tottime").print_stats(PROFILE_TOP_N)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(buf.getvalue())
+            self._log(f"[PROF] Saved target={target} runs={runs} path={base}.prof")
+            self.prune()
+        except Exception as e:
+            self._log(f"[PROF] Save error target={target} {type(e).__name__}: {e}")
+
+    # ---- amostrador ----
+
+    def start_sampler(self, seconds: int = 0, source: str = "api") -> None:
+        if self.sampler is not None:
+            return
+        self.sampler = StackSampler(self.tk_thread_id)
+        self.sampler.start()
+        now = time.time()
+        self._sample_until = now + seconds if seconds > 0 else 0.0
+        self._sample_flush_at = now + PROFILE_SAMPLE_FLUSH_S
+        self._log(f"[PROF] Sampler on interval_ms={PROFILE_SAMPLE_MS:.0f} seconds={seconds or 'inf'} source={source}")
+
+    def stop_sampler(self) -> None:
+        s = self.sampler
+        if s is None:
+            return
+        self.sampler = None
+        s.stop()
+        self._flush_sampler(s)
+        self._log("[PROF] Sampler off")
+
+    def toggle_sampler(self) -> None:
+        if self.sampler is None:
+            self.start_sampler(0, source="hotkey")
+        else:
+            self.stop_sampler()
+
+    def poll(self) -> None:
+        """Chamado 1x por minuto: fim do tempo do amostrador / gravação periódica."""
+        s = self.sampler
+        if s is None:
+            return
+        now = time.time()
+        if self._sample_until and now >= self._sample_until:
+            self.stop_sampler()
+        elif now >= self._sample_flush_at:
+            self._sample_flush_at = now + PROFILE_SAMPLE_FLUSH_S
+            self._flush_sampler(s)
+
+    def _flush_sampler(self, s: StackSampler) -> None:
+        stacks, n, secs = s.drain()
+        if not n:
+            return
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            base = os.path.join(self.out_dir, f"{_stamp()}_sample")
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, c in sorted(stacks.items(), key=lambda kv: kv[1], reverse=True):
+                    f.write(";".join(stack) + f" {c}\n")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(sample_report(stacks, n, secs))
+            self._log(f"[PROF] Saved sampler samples={n} seconds={secs:.0f} path={base}.folded")
+            self.prune()
+        except Exception as e:
+            self._log(f"[PROF] Sampler save error {type(e).__name__}: {e}")
+
+    # ---- limpeza ----
+
+    def prune(self) -> int:
+        removed = 0
+        try:
+            files = []
+            for name in os.listdir(self.out_dir):
+                p = os.path.join(self.out_dir, name)
+                if os.path.isfile(p):
+                    files.append((os.path.getmtime(p), p))
+            files.sort(reverse=True)
+            for _m, p in files[PROFILE_KEEP:]:
+                try:
+                    os.remove(p)
+                    removed += 1
+                except Exception:
+                    pass
+        except Exception:
+            pass
+        return removed
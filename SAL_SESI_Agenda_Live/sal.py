@@ -3,30 +3,75 @@
 # Layout: Header (Logo + Date/Time/Weekday + Hours/Weather). Body: 2 big columns (AGORA | PRÓXIMAS).
 # Assets: graphics/logo_day(.png), graphics/logo_night(.png), graphics/*.png (icons)
 # Logs (gravável): %LOCALAPPDATA%/SAL_SESI_Agenda_Live/logs/sal.log
-# Cache clima (gravável): %LOCALAPPDATA%/SAL_SESI_Agenda_Live/package/weather_cache.json (+ package/cache_old/*.json)
+# Cache clima (gravável): %LOCALAPPDATA%/SAL_SESI_Agenda_Live/package/weather_cache.json (+ package/weather_history/seg_*.gz)
 # Excel: grade.xlsx (no APP_DIR)
+# Dependências: requirements.txt (openpyxl; Pillow para logo/ícones no tamanho exato)
 
 from __future__ import annotations
 
+import math
 import os
 import sys
 import time
 import traceback
 import threading
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import asdict
 from typing import List, Optional, Tuple, Any
 
 import tkinter as tk
 import tkinter.font as tkfont  # UI: auto-fit fonts
-from openpyxl import load_workbook
 
+import clock as clock_mod
+from agenda_engine import (  # motor da agenda sem Tk (também usado por simulate.py, CLI, benchmarks)
+    HOURS_ITEMS, NEXT_WINDOW_MIN, ClassItem, compute_now_next, day_code, hours_labels, is_day_theme,
+    load_classes_from_excel,
+)
 import weather as weather_mod
+from assets import AssetManager
+from healthmon import HEALTH_INTERVAL_S, HealthMonitor
+from perfmon import FrameMonitor
+from profiling import ProfileHooks
+from sal_backend import BackendClient
+from scheduler import Scheduler
+from watchdog import WATCHDOG_BEAT_S, HangWatchdog, collect_previous_dump, read_state
+from power import (
+    MODE_CLOSED, MODE_FULL, POWER_BLANK, POWER_LOW_TICK_S,
+    OpeningHours, PowerPolicy, display_power,
+)
 
-from datetime import datetime, timedelta, date as dt_date, time as dt_time
+from datetime import timedelta
 
 
 SAL_UI_BUILD = "UI_BUILD_2026-02-11A"
 
+# cadências das tarefas do scheduler (tick/tema/rotação de horários ficam no SALApp)
+EXCEL_CHECK_INTERVAL_S = 5.0     # mtime do grade.xlsx
+WEATHER_REFRESH_S = 600.0        # 10 min
+HOUSEKEEPING_AT = "03:30"        # local, fora do horário de funcionamento
+# SAL_HEALTH_INTERVAL_S=60 → amostras de saúde mais frequentes (teste de vazamento acelerado)
+# SAL_BACKEND=process → Excel/clima/AGORA-PRÓXIMAS num processo separado (sal_backend.py)
+BACKEND_MODE = os.environ.get("SAL_BACKEND", "").strip().lower()
+BACKEND_POLL_S = 0.5
+# SAL_DNS_PREFETCH=0 → sem resolução DNS em fundo no boot (headless.py desliga: execução sem rede)
+DNS_PREFETCH = os.environ.get("SAL_DNS_PREFETCH", "").strip() != "0"
+HEALTH_MIN_SAMPLE_S = 10.0        # piso: valor inválido/≤0 no ambiente não derruba o boot
+try:
+    HEALTH_SAMPLE_S = float(os.environ.get("SAL_HEALTH_INTERVAL_S", "").strip() or HEALTH_INTERVAL_S)
+except ValueError:
+    HEALTH_SAMPLE_S = HEALTH_INTERVAL_S
+if not math.isfinite(HEALTH_SAMPLE_S):
+    HEALTH_SAMPLE_S = HEALTH_INTERVAL_S
+HEALTH_SAMPLE_S = max(HEALTH_MIN_SAMPLE_S, HEALTH_SAMPLE_S)
+
+
+WEATHER_ARGS = dict(
+    city_label="Alfenas",
+    lat=-21.4267,
+    lon=-45.9470,
+    user_agent="SAL-SESIAgendaLive/2.0 (contact: local)",
+)
+
 
 # -------------------------
 # Paths / Logging
@@ -65,6 +110,17 @@ LOGS_DIR = os.path.join(DATA_DIR, "logs")
 os.makedirs(LOGS_DIR, exist_ok=True)
 LOG_PATH = os.path.join(LOGS_DIR, "sal.log")
 
+# amostras de saúde (memória/handles) → health_YYYY-MM.jsonl
+HEALTH_DIR = os.path.join(DATA_DIR, "health")
+
+# perfis sob demanda (SAL_PROFILE / profile.flag / atalho) → profiles/*.prof|.txt|.folded
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+PROFILE_FLAG_PATH = os.path.join(DATA_DIR, "profile.flag")
+
+# travamento do loop Tk: dump das pilhas (faulthandler) + estado para o reinício
+HANG_DUMP_PATH = os.path.join(LOGS_DIR, "hang.log")
+STATE_PATH = os.path.join(DATA_DIR, "state.json")
+
 # rotação/limpeza de logs
 LOG_ARCHIVE_DIR = os.path.join(LOGS_DIR, "archive")
 os.makedirs(LOG_ARCHIVE_DIR, exist_ok=True)
@@ -175,60 +231,15 @@ def _debounce_after(widget: tk.Misc, attr_name: str, delay_ms: int, fn):
 
 
 # -------------------------
-# Data model
+# Time helpers ("agora" vem do clock.py)
 # -------------------------
 
-@dataclass
-class ClassItem:
-    day: str          # SEG TER QUA QUI SEX SAB DOM
-    start: str        # HH:MM
-    end: str          # HH:MM
-    activity: str
-    teacher: str
-    location: str
-    tag: str          # MENOR/GERAL/...
-
-
-# -------------------------
-# Time parsing helpers (tolerante)
-# -------------------------
-
-def parse_hhmm(s: str) -> Optional[int]:
-    """
-    Aceita:
-    - "HH:MM"
-    - "HH:MM:SS"
-    """
-    try:
-        s = str(s).strip()
-        if not s:
-            return None
-        parts = s.split(":")
-        if len(parts) < 2:
-            return None
-        hh = int(parts[0])
-        mm = int(parts[1])
-        if 0 <= hh <= 23 and 0 <= mm <= 59:
-            return hh * 60 + mm
-        return None
-    except Exception:
-        return None
-
-
-def _parse_time_obj(s: str) -> Optional[dt_time]:
-    m = parse_hhmm(s)
-    if m is None:
-        return None
-    return dt_time(hour=m // 60, minute=m % 60)
-
-
 def today_3letters_noaccent() -> str:
-    wd = time.localtime().tm_wday  # Monday=0
-    return ["SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM"][wd]
+    return day_code(clock_mod.now())
 
 
 def weekday_full_noaccent() -> str:
-    wd = time.localtime().tm_wday
+    wd = clock_mod.localtime().tm_wday
     return [
         "SEGUNDA-FEIRA",
         "TERCA-FEIRA",
@@ -241,7 +252,7 @@ def weekday_full_noaccent() -> str:
 
 
 def date_time_strings() -> Tuple[str, str, str]:
-    lt = time.localtime()
+    lt = clock_mod.localtime()
     date_s = time.strftime("%d/%m/%Y", lt)
     time_s = time.strftime("%H:%M:%S", lt)  # com segundos (relógio do cabeçalho)
     wd_s = weekday_full_noaccent()
@@ -249,139 +260,30 @@ def date_time_strings() -> Tuple[str, str, str]:
 
 
 def theme_is_day() -> bool:
-    h = time.localtime().tm_hour
-    return 6 <= h <= 17
-
-
-def fmt_hhmm(mins: Optional[int]) -> str:
-    if mins is None:
-        return "—"
-    hh = mins // 60
-    mm = mins % 60
-    if mm == 0:
-        return f"{hh:02d}H"
-    return f"{hh:02d}:{mm:02d}"
+    return is_day_theme(clock_mod.now())
 
 
 # -------------------------
-# Excel read
+# Excel (leitura: agenda_engine.load_classes_from_excel)
 # -------------------------
 
 EXCEL_PATH = os.path.join(APP_DIR, "grade.xlsx")
-SHEET_NAME = "SAL"
-EXPECTED_HEADERS = ["DIA", "INICIO", "FIM", "ATIVIDADE", "PROFESSOR", "LOCAL", "TAG"]
-
-
-def _normalize_header(v: object) -> str:
-    return str(v or "").strip().upper()
-
-
-def load_classes_from_excel(path: str) -> List[ClassItem]:
-    wb = load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Aba '{SHEET_NAME}' não encontrada.")
-    ws = wb[SHEET_NAME]
-
-    header_row = None
-    headers: List[str] = []
-    for r in range(1, 6):
-        vals = [_normalize_header(ws.cell(row=r, column=c).value) for c in range(1, 30)]
-        if "DIA" in vals and "INICIO" in vals and "FIM" in vals:
-            header_row = r
-            headers = vals
-            break
-    if header_row is None:
-        header_row = 1
-        headers = [_normalize_header(ws.cell(row=1, column=c).value) for c in range(1, 30)]
-
-    def col_idx(name: str) -> Optional[int]:
-        name = name.upper()
-        if name in headers:
-            return headers.index(name) + 1
-        return None
-
-    c_dia = col_idx("DIA")
-    c_ini = col_idx("INICIO")
-    c_fim = col_idx("FIM")
-    c_ativ = col_idx("ATIVIDADE")
-    c_prof = col_idx("PROFESSOR")
-    c_loc = col_idx("LOCAL")
-    c_tag = col_idx("TAG")
-
-    if not (c_dia and c_ini and c_fim and c_ativ):
-        raise RuntimeError("Cabeçalhos necessários não encontrados na aba SAL.")
-
-    items: List[ClassItem] = []
-    for r in range(header_row + 1, ws.max_row + 1):
-        dia = str(ws.cell(row=r, column=c_dia).value or "").strip().upper()
-        ini = str(ws.cell(row=r, column=c_ini).value or "").strip()
-        fim = str(ws.cell(row=r, column=c_fim).value or "").strip()
-        ativ = str(ws.cell(row=r, column=c_ativ).value or "").strip()
-
-        if not dia or not ini or not fim or not ativ:
-            continue
-
-        prof = str(ws.cell(row=r, column=c_prof).value or "").strip() if c_prof else ""
-        loc = str(ws.cell(row=r, column=c_loc).value or "").strip() if c_loc else ""
-        tag = str(ws.cell(row=r, column=c_tag).value or "").strip().upper() if c_tag else ""
-
-        items.append(ClassItem(dia, ini, fim, ativ, prof, loc, tag))
-
-    return items
 
 
 # -------------------------
-# Day mapping + midnight-safe datetime placement
+# Weather icon mapping
 # -------------------------
 
-DAY_TO_WD = {"SEG": 0, "TER": 1, "QUA": 2, "QUI": 3, "SEX": 4, "SAB": 5, "DOM": 6}
-
-
-def _best_date_for_daycode(now: datetime, day_code: str) -> Optional[dt_date]:
-    dc = (day_code or "").strip().upper()
-    if dc not in DAY_TO_WD:
-        return None
-    target_wd = DAY_TO_WD[dc]
-    candidates = [now.date() - timedelta(days=1), now.date(), now.date() + timedelta(days=1)]
-    for d in candidates:
-        if d.weekday() == target_wd:
-            return d
-    return now.date()
-
-
-def _item_interval_debug(now: datetime, it: ClassItem) -> Tuple[Optional[Tuple[datetime, datetime]], str]:
-    base_date = _best_date_for_daycode(now, it.day)
-    if base_date is None:
-        return None, "invalid_day"
-
-    t_start = _parse_time_obj(it.start)
-    t_end = _parse_time_obj(it.end)
-    if t_start is None or t_end is None:
-        return None, "invalid_time"
-
-    start_dt = datetime.combine(base_date, t_start)
-    end_dt = datetime.combine(base_date, t_end)
+# graphics/ indexado 1x; variantes no tamanho exato em DATA_DIR/asset_cache
+ASSETS = AssetManager(GRAPHICS_DIR, DATA_DIR, logger=log)
 
-    if end_dt <= start_dt:
-        end_dt = end_dt + timedelta(days=1)
+LOGO_BOX = (300, 220)      # logo do cabeçalho (antes: subsample até ~300 px de largura)
+ICON_BOX = (72, 72)        # ícone do clima (antes: subsample até ~72 px)
+WEATHER_ICONS = ("sun", "clouds", "cloudy", "rainy-day", "storm", "snowflake")
 
-    return (start_dt, end_dt), "ok"
-
-
-# -------------------------
-# Weather icon mapping
-# -------------------------
 
 def _img_path_try(base: str) -> Optional[str]:
-    candidates = [
-        os.path.join(GRAPHICS_DIR, base),
-        os.path.join(GRAPHICS_DIR, base + ".png"),
-        os.path.join(GRAPHICS_DIR, base + ".PNG"),
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
+    return ASSETS.path(base, base + ".png", base + ".PNG")
 
 
 def map_symbol_to_icon(symbol_code: Optional[str]) -> str:
@@ -426,13 +328,508 @@ def _get_any(obj: Any, *keys: str, default=None):
     return default
 
 
+# -------------------------
+# Theme (paletas + troca no lugar)
+# -------------------------
+
+# Papéis de cor → valor por tema. Widgets registram (opção → papel) no Theme;
+# na virada dia/noite só as cores mudam (sem destruir/recriar a árvore de widgets).
+THEME_PALETTES = {
+    "day": {
+        "root_bg": "#f5f7fb",
+        "fg_primary": "#0b2d4d",
+        "fg_soft": "#5c6f86",
+        "border_soft": "#cfd8e5",
+        "div_hi": "#e9eef5",
+        "div_lo": "#b7c3d4",
+        "vdiv": "#1b3a5f",
+
+        "card_bg": "#ffffff",
+        "card_border": "#d7dee8",
+        "card_text1": "#0b2d4d",
+        "card_text2": "#5c6f86",
+        "card_bar_bg": "#e9eef5",
+        "card_stipple": "gray25",
+
+        "section_bg": "#f5f7fb",
+        "section_title": "#1f7ab8",
+        "section_line": "#d5deea",
+        "section_border": "#cfd8e5",
+        "section_inner_hl": "#d0d7e2",
+        "panel_stipple": "gray18",
+
+        "hours_connector": "#d0d7e2",
+        "hours_lines": "#27364a",
+    },
+    "night": {
+        "root_bg": "#06101f",
+        "fg_primary": "#eaf2ff",
+        "fg_soft": "#b9c7dd",
+        "border_soft": "#132744",
+        "div_hi": "#16365f",
+        "div_lo": "#08172c",
+        "vdiv": "#1b3a5f",
+
+        "card_bg": "#0f1a2a",
+        "card_border": "#20324d",
+        "card_text1": "#eaf2ff",
+        "card_text2": "#b9c7dd",
+        "card_bar_bg": "#1d2b41",
+        "card_stipple": "gray12",
+
+        "section_bg": "#06101f",
+        "section_title": "#4aa3ff",
+        "section_line": "#132744",
+        "section_border": "#112645",
+        "section_inner_hl": "#0c2038",
+        "panel_stipple": "gray10",
+
+        "hours_connector": "#16365f",
+        "hours_lines": "#d8e6ff",
+    },
+}
+
+
+class Theme:
+    """
+    Tema atual + registro de quem usa cada papel de cor.
+    - bind(widget, bg="card_bg", fg="card_text1") → aplica já e reaplica na troca
+    - bind_item(canvas, tag, fill="card_bg")      → idem para itens de canvas (1 itemconfig por tag)
+    - on_change(fn) → fn(theme) na troca (canvas, imagens, etc.)
+    - set_day(bool) → recolore tudo no lugar (um único passe)
+    """
+    def __init__(self, is_day: bool):
+        self.is_day = is_day
+        self.palette = THEME_PALETTES["day" if is_day else "night"]
+        self._bindings: List[Tuple[tk.Misc, dict, Optional[str]]] = []
+        self._listeners: List[Any] = []
+
+    @property
+    def name(self) -> str:
+        return "day" if self.is_day else "night"
+
+    def __getitem__(self, role: str) -> str:
+        return self.palette[role]
+
+    def bind(self, widget: tk.Misc, **roles: str) -> None:
+        self._bindings.append((widget, roles, None))
+        self._apply_binding(widget, roles, None)
+
+    def bind_item(self, canvas: tk.Canvas, tag: str, **roles: str) -> None:
+        self._bindings.append((canvas, roles, tag))
+        self._apply_binding(canvas, roles, tag)
+
+    def on_change(self, fn) -> None:
+        self._listeners.append(fn)
+
+    def _apply_binding(self, widget: tk.Misc, roles: dict, tag: Optional[str]) -> bool:
+        opts = {opt: self.palette[role] for opt, role in roles.items()}
+        try:
+            if tag is None:
+                widget.configure(**opts)
+            else:
+                widget.itemconfigure(tag, **opts)
+            return True
+        except tk.TclError:
+            return False   # widget destruído
+
+    def set_day(self, is_day: bool) -> bool:
+        if is_day == self.is_day:
+            return False
+        self.is_day = is_day
+        self.palette = THEME_PALETTES[self.name]
+
+        alive = []
+        for widget, roles, tag in self._bindings:
+            if self._apply_binding(widget, roles, tag):
+                alive.append((widget, roles, tag))
+        self._bindings = alive
+
+        for fn in list(self._listeners):
+            try:
+                fn(self)
+            except tk.TclError:
+                self._listeners.remove(fn)
+        return True
+
+
+# -------------------------
+# View-model (diff + commit em lote)
+# -------------------------
+
+class ViewModel:
+    """
+    Estado desejado da tela (chave → valor) comparado com o último estado enviado ao Tk.
+    - set(key, value, apply) → se o valor difere do já comprometido, marca a chave como suja
+    - as chaves sujas são aplicadas juntas num único after_idle (1 commit por frame)
+    Tela parada = nenhum configure; no dia a dia sobra só o relógio.
+    """
+    def __init__(self, widget: tk.Misc, monitor: Optional[FrameMonitor] = None):
+        self._widget = widget
+        self._monitor = monitor
+        self._committed: dict = {}
+        self._pending: dict = {}    # key → (value, apply)
+        self._job = None
+
+        self.commits = 0
+        self.pushed = 0
+        self.skipped = 0
+
+    def set(self, key, value, apply) -> None:
+        if key in self._committed and self._committed[key] == value:
+            self._pending.pop(key, None)
+            self.skipped += 1
+            return
+        self._pending[key] = (value, apply)
+        if self._job is None:
+            self._job = self._widget.after_idle(self._commit)
+
+    def reset(self) -> None:
+        """Esquece o estado comprometido (widgets recriados → tudo precisa ser reenviado)."""
+        self._committed.clear()
+
+    def flush(self) -> None:
+        if self._job is not None:
+            try:
+                self._widget.after_cancel(self._job)
+            except Exception:
+                pass
+        self._commit()
+
+    def _commit(self) -> None:
+        self._job = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.commits += 1
+        t0 = time.perf_counter()
+        for key, (value, apply) in pending.items():
+            try:
+                apply(value)
+                self._committed[key] = value
+                self.pushed += 1
+            except Exception as e:
+                log(f"[UI] View commit error key={key} {type(e).__name__}: {e}")
+        if self._monitor is not None:
+            self._monitor.record("commit", (time.perf_counter() - t0) * 1000.0)
+
+    def stats(self) -> dict:
+        return {"commits": self.commits, "pushed": self.pushed, "skipped": self.skipped}
+
+
 # -------------------------
 # UI Widgets
 # -------------------------
 
+def _round_rect_points(x1, y1, x2, y2, r) -> List[float]:
+    """Pontos de controle do retângulo arredondado (create_polygon smooth=True)."""
+    return [
+        x1 + r, y1,
+        x2 - r, y1,
+        x2, y1,
+        x2, y1 + r,
+        x2, y2 - r,
+        x2, y2,
+        x2 - r, y2,
+        x1 + r, y2,
+        x1, y2,
+        x1, y2 - r,
+        x1, y1 + r,
+        x1, y1
+    ]
+
+
+def _ellipsize(font: tkfont.Font, text: str, max_px: int) -> str:
+    """Corta o texto com '…' para caber em max_px (texto de canvas não é recortado)."""
+    return _ellipsize_by(font.measure, text, max_px)
+
+
+def _ellipsize_by(measure, text: str, max_px: int) -> str:
+    if not text or max_px <= 0:
+        return ""
+    if measure(text) <= max_px:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:   # maior prefixo que cabe junto com o '…'
+        mid = (lo + hi + 1) // 2
+        if measure(text[:mid] + "…") <= max_px:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + "…"
+
+
+# -------------------------
+# Text fit (auto-fit memoizado)
+# -------------------------
+
+# Font.measure é uma ida ao Tk (e ao rasterizador de fontes) por chamada; um auto-fit com busca
+# binária faz dezenas delas por texto. Tudo memoizado em LRU limitada:
+# - medidas por (família, tamanho, peso, texto) — dependem só da resolução/escala da tela
+# - resultados de fit por (texto, família, peso, caixa, faixa) + contexto (tema, resolução)
+# → re-layout, rotação do card de horários e troca de tema de volta ≈ só lookups.
+TEXT_FIT_CACHE_MAX = 4096
+
+
+class TextFitter:
+    """
+    fit(master, text, family, weight, box_w, box_h, max_size, min_size)
+        → (tamanho, texto): maior tamanho em [min_size, max_size] em que o texto (multi-linha ok)
+          cabe em box_w x box_h (box_h=0 → só largura); se nem min_size cabe, texto com '…' em min_size.
+    font(master, family, size, weight) → tkfont.Font compartilhada (1 por combinação).
+    """
+    def __init__(self, max_entries: int = TEXT_FIT_CACHE_MAX):
+        self.max_entries = max_entries
+        self._fonts: dict = {}
+        self._linespace: dict = {}
+        self._measures: "OrderedDict[tuple, int]" = OrderedDict()
+        self._fits: "OrderedDict[tuple, Tuple[int, str]]" = OrderedDict()
+        self.theme = ""
+        self.screen: tuple = ()      # (largura, altura, dpi)
+
+        self.hits = 0
+        self.misses = 0
+        self.measure_calls = 0
+
+    def set_context(self, theme: Optional[str] = None, screen: Optional[tuple] = None) -> None:
+        if screen is not None and tuple(screen) != self.screen:
+            # outra resolução (ou escala) → medidas antigas não valem mais
+            self.screen = tuple(screen)
+            self._measures.clear()
+            self._fits.clear()
+            self._linespace.clear()
+        if theme is not None:
+            self.theme = theme
+
+    def font(self, master: tk.Misc, family: str, size: int, weight: str = "normal") -> tkfont.Font:
+        key = (family, int(size), weight)
+        f = self._fonts.get(key)
+        if f is None:
+            f = self._fonts[key] = tkfont.Font(root=master, family=family, size=int(size), weight=weight)
+        return f
+
+    def linespace(self, master: tk.Misc, family: str, size: int, weight: str = "normal") -> int:
+        key = (family, int(size), weight)
+        ls = self._linespace.get(key)
+        if ls is None:
+            ls = self._linespace[key] = int(self.font(master, family, size, weight).metrics("linespace"))
+        return ls
+
+    def measure(self, master: tk.Misc, family: str, size: int, weight: str, text: str) -> int:
+        key = (family, int(size), weight, text)
+        px = self._measures.get(key)
+        if px is not None:
+            self._measures.move_to_end(key)
+            return px
+        self.measure_calls += 1
+        px = self._measures[key] = int(self.font(master, family, size, weight).measure(text))
+        if len(self._measures) > self.max_entries:
+            self._measures.popitem(last=False)
+        return px
+
+    def ellipsize(self, master: tk.Misc, family: str, size: int, weight: str, text: str, max_px: int) -> str:
+        key = ("…", family, int(size), weight, text, int(max_px))
+        hit = self._fits.get(key)
+        if hit is not None:
+            self.hits += 1
+            self._fits.move_to_end(key)
+            return hit[1]
+        self.misses += 1
+        out = _ellipsize_by(lambda t: self.measure(master, family, size, weight, t), text, max_px)
+        self._store(key, (int(size), out))
+        return out
+
+    def fit(self, master: tk.Misc, text: str, family: str, weight: str, box_w: int, box_h: int = 0,
+            max_size: int = 16, min_size: int = 9) -> Tuple[int, str]:
+        key = (self.theme, self.screen, text, family, weight, int(box_w), int(box_h),
+               int(max_size), int(min_size))
+        hit = self._fits.get(key)
+        if hit is not None:
+            self.hits += 1
+            self._fits.move_to_end(key)
+            return hit
+        self.misses += 1
+
+        lines = text.split("\n") if text else [""]
+
+        def fits(size: int) -> bool:
+            if box_h > 0 and self.linespace(master, family, size, weight) * len(lines) > box_h:
+                return False
+            return max(self.measure(master, family, size, weight, ln) for ln in lines) <= box_w
+
+        lo, hi = int(min_size), max(int(min_size), int(max_size))
+        if fits(lo):
+            while lo < hi:   # maior tamanho que cabe (medida cresce com o tamanho)
+                mid = (lo + hi + 1) // 2
+                if fits(mid):
+                    lo = mid
+                else:
+                    hi = mid - 1
+            out = (lo, text)
+        elif len(lines) == 1:
+            out = (lo, _ellipsize_by(lambda t: self.measure(master, family, lo, weight, t), text, box_w))
+        else:
+            out = (lo, text)   # multi-linha: menor tamanho, sem cortar linhas
+        self._store(key, out)
+        return out
+
+    def _store(self, key: tuple, value: Tuple[int, str]) -> None:
+        self._fits[key] = value
+        if len(self._fits) > self.max_entries:
+            self._fits.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"fits": len(self._fits), "measures": len(self._measures), "fonts": len(self._fonts),
+                "hits": self.hits, "misses": self.misses, "measure_calls": self.measure_calls}
+
+
+TEXT_FIT = TextFitter()
+
+
+# -------------------------
+# Panel skins (retângulo arredondado + sombra pré-renderizados)
+# -------------------------
+
+# Polígono smooth + sombra com stipple a cada resize é lento em alguns drivers (Windows/X11).
+# O "skin" é rasterizado 1x numa PhotoImage por (tamanho, raio, cores, sombra) e reaproveitado:
+# 12 cards do mesmo tamanho = 1 imagem; troca de tema de volta = cache hit.
+PANEL_SKIN_CACHE_MAX = 48
+
+
+def _hex_rgb(color: str) -> Tuple[int, int, int]:
+    c = color.lstrip("#")
+    if len(c) == 3:
+        c = "".join(ch * 2 for ch in c)
+    return int(c[0:2], 16), int(c[2:4], 16), int(c[4:6], 16)
+
+
+def _mix(a: Tuple[int, int, int], b: Tuple[int, int, int], t: float) -> Tuple[int, int, int]:
+    return (
+        int(round(a[0] + (b[0] - a[0]) * t)),
+        int(round(a[1] + (b[1] - a[1]) * t)),
+        int(round(a[2] + (b[2] - a[2]) * t)),
+    )
+
+
+def _stipple_alpha(stipple: str) -> float:
+    """'gray25' → 0.25 (a sombra vira cor sólida misturada ao fundo, sem stipple)."""
+    try:
+        return max(0.0, min(1.0, int(str(stipple).replace("gray", "")) / 100.0))
+    except Exception:
+        return 0.25
+
+
+def _rr_sdf(px: float, py: float, x1: float, y1: float, x2: float, y2: float, r: float) -> float:
+    """Distância com sinal (negativa dentro) do ponto ao retângulo arredondado."""
+    hx = (x2 - x1) / 2.0
+    hy = (y2 - y1) / 2.0
+    qx = abs(px - (x1 + hx)) - (hx - r)
+    qy = abs(py - (y1 + hy)) - (hy - r)
+    outside = math.hypot(max(qx, 0.0), max(qy, 0.0))
+    inside = min(max(qx, qy), 0.0)
+    return outside + inside - r
+
+
+def _coverage(sdf: float) -> float:
+    return max(0.0, min(1.0, 0.5 - sdf))
+
+
+def _render_panel_skin(master: tk.Misc, w: int, h: int, radius: int, fill: str, border: str,
+                       canvas_bg: str, shadow_offset: Optional[Tuple[int, int]],
+                       shadow_alpha: float) -> tk.PhotoImage:
+    """
+    Rasteriza fundo + sombra + borda (1px) + preenchimento, com cantos suavizados.
+    Só as faixas dos cantos são calculadas pixel a pixel; o miolo de cada linha
+    e as linhas do meio (todas iguais) são repetidos.
+    """
+    bg_c = _hex_rgb(canvas_bg)
+    fill_c = _hex_rgb(fill)
+    border_c = _hex_rgb(border)
+    dx, dy = shadow_offset or (0, 0)
+    shadow_c = _mix(bg_c, (0, 0, 0), shadow_alpha) if shadow_offset else None
+    r = max(0, min(radius, (w - 2) // 2, (h - 2) // 2))
+
+    def pixel(x: int, y: int) -> str:
+        cx, cy = x + 0.5, y + 0.5
+        c = bg_c
+        if shadow_c is not None:
+            cov = _coverage(_rr_sdf(cx, cy, 1 + dx, 1 + dy, w - 1 + dx, h - 1 + dy, r))
+            if cov > 0.0:
+                c = _mix(c, shadow_c, cov)
+        d = _rr_sdf(cx, cy, 1, 1, w - 1, h - 1, r)
+        cov = _coverage(d)
+        if cov > 0.0:
+            c = _mix(c, border_c, cov)
+            cov = _coverage(d + 1.0)
+            if cov > 0.0:
+                c = _mix(c, fill_c, cov)
+        return "#%02x%02x%02x" % c
+
+    edge = min(w // 2, r + max(abs(dx), abs(dy)) + 2)
+
+    def row(y: int) -> str:
+        left = [pixel(x, y) for x in range(edge)]
+        right = [pixel(x, y) for x in range(w - edge, w)]
+        mid = [pixel(w // 2, y)] * (w - 2 * edge)
+        return "{" + " ".join(left + mid + right) + "}"
+
+    img = tk.PhotoImage(master=master, width=w, height=h)
+    if h > 2 * edge:
+        img.put(" ".join(row(y) for y in range(edge)), to=(0, 0))
+        img.put(row(h // 2), to=(0, edge, w, h - edge))   # Tk repete a linha no retângulo
+        img.put(" ".join(row(y) for y in range(h - edge, h)), to=(0, h - edge))
+    else:
+        img.put(" ".join(row(y) for y in range(h)), to=(0, 0))
+    return img
+
+
+class PanelSkinCache:
+    """
+    LRU limitada de skins (PhotoImage).
+    Quem exibe a imagem guarda a própria referência: sair da LRU não apaga o que está na tela.
+    """
+    def __init__(self, max_entries: int = PANEL_SKIN_CACHE_MAX):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[tuple, tk.PhotoImage]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.render_ms = 0.0
+
+    def get(self, master: tk.Misc, w: int, h: int, radius: int, fill: str, border: str,
+            canvas_bg: str, shadow_offset: Optional[Tuple[int, int]] = None,
+            shadow_stipple: str = "gray25") -> tk.PhotoImage:
+        alpha = _stipple_alpha(shadow_stipple) if shadow_offset else 0.0
+        key = (int(w), int(h), int(radius), fill, border, canvas_bg,
+               tuple(shadow_offset) if shadow_offset else None, alpha)
+        img = self._items.get(key)
+        if img is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return img
+
+        t0 = time.perf_counter()
+        img = _render_panel_skin(master, int(w), int(h), int(radius), fill, border, canvas_bg,
+                                 shadow_offset, alpha)
+        self.render_ms += (time.perf_counter() - t0) * 1000.0
+        self.misses += 1
+
+        self._items[key] = img
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+        return img
+
+    def stats(self) -> dict:
+        return {"entries": len(self._items), "hits": self.hits, "misses": self.misses,
+                "render_ms": round(self.render_ms, 1)}
+
+
+_SKINS = PanelSkinCache()
+
+
 class RoundedFrame(tk.Canvas):
     """
     Canvas com retângulo arredondado + sombra leve (apenas estética).
+    O desenho é um skin pré-renderizado (PanelSkinCache) num único item de imagem.
     Anti-flicker: redraw com debounce e só quando tamanho muda.
     """
     def __init__(self, master, radius=16, bg="#ffffff", border="#d0d7e2",
@@ -447,6 +844,8 @@ class RoundedFrame(tk.Canvas):
 
         self._last_wh = (0, 0)
         self._redraw_job = None
+        self._skin_img = None    # referência própria (a LRU pode descartar a dela)
+        self._skin_item = None
         self.bind("<Configure>", self._on_cfg)
 
     def _on_cfg(self, _evt=None):
@@ -457,141 +856,264 @@ class RoundedFrame(tk.Canvas):
         self._last_wh = (w, h)
         _debounce_after(self, "_redraw_job", 33, self._redraw)
 
+    def restyle(self, bg: str, border: str, shadow_stipple: str, canvas_bg: str) -> None:
+        """Troca de tema: só troca a imagem do skin (sem refazer geometria)."""
+        self.fill = bg
+        self.border = border
+        self.shadow_stipple = shadow_stipple
+        self.configure(bg=canvas_bg)
+        self._redraw()
+
     def _redraw(self, _evt=None):
-        self.delete("all")
         w = self.winfo_width()
         h = self.winfo_height()
         if w <= 2 or h <= 2:
             return
 
-        r = min(self.radius, w // 2, h // 2)
-        x1, y1, x2, y2 = 1, 1, w - 2, h - 2
-
-        if self.shadow:
-            dx, dy = self.shadow_offset
-            self._round_rect(
-                x1 + dx, y1 + dy, x2 + dx, y2 + dy, r,
-                fill="#000000", outline="#000000",
-                tags=("shadow",)
-            )
-            self.itemconfig("shadow", stipple=self.shadow_stipple)
-
-        self._round_rect(x1, y1, x2, y2, r, fill=self.fill, outline=self.border, tags=("main",))
-
-    def _round_rect(self, x1, y1, x2, y2, r, fill, outline, tags=()):
-        points = [
-            x1 + r, y1,
-            x2 - r, y1,
-            x2, y1,
-            x2, y1 + r,
-            x2, y2 - r,
-            x2, y2,
-            x2 - r, y2,
-            x1 + r, y2,
-            x1, y2,
-            x1, y2 - r,
-            x1, y1 + r,
-            x1, y1
-        ]
-        self.create_polygon(points, smooth=True, fill=fill, outline=outline, tags=tags)
-
-
-class ClassCard(tk.Frame):
-    """
-    Card compacto:
-    - altura fixa (densidade)
-    - progress bar “colada” no conteúdo
-    - pill MENOR consistente e alinhada
-    Anti-flicker: place com debounce e só quando tamanho muda.
-    """
-    def __init__(self, master, is_day_theme: bool):
-        super().__init__(master, bd=0, highlightthickness=0)
-        self.is_day_theme = is_day_theme
+        img = _SKINS.get(self, w, h, self.radius, self.fill, self.border, self["bg"],
+                         self.shadow_offset if self.shadow else None, self.shadow_stipple)
+        self._skin_img = img
+        if self._skin_item is None:
+            self._skin_item = self.create_image(0, 0, anchor="nw", image=img, tags=("main",))
+            self.tag_lower(self._skin_item)
+        else:
+            self.itemconfigure(self._skin_item, image=img)
 
-        self.CARD_H = 140
-        self.configure(height=self.CARD_H)
-        self.pack_propagate(False)
-        self.grid_propagate(False)
 
-        self.bg = "#ffffff" if is_day_theme else "#0f1a2a"
-        self.border = "#d7dee8" if is_day_theme else "#20324d"
-        self.text1 = "#0b2d4d" if is_day_theme else "#eaf2ff"
-        self.text2 = "#5c6f86" if is_day_theme else "#b9c7dd"
-        self.green = "#1aa56a"
+# -------------------------
+# Progress animator (fronteira de pixel)
+# -------------------------
 
-        shadow_stipple = "gray25" if is_day_theme else "gray12"
+# SAL_SMOOTH_PROGRESS=1 → transições interpoladas (máx. PROGRESS_SMOOTH_FPS quadros/s)
+PROGRESS_SMOOTH = os.environ.get("SAL_SMOOTH_PROGRESS", "").strip() == "1"
+PROGRESS_SMOOTH_FPS = 30
+PROGRESS_MIN_SLEEP_MS = 20
+PROGRESS_MAX_SLEEP_MS = 60_000
 
-        self.canvas = RoundedFrame(self, radius=14, bg=self.bg, border=self.border,
-                                   shadow=True, shadow_offset=(2, 3), shadow_stipple=shadow_stipple)
-        self.canvas.pack(fill="both", expand=True)
 
-        self.time_lbl = tk.Label(self.canvas, text="", font=("Segoe UI", 11, "bold"),
-                                 fg=self.text1, bg=self.bg, anchor="e")
-        self.title_lbl = tk.Label(self.canvas, text="", font=("Segoe UI", 15, "bold"),
-                                  fg=self.text1, bg=self.bg, anchor="w",
-                                  justify="left", wraplength=520)
-        self.sub_lbl = tk.Label(self.canvas, text="", font=("Segoe UI", 10),
-                                fg=self.text2, bg=self.bg, anchor="w")
-
-        self.tag_lbl = tk.Label(
-            self.canvas, text="MENOR",
-            font=("Segoe UI", 9, "bold"),
-            fg="#0b2a18", bg="#dff4e8",
-            padx=10, pady=2
-        )
-        self.tag_lbl.configure(highlightthickness=1, highlightbackground="#8fd3b2",
-                               highlightcolor="#8fd3b2", bd=0)
+class ProgressAnimator:
+    """
+    Barras de progresso guiadas pelo relógio, não pelo _tick de 1s.
+    - cada barra é uma reta: progress(t) = (t - t0) / (t1 - t0), limitada a [floor, 1]
+    - 1 único after para todas: acorda quando a próxima barra cruza uma fronteira de pixel
+      (aula de 60 min numa barra de 500 px → ~1 atualização a cada 7s)
+    - smooth: saltos (troca de aula no slot, resize) viram uma aproximação ease-out
+      a no máximo PROGRESS_SMOOTH_FPS quadros/s
+    """
+    def __init__(self, widget: tk.Misc, smooth: bool = PROGRESS_SMOOTH, fps: int = PROGRESS_SMOOTH_FPS):
+        self._widget = widget
+        self.smooth = smooth
+        self.frame_ms = max(PROGRESS_MIN_SLEEP_MS, int(1000 / max(1, fps)))
+        self._bars: dict = {}    # bar → (t0, t1, floor)
+        self._shown: dict = {}   # bar → progress exibido (smooth)
+        self._job = None
+        self.paused = False
+        self.wakeups = 0
+
+    def pause(self) -> None:
+        """Modo econômico: nenhum wakeup até resume()."""
+        self.paused = True
+        if self._job is not None:
+            try:
+                self._widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
 
-        self.bar_bg = tk.Frame(self.canvas, bg="#e9eef5" if is_day_theme else "#1d2b41", height=10)
-        self.bar_fg = tk.Frame(self.bar_bg, bg=self.green, height=10)
+    def resume(self) -> None:
+        if self.paused:
+            self.paused = False
+            self._shown.clear()   # volta direto à posição atual (sem animar o "salto" da pausa)
+            self.kick()
 
-        self._is_minor = False
-        self._progress = 0.0
-        self._last_payload = None
-
-        self._place_job = None
-        self._bar_job = None
-        self._last_wh = (0, 0)
-        self.canvas.bind("<Configure>", self._on_cfg)
+    def track(self, bar, track: Tuple[float, float, float]) -> None:
+        if self._bars.get(bar) == track:
+            return
+        self._bars[bar] = track
+        self.kick()
 
-    def _on_cfg(self, _evt=None):
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-        if (w, h) == self._last_wh:
+    def untrack(self, bar) -> None:
+        self._bars.pop(bar, None)
+        self._shown.pop(bar, None)
+
+    def kick(self) -> None:
+        """Recalcula já (dados/geometria mudaram)."""
+        if self.paused:
             return
-        self._last_wh = (w, h)
-        _debounce_after(self.canvas, "_place_job", 33, self._place)
+        if self._job is not None:
+            try:
+                self._widget.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = self._widget.after_idle(self._run)
+
+    @staticmethod
+    def progress_at(track: Tuple[float, float, float], t: float) -> float:
+        t0, t1, floor = track
+        p = 1.0 if t1 <= t0 else (t - t0) / (t1 - t0)
+        return max(floor, min(1.0, max(0.0, p)))
+
+    @staticmethod
+    def next_crossing_s(track: Tuple[float, float, float], width: int, t: float) -> Optional[float]:
+        """Segundos até a barra ganhar o próximo pixel (None = parada em 100%)."""
+        t0, t1, _floor = track
+        if t1 <= t0 or width <= 0:
+            return None
+        p = ProgressAnimator.progress_at(track, t)
+        if p >= 1.0:
+            return None
+        p_next = min(1.0, (int(width * p) + 1) / float(width))
+        return max(0.0, t0 + p_next * (t1 - t0) - t)
 
-    def _place(self, _evt=None):
-        self.canvas.delete("win")
-        w = self.canvas.winfo_width()
-        h = self.canvas.winfo_height()
-        if w <= 10 or h <= 10:
+    def _run(self) -> None:
+        self._job = None
+        if self.paused:
             return
+        self.wakeups += 1
+        now = clock_mod.time()
+        delay_s: Optional[float] = None
 
-        pad_x = 14
-        top = 12
+        for bar, track in list(self._bars.items()):
+            width = bar.bar_width()
+            if width <= 0:
+                continue
+            target = self.progress_at(track, now)
+            shown = target
+
+            if self.smooth:
+                prev = self._shown.get(bar)
+                if prev is not None and abs(target - prev) * width >= 1.0:
+                    shown = prev + (target - prev) * 0.35
+                    if abs(target - shown) * width < 1.0:
+                        shown = target
+                    else:
+                        frame_s = self.frame_ms / 1000.0
+                        delay_s = frame_s if delay_s is None else min(delay_s, frame_s)
+                self._shown[bar] = shown
+
+            bar.set_progress(shown)
+
+            nxt = self.next_crossing_s(track, width, now)
+            if nxt is not None:
+                delay_s = nxt if delay_s is None else min(delay_s, nxt)
+
+        if delay_s is not None:
+            # +5ms: acorda já do lado de lá da fronteira (evita wakeup "no mesmo pixel")
+            ms = int(delay_s * 1000.0) + 5
+            ms = max(PROGRESS_MIN_SLEEP_MS, min(PROGRESS_MAX_SLEEP_MS, ms))
+            self._job = self._widget.after(ms, self._run)
+
+
+class CanvasCard:
+    """
+    Card de aula em modo retido: itens persistentes num canvas compartilhado
+    (o da SectionFrame), sem widgets próprios.
+    - itens criados 1x; depois só coords()/itemconfigure()
+    - fundo/sombra = skin do PanelSkinCache; textos/barra com cores por tag de papel
+      (card_text1, ...) → 1 itemconfig por tag na troca de tema
+    - altura fixa (densidade), pill MENOR alinhada, barra de progresso colada no conteúdo
+    """
+    CARD_H = 140
+    RADIUS = 14
+    SHADOW_OFFSET = (2, 3)
+    PAD_X = 14
+    TOP = 12
+    TIME_W = 110
+
+    # (família, tamanho, peso); o título encolhe até TITLE_MIN antes de cortar com '…'
+    FONT_SPECS = {
+        "title": ("Segoe UI", 15, "bold"),
+        "time": ("Segoe UI", 11, "bold"),
+        "sub": ("Segoe UI", 10, "normal"),
+        "pill": ("Segoe UI", 9, "bold"),
+    }
+    TITLE_MIN = 11
+
+    BAR_FG = "#1aa56a"
+    PILL_BG = "#dff4e8"
+    PILL_BORDER = "#8fd3b2"
+    PILL_FG = "#0b2a18"
+
+    def __init__(self, canvas: tk.Canvas, theme: Theme, tag: str, fonts: dict,
+                 animator: Optional[ProgressAnimator] = None):
+        self.canvas = canvas
+        self.theme = theme
+        self.animator = animator
+        self.tag = tag                  # todos os itens do card (mostrar/ocultar)
+        self.pill_tag = f"{tag}_pill"   # só a pill MENOR
+        self.fonts = fonts
+
+        self._geom: Optional[Tuple[int, int, int]] = None   # (x, y, w)
+        self._payload = None
+        self._progress = 0.0
+        self._visible = False
+        self._skin_img = None
+        self._bar_coords: Optional[Tuple[int, int, int, int]] = None
+        self._title_size = self.FONT_SPECS["title"][1]
+
+        c = canvas
+        self.skin = c.create_image(0, 0, anchor="nw", tags=(tag,))
+        self.title = c.create_text(0, 0, text="", anchor="w", font=fonts["title"], tags=(tag, "card_text1"))
+        self.time = c.create_text(0, 0, text="", anchor="e", font=fonts["time"], tags=(tag, "card_text1"))
+        self.sub = c.create_text(0, 0, text="", anchor="w", font=fonts["sub"], tags=(tag, "card_text2"))
+        self.pill = c.create_polygon(0, 0, 0, 0, smooth=True, fill=self.PILL_BG, outline=self.PILL_BORDER,
+                                     tags=(tag, self.pill_tag))
+        self.pill_txt = c.create_text(0, 0, text="MENOR", anchor="center", fill=self.PILL_FG,
+                                      font=fonts["pill"], tags=(tag, self.pill_tag))
+        self.bar_bg = c.create_rectangle(0, 0, 0, 0, width=0, tags=(tag, "card_bar_bg"))
+        self.bar_fg = c.create_rectangle(0, 0, 0, 0, width=0, fill=self.BAR_FG, tags=(tag,))
+        c.itemconfigure(tag, state="hidden")
+
+    def place(self, x: int, y: int, w: int) -> None:
+        geom = (x, y, w)
+        if geom == self._geom:
+            return
+        self._geom = geom
+
+        c = self.canvas
+        h = self.CARD_H
+        px = self.PAD_X
 
-        title_w = max(10, w - 2 * pad_x - 120)
+        c.coords(self.skin, x, y)
+        self.reskin()
 
-        self.canvas.create_window(pad_x, top, anchor="nw", window=self.title_lbl,
-                                  width=title_w, height=24, tags=("win",))
-        self.canvas.create_window(w - pad_x, top, anchor="ne", window=self.time_lbl,
-                                  width=110, height=24, tags=("win",))
+        c.coords(self.title, x + px, y + self.TOP + 12)
+        c.coords(self.time, x + w - px, y + self.TOP + 12)
+        c.coords(self.sub, x + px, y + self.TOP + 39)
 
-        self.canvas.create_window(pad_x, top + 30, anchor="nw", window=self.sub_lbl,
-                                  width=w - 2 * pad_x, height=18, tags=("win",))
+        f_pill = self.fonts["pill"]
+        pill_w = f_pill.measure("MENOR") + 22
+        pill_h = f_pill.metrics("linespace") + 6
+        pill_x2 = x + w - px
+        pill_y1 = y + self.TOP + 52
+        c.coords(self.pill, *_round_rect_points(pill_x2 - pill_w, pill_y1, pill_x2, pill_y1 + pill_h, 4))
+        c.coords(self.pill_txt, pill_x2 - pill_w / 2, pill_y1 + pill_h / 2)
 
-        if self._is_minor:
-            self.canvas.create_window(w - pad_x, top + 52, anchor="ne", window=self.tag_lbl, tags=("win",))
+        c.coords(self.bar_bg, x + px, y + h - 26, x + w - px, y + h - 16)
 
-        bar_y = h - 16
-        self.canvas.create_window(pad_x, bar_y, anchor="sw", window=self.bar_bg,
-                                  width=w - 2 * pad_x, height=10, tags=("win",))
+        self._fit_text()
         self._update_bar()
+        if self.animator is not None and self._visible:
+            self.animator.kick()   # largura mudou → próxima fronteira de pixel também
+
+    def reskin(self) -> None:
+        """Fundo + sombra do card (imagem do cache; mesmo tamanho/tema → mesma imagem)."""
+        if self._geom is None:
+            return
+        t = self.theme
+        img = _SKINS.get(self.canvas, self._geom[2], self.CARD_H, self.RADIUS,
+                         t["card_bg"], t["card_border"], t["section_bg"],
+                         self.SHADOW_OFFSET, t["card_stipple"])
+        if img is not self._skin_img:
+            self._skin_img = img
+            self.canvas.itemconfigure(self.skin, image=img)
 
     def set_data(self, start: str, end: str, title: str, teacher: str, location: str, tag: str,
-                 progress: float):
+                 progress: float, track: Optional[Tuple[float, float, float]] = None):
+        """
+        track = (t0, t1, floor) em epoch: com animator, a barra anda sozinha pelo relógio
+        e progress só vale como valor inicial.
+        """
         start_s = str(start).strip()
         end_s = str(end).strip()
         if len(start_s.split(":")) >= 2:
@@ -607,171 +1129,222 @@ class ClassCard(tk.Frame):
             (tag or "").strip().upper() == "MENOR",
         )
 
-        if new_payload != self._last_payload:
-            self.time_lbl.configure(text=new_payload[0])
-            self.title_lbl.configure(text=new_payload[1])
-            self.sub_lbl.configure(text=new_payload[2])
-            self._is_minor = new_payload[3]
-            self._last_payload = new_payload
-            self._place()
+        if new_payload != self._payload:
+            self._payload = new_payload
+            self._fit_text()
+            self._apply_pill_state()
 
-        self._progress = max(0.0, min(1.0, progress))
-        self._update_bar()
-
-    def _update_bar(self):
-        w = self.bar_bg.winfo_width()
-        if w <= 1:
-            # Evita loop agressivo de 20ms quando o card está oculto/não mapeado.
-            # Usa fallback pelo tamanho do canvas e agenda no máximo 1 retry.
-            w = max(0, self.canvas.winfo_width() - 28)
-            if w <= 1:
-                _debounce_after(self, "_bar_job", 120, self._update_bar)
-                return
-        fg_w = int(w * self._progress)
-        self.bar_fg.place(x=0, y=0, width=fg_w, height=10)
-        self.bar_bg.configure(height=10)
+        if track is not None and self.animator is not None:
+            self.animator.track(self, track)
+            return
+        self.set_progress(progress)
+
+    def set_progress(self, progress: float) -> None:
+        progress = max(0.0, min(1.0, progress))
+        if progress != self._progress:
+            self._progress = progress
+            self._update_bar()
 
-    def destroy(self):
-        for attr in ("_place_job", "_bar_job"):
-            job = getattr(self, attr, None)
-            if job is not None:
-                try:
-                    self.after_cancel(job)
-                except Exception:
-                    pass
-                setattr(self, attr, None)
-        super().destroy()
+    def bar_width(self) -> int:
+        if self._geom is None:
+            return 0
+        return max(0, self._geom[2] - 2 * self.PAD_X)
+
+    def set_visible(self, visible: bool) -> None:
+        if visible == self._visible:
+            return
+        self._visible = visible
+        self.canvas.itemconfigure(self.tag, state=("normal" if visible else "hidden"))
+        if visible:
+            self._apply_pill_state()
+        elif self.animator is not None:
+            self.animator.untrack(self)
+
+    def _apply_pill_state(self) -> None:
+        if not self._visible:
+            return
+        is_minor = bool(self._payload and self._payload[3])
+        self.canvas.itemconfigure(self.pill_tag, state=("normal" if is_minor else "hidden"))
+
+    def _fit_text(self) -> None:
+        if self._geom is None or self._payload is None:
+            return
+        w = self._geom[2]
+        px = self.PAD_X
+        time_s, title_s, sub_s, _minor = self._payload
+        c = self.canvas
+        fam, size, weight = self.FONT_SPECS["title"]
+        tsize, title_fit = TEXT_FIT.fit(c, title_s, fam, weight, max(10, w - 2 * px - 120),
+                                        max_size=size, min_size=self.TITLE_MIN)
+        if tsize != self._title_size:
+            self._title_size = tsize
+            c.itemconfigure(self.title, font=TEXT_FIT.font(c, fam, tsize, weight))
+        c.itemconfigure(self.title, text=title_fit)
+        c.itemconfigure(self.time, text=TEXT_FIT.ellipsize(c, *self.FONT_SPECS["time"], time_s, self.TIME_W))
+        c.itemconfigure(self.sub, text=TEXT_FIT.ellipsize(c, *self.FONT_SPECS["sub"], sub_s, w - 2 * px))
+
+    def _update_bar(self) -> None:
+        if self._geom is None:
+            return
+        x, y, w = self._geom
+        h = self.CARD_H
+        x1 = x + self.PAD_X
+        x2 = x + w - self.PAD_X
+        fg_x2 = x1 + int((x2 - x1) * self._progress)
+        coords = (x1, y + h - 26, fg_x2, y + h - 16)
+        if coords != self._bar_coords:   # mesmo pixel → nada para o Tk
+            self._bar_coords = coords
+            self.canvas.coords(self.bar_fg, *coords)
 
 
 class SectionFrame(tk.Frame):
     """
-    Seção:
-    - painel com relevo (borda + sombra)
-    - grid 2 colunas
-    - cards FIXOS (pool)
-    Anti-flicker: inner placement com debounce.
+    Seção desenhada num único canvas (modo retido):
+    - painel com relevo (borda + sombra), título e linha
+    - grid 2 colunas com cards FIXOS (pool de CanvasCard, sem widgets por card)
+    Anti-flicker: layout com debounce e só quando tamanho muda; dados só mexem em itemconfig/coords.
     """
-    def __init__(self, master, title: str, is_day_theme: bool):
-        super().__init__(master, bd=0, highlightthickness=0)
-
-        self.is_day_theme = is_day_theme
-        self.bg = "#f5f7fb" if is_day_theme else "#06101f"
-        self.panel_bg = "#f5f7fb" if is_day_theme else "#06101f"
-        self.title_fg = "#1f7ab8" if is_day_theme else "#4aa3ff"
-        self.line_fg = "#d5deea" if is_day_theme else "#132744"
-        self.panel_border = "#cfd8e5" if is_day_theme else "#112645"
-
-        self.configure(bg=self.bg)
+    RADIUS = 18
+    SHADOW_OFFSET = (3, 4)
+    INSET = 6
 
-        shadow_stipple = "gray18" if is_day_theme else "gray10"
-
-        self.panel = RoundedFrame(
-            self, radius=18, bg=self.panel_bg, border=self.panel_border,
-            shadow=True, shadow_offset=(3, 4), shadow_stipple=shadow_stipple
-        )
-        self.panel.pack(fill="both", expand=True)
-
-        self.inner = tk.Frame(self.panel, bg=self.panel_bg)
-        self.inner.configure(
-            highlightthickness=1,
-            highlightbackground=("#d0d7e2" if is_day_theme else "#0c2038"),
-            bd=0
-        )
-
-        self._inner_job = None
-        self._last_wh = (0, 0)
-        self.panel.bind("<Configure>", self._on_panel_cfg)
+    def __init__(self, master, title: str, theme: Theme, animator: Optional[ProgressAnimator] = None):
+        super().__init__(master, bd=0, highlightthickness=0)
 
-        header = tk.Frame(self.inner, bg=self.panel_bg)
-        header.pack(fill="x", padx=14, pady=(12, 10))
+        self.theme = theme
+        theme.bind(self, bg="root_bg")
 
-        self.title_lbl = tk.Label(
-            header, text=title, font=("Segoe UI", 18, "bold"),
-            fg=self.title_fg, bg=self.panel_bg, anchor="w"
-        )
-        self.title_lbl.pack(side="left")
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0)
+        self.canvas.pack(fill="both", expand=True)
+        theme.bind(self.canvas, bg="root_bg")
 
-        self.line = tk.Frame(header, bg=self.line_fg, height=2)
-        self.line.pack(side="left", fill="x", expand=True, padx=(12, 0), pady=12)
+        self.f_title = tkfont.Font(family="Segoe UI", size=18, weight="bold")
+        self.fonts = {name: TEXT_FIT.font(self, *spec) for name, spec in CanvasCard.FONT_SPECS.items()}
 
-        self.grid_frame = tk.Frame(self.inner, bg=self.panel_bg)
-        self.grid_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        c = self.canvas
+        self.panel = c.create_image(0, 0, anchor="nw", tags=("panel",))
+        self._panel_img = None
+        self.inner_hl = c.create_rectangle(0, 0, 0, 0, width=1, tags=("inner_hl",))
+        self.title_item = c.create_text(0, 0, text=title, anchor="w", font=self.f_title,
+                                        tags=("section_title",))
+        self.line = c.create_rectangle(0, 0, 0, 0, width=0, tags=("section_line",))
 
         self.cols = 2
         self.pad = 10
         self.max_cards = 6
+        self.cards: List[CanvasCard] = [CanvasCard(c, theme, f"card{i}", self.fonts, animator)
+                                        for i in range(self.max_cards)]
+
+        # cores por papel: 1 itemconfig por tag cobre todos os cards
+        theme.bind_item(c, "inner_hl", outline="section_inner_hl")
+        theme.bind_item(c, "section_title", fill="section_title")
+        theme.bind_item(c, "section_line", fill="section_line")
+        theme.bind_item(c, "card_text1", fill="card_text1")
+        theme.bind_item(c, "card_text2", fill="card_text2")
+        theme.bind_item(c, "card_bar_bg", fill="card_bar_bg")
+        theme.on_change(lambda _t: self._reskin())
+
+        self._layout_job = None
+        self._last_wh = (0, 0)
+        c.bind("<Configure>", self._on_cfg)
 
-        self.cards: List[ClassCard] = []
-
-        for c in range(self.cols):
-            self.grid_frame.grid_columnconfigure(c, weight=1, uniform="col")
-
-        for i in range(self.max_cards):
-            r = i // self.cols
-            c = i % self.cols
-            card = ClassCard(self.grid_frame, is_day_theme=self.is_day_theme)
-            card.grid(row=r, column=c, padx=self.pad, pady=self.pad, sticky="ew")
-            self.cards.append(card)
-
-        spacer_row = (self.max_cards + self.cols - 1) // self.cols
-        self._spacer = tk.Frame(self.grid_frame, bg=self.panel_bg)
-        self._spacer.grid(row=spacer_row, column=0, columnspan=self.cols, sticky="nsew")
-        self.grid_frame.grid_rowconfigure(spacer_row, weight=1)
-
-        for card in self.cards:
-            card.grid_remove()
-
-    def _on_panel_cfg(self, _evt=None):
-        w = self.panel.winfo_width()
-        h = self.panel.winfo_height()
+    def _on_cfg(self, _evt=None):
+        w = self.canvas.winfo_width()
+        h = self.canvas.winfo_height()
         if (w, h) == self._last_wh:
             return
         self._last_wh = (w, h)
-        _debounce_after(self.panel, "_inner_job", 33, self._place_inner)
+        _debounce_after(self, "_layout_job", 33, self._layout)
 
-    def _place_inner(self):
-        w = self.panel.winfo_width()
-        h = self.panel.winfo_height()
+    def _layout(self):
+        c = self.canvas
+        w = c.winfo_width()
+        h = c.winfo_height()
         if w <= 10 or h <= 10:
             return
-        pad = 6
-        self.panel.delete("inner")
-        self.panel.create_window(
-            pad, pad, anchor="nw", window=self.inner,
-            width=max(10, w - 2 * pad),
-            height=max(10, h - 2 * pad),
-            tags=("inner",)
-        )
 
-    def set_cards(self, card_data: List[Tuple[str, str, str, str, str, str, float]]):
+        self._reskin_panel()
+
+        inset = self.INSET
+        c.coords(self.inner_hl, inset, inset, w - inset - 1, h - inset - 1)
+
+        # cabeçalho: título + linha
+        ix, iy = inset + 1, inset + 1
+        ix2 = w - inset - 1
+        lh = self.f_title.metrics("linespace")
+        head_y = iy + 12 + lh / 2
+        c.coords(self.title_item, ix + 14, head_y)
+        title_w = self.f_title.measure(c.itemcget(self.title_item, "text"))
+        line_x1 = ix + 14 + title_w + 12
+        c.coords(self.line, line_x1, head_y - 1, max(line_x1, ix2 - 14), head_y + 1)
+
+        # grid de cards
+        grid_x = ix + 10
+        grid_top = iy + 12 + lh + 10
+        col_w = max(10, (ix2 - 10) - grid_x) / self.cols
+        row_h = CanvasCard.CARD_H + 2 * self.pad
+        for i, card in enumerate(self.cards):
+            row, col = divmod(i, self.cols)
+            card.place(int(grid_x + col * col_w + self.pad),
+                       int(grid_top + row * row_h + self.pad),
+                       int(max(10, col_w - 2 * self.pad)))
+
+    def _reskin_panel(self):
+        w = self.canvas.winfo_width()
+        h = self.canvas.winfo_height()
+        if w <= 10 or h <= 10:
+            return
+        t = self.theme
+        self._panel_img = _SKINS.get(self.canvas, w, h, self.RADIUS, t["section_bg"], t["section_border"],
+                                     t["root_bg"], self.SHADOW_OFFSET, t["panel_stipple"])
+        self.canvas.itemconfigure(self.panel, image=self._panel_img)
+
+    def _reskin(self):
+        self._reskin_panel()
+        for card in self.cards:
+            card.reskin()
+
+    def set_cards(self, card_data: List[tuple]):
+        """card_data: (start, end, título, professor, local, tag, progress[, track])"""
         n = min(len(card_data), self.max_cards)
 
         for i in range(n):
             self.cards[i].set_data(*card_data[i])
-            self.cards[i].grid()
+            self.cards[i].set_visible(True)
 
         for i in range(n, self.max_cards):
-            self.cards[i].grid_remove()
+            self.cards[i].set_visible(False)
+
+    def destroy(self):
+        job = getattr(self, "_layout_job", None)
+        if job is not None:
+            try:
+                self.after_cancel(job)
+            except Exception:
+                pass
+            self._layout_job = None
+        super().destroy()
 
 
 class HoursCard(tk.Frame):
     """
     Card duplo (interligado) com auto-fit.
     Anti-flicker: <Configure> com debounce e só quando tamanho muda.
+    Fontes: o tamanho da escala do card é o teto; o TEXT_FIT (memoizado) desce até caber na caixa
+    do rótulo e, no mínimo (FONT_MIN), corta com '…' — nomes longos não saem mais recortados.
     """
-    def __init__(self, master, is_day_theme: bool):
+    FONT_SPECS = {
+        "title": ("Segoe UI", 14, "bold"),
+        "status": ("Segoe UI", 20, "bold"),
+        "sub": ("Segoe UI", 16, "bold"),
+        "lines": ("Segoe UI", 15, "bold"),
+    }
+    FONT_MIN = {"title": 11, "status": 12, "sub": 11, "lines": 11}
+
+    def __init__(self, master, theme: Theme):
         super().__init__(master, bd=0, highlightthickness=0)
-        self.is_day_theme = is_day_theme
-
-        try:
-            self.configure(bg=master["bg"])
-        except Exception:
-            pass
-
-        self.bg = "#ffffff" if is_day_theme else "#0f1a2a"
-        self.border = "#d7dee8" if is_day_theme else "#20324d"
-
-        shadow_stipple = "gray18" if is_day_theme else "gray10"
+        self.theme = theme
+        theme.bind(self, bg="root_bg")
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=5, uniform="hc")
@@ -779,35 +1352,43 @@ class HoursCard(tk.Frame):
         self.grid_columnconfigure(2, weight=2, uniform="hc")
 
         self.left = RoundedFrame(
-            self, radius=18, bg=self.bg, border=self.border,
-            shadow=True, shadow_offset=(3, 4), shadow_stipple=shadow_stipple
+            self, radius=18, bg=theme["card_bg"], border=theme["card_border"],
+            shadow=True, shadow_offset=(3, 4), shadow_stipple=theme["panel_stipple"]
         )
         self.left.grid(row=0, column=0, sticky="nsew", padx=(0, 8), pady=0)
 
-        self._connector = tk.Frame(self, bg=("#d0d7e2" if is_day_theme else "#16365f"), width=2)
+        self._connector = tk.Frame(self, width=2)
         self._connector.grid(row=0, column=1, sticky="ns", padx=0, pady=12)
+        theme.bind(self._connector, bg="hours_connector")
 
         self.right = RoundedFrame(
-            self, radius=18, bg=self.bg, border=self.border,
-            shadow=True, shadow_offset=(3, 4), shadow_stipple=shadow_stipple
+            self, radius=18, bg=theme["card_bg"], border=theme["card_border"],
+            shadow=True, shadow_offset=(3, 4), shadow_stipple=theme["panel_stipple"]
         )
         self.right.grid(row=0, column=2, sticky="nsew", padx=(8, 0), pady=0)
 
-        self.f_title = tkfont.Font(family="Segoe UI", size=14, weight="bold")
-        self.f_status = tkfont.Font(family="Segoe UI", size=20, weight="bold")
-        self.f_sub = tkfont.Font(family="Segoe UI", size=16, weight="bold")
-        self.f_lines = tkfont.Font(family="Segoe UI", size=15, weight="bold")
+        def restyle(t: Theme):
+            for panel in (self.left, self.right):
+                panel.restyle(t["card_bg"], t["card_border"], t["panel_stipple"], t["root_bg"])
+        theme.on_change(restyle)
 
-        self.title = tk.Label(self.left, text="CLUBE", font=self.f_title,
+        fs = self.FONT_SPECS
+        self.title = tk.Label(self.left, text="CLUBE", font=TEXT_FIT.font(self, *fs["title"]),
                               fg="#ffffff", bg="#2e7d32", padx=14, pady=7, anchor="w")
-        self.status = tk.Label(self.left, text="ABERTO AGORA", font=self.f_status,
+        self.status = tk.Label(self.left, text="ABERTO AGORA", font=TEXT_FIT.font(self, *fs["status"]),
                                fg="#ffffff", bg="#43a047", padx=14, pady=9, anchor="w")
-        self.sub = tk.Label(self.left, text="FECHA ÀS 22H", font=self.f_sub,
+        self.sub = tk.Label(self.left, text="FECHA ÀS 22H", font=TEXT_FIT.font(self, *fs["sub"]),
                             fg="#7a1111", bg="#f3e88f", padx=14, pady=9, anchor="w")
 
-        self.lines = tk.Label(self.right, text="", font=self.f_lines,
-                              fg="#27364a" if is_day_theme else "#d8e6ff",
-                              bg=self.bg, justify="left", anchor="nw")
+        self.lines = tk.Label(self.right, text="", font=TEXT_FIT.font(self, *fs["lines"]),
+                              justify="left", anchor="nw")
+        theme.bind(self.lines, fg="hours_lines", bg="card_bg")
+
+        # texto completo + caixa útil (px) de cada rótulo; o Label recebe a forma que cabe
+        self._labels = {"title": self.title, "status": self.status, "sub": self.sub, "lines": self.lines}
+        self._texts = {"title": "CLUBE", "status": "ABERTO AGORA", "sub": "FECHA ÀS 22H", "lines": ""}
+        self._boxes: dict = {}     # key → (w, h, tamanho máximo)
+        self._shown: dict = {}
 
         self._place_left_job = None
         self._place_right_job = None
@@ -822,47 +1403,7 @@ class HoursCard(tk.Frame):
         self.update_view()
 
     def _build_items(self):
-        return [
-            {
-                "name": "CLUBE",
-                "rules": {
-                    "SEG": ("06:00", "22:00"),
-                    "TER": ("06:00", "22:00"),
-                    "QUA": ("06:00", "22:00"),
-                    "QUI": ("06:00", "22:00"),
-                    "SEX": ("06:00", "22:00"),
-                    "SAB": ("08:00", "20:00"),
-                    "DOM": ("09:00", "20:00"),
-                },
-                "lines": "SEG–QUI  6H–22H\nSEX      6H–22H\nSÁB      8H–20H\nDOM/FER  9H–20H",
-            },
-            {
-                "name": "SECRETARIA",
-                "rules": {
-                    "SEG": ("08:00", "20:00"),
-                    "TER": ("08:00", "20:00"),
-                    "QUA": ("08:00", "20:00"),
-                    "QUI": ("08:00", "20:00"),
-                    "SEX": ("08:00", "20:00"),
-                    "SAB": ("08:00", "20:00"),
-                    "DOM": ("09:00", "20:00"),
-                },
-                "lines": "SEG–QUI  8H–20H\nSEX      8H–20H\nSÁB      8H–20H\nDOM/FER  9H–20H",
-            },
-            {
-                "name": "ACADEMIA",
-                "rules": {
-                    "SEG": ("06:00", "21:30"),
-                    "TER": ("06:00", "21:30"),
-                    "QUA": ("06:00", "21:30"),
-                    "QUI": ("06:00", "21:30"),
-                    "SEX": ("06:00", "21:00"),
-                    "SAB": ("08:00", "12:00"),
-                    "DOM": (None, None),
-                },
-                "lines": "SEG–QUI  06:00–21:30\nSEX      06:00–21:00\nSÁB      08:00–12:00\nDOM      FECHADO",
-            }
-        ]
+        return HOURS_ITEMS
 
     def _on_left_cfg(self, _evt=None):
         w = self.left.winfo_width()
@@ -888,9 +1429,6 @@ class HoursCard(tk.Frame):
             return
 
         scale = max(0.78, min(1.0, h / 200.0))
-        self.f_title.configure(size=max(11, int(14 * scale)))
-        self.f_status.configure(size=max(14, int(20 * scale)))
-        self.f_sub.configure(size=max(12, int(16 * scale)))
 
         pad = max(12, int(18 * scale))
         gap = max(4, int(6 * scale))
@@ -899,9 +1437,15 @@ class HoursCard(tk.Frame):
         status_h = max(40, int(58 * scale))
         sub_h = max(34, int(48 * scale))
 
-        self.title.configure(padx=max(10, int(14 * scale)), pady=max(4, int(7 * scale)))
-        self.status.configure(padx=max(10, int(14 * scale)), pady=max(5, int(9 * scale)))
-        self.sub.configure(padx=max(10, int(14 * scale)), pady=max(5, int(9 * scale)))
+        padx = max(10, int(14 * scale))
+        pady = {"title": max(4, int(7 * scale)), "status": max(5, int(9 * scale)), "sub": max(5, int(9 * scale))}
+        cap = {"title": max(11, int(14 * scale)), "status": max(14, int(20 * scale)), "sub": max(12, int(16 * scale))}
+        for key, box_h in (("title", title_h), ("status", status_h), ("sub", sub_h)):
+            lbl = self._labels[key]
+            lbl.configure(padx=padx, pady=pady[key])
+            bd = 2 * int(lbl.cget("bd"))
+            self._boxes[key] = (w - 2 * pad - 2 * padx - bd, box_h - 2 * pady[key] - bd, cap[key])
+        self._fit("title", "status", "sub")
 
         y = max(10, int(14 * scale))
         self.left.create_window(pad, y, anchor="nw", window=self.title,
@@ -921,10 +1465,12 @@ class HoursCard(tk.Frame):
             return
 
         scale_w = max(0.95, min(1.35, w / 210.0))
-        self.f_lines.configure(size=max(14, int(16 * scale_w)))
 
         pad = max(10, int(12 * scale_w))
         top = max(10, int(12 * scale_w))
+        bd = 2 * int(self.lines.cget("bd"))
+        self._boxes["lines"] = (w - 2 * pad - bd, h - top - pad - bd, max(14, int(16 * scale_w)))
+        self._fit("lines")
 
         self.right.create_window(
             pad, top, anchor="nw", window=self.lines,
@@ -933,49 +1479,61 @@ class HoursCard(tk.Frame):
             tags=("win",)
         )
 
-    def tick_rotate(self):
+    def rotate(self):
         self._mode = (self._mode + 1) % len(self._items)
+
+    def tick_rotate(self):
+        self.rotate()
         self.update_view()
 
     def update_view(self):
-        item = self._items[self._mode]
-        self.title.configure(text=item["name"])
-        self.lines.configure(text=item["lines"])
+        self.apply_view(self.view_state())
         self.update_status_only()
 
     def update_status_only(self):
-        item = self._items[self._mode]
-
-        day = today_3letters_noaccent()
-        now = time.localtime()
-        now_min = now.tm_hour * 60 + now.tm_min
+        self.apply_status(self.status_state())
 
-        open_s, close_s = item["rules"].get(day, (None, None))
-        open_m = parse_hhmm(open_s) if open_s else None
-        close_m = parse_hhmm(close_s) if close_s else None
+    def view_state(self) -> Tuple[str, str]:
+        item = self._items[self._mode]
+        return item["name"], item["lines"]
 
-        if open_m is None or close_m is None:
-            is_open = False
-        else:
-            is_open = (open_m <= now_min < close_m)
+    def apply_view(self, state: Tuple[str, str]):
+        name, lines = state
+        self._texts["title"] = name
+        self._texts["lines"] = lines
+        self._fit("title", "lines")
 
+    def status_state(self) -> Tuple[str, str, str, str, str]:
+        """(status, status_bg, sub, sub_fg, sub_bg) do item atual — sem tocar no Tk."""
+        item = self._items[self._mode]
+        is_open, status, sub = hours_labels(item, clock_mod.now())
         if is_open:
-            self.status.configure(text="ABERTO AGORA", bg="#43a047")
-            self.sub.configure(
-                text=f"FECHA ÀS {fmt_hhmm(close_m)}",
-                fg="#7a1111",
-                bg="#f3e88f"
-            )
-        else:
-            self.status.configure(text="FECHADO AGORA", bg="#3d556d")
-            if open_m is not None:
-                self.sub.configure(
-                    text=f"ABRE ÀS {fmt_hhmm(open_m)}",
-                    fg="#ffffff",
-                    bg="#2b3f55"
-                )
+            return status, "#43a047", sub, "#7a1111", "#f3e88f"
+        return status, "#3d556d", sub, "#ffffff", "#2b3f55"
+
+    def apply_status(self, state: Tuple[str, str, str, str, str]):
+        status, status_bg, sub, sub_fg, sub_bg = state
+        self.status.configure(bg=status_bg)
+        self.sub.configure(fg=sub_fg, bg=sub_bg)
+        self._texts["status"] = status
+        self._texts["sub"] = sub
+        self._fit("status", "sub")
+
+    def _fit(self, *keys: str):
+        """Maior fonte que cabe na caixa (ou '…' no mínimo); só reconfigura o Label se mudou."""
+        for key in keys:
+            text = self._texts[key]
+            box = self._boxes.get(key)
+            fam, size, weight = self.FONT_SPECS[key]
+            if box is None or box[0] <= 0 or box[1] <= 0:
+                size, shown = size, text      # antes do 1º layout: tamanho base
             else:
-                self.sub.configure(text="SEM ATENDIMENTO", fg="#ffffff", bg="#2b3f55")
+                size, shown = TEXT_FIT.fit(self, text, fam, weight, box[0], box[1],
+                                           max_size=box[2], min_size=self.FONT_MIN[key])
+            if self._shown.get(key) == (size, shown):
+                continue
+            self._shown[key] = (size, shown)
+            self._labels[key].configure(text=shown, font=TEXT_FIT.font(self, fam, size, weight))
 
 
 class WeatherCard(tk.Frame):
@@ -985,52 +1543,48 @@ class WeatherCard(tk.Frame):
     - set_weather(city, WeatherResult)
     Anti-flicker: layout simples, sem reflow agressivo.
     """
-    def __init__(self, master, is_day_theme: bool):
+    def __init__(self, master, theme: Theme):
         super().__init__(master, bd=0, highlightthickness=0)
-        self.is_day_theme = is_day_theme
-
-        try:
-            self.configure(bg=master["bg"])
-        except Exception:
-            pass
-
-        self.bg = "#ffffff" if is_day_theme else "#0f1a2a"
-        self.border = "#d7dee8" if is_day_theme else "#20324d"
-        shadow_stipple = "gray18" if is_day_theme else "gray10"
+        self.theme = theme
+        theme.bind(self, bg="root_bg")
 
         self.panel = RoundedFrame(
-            self, radius=18, bg=self.bg, border=self.border,
-            shadow=True, shadow_offset=(3, 4), shadow_stipple=shadow_stipple
+            self, radius=18, bg=theme["card_bg"], border=theme["card_border"],
+            shadow=True, shadow_offset=(3, 4), shadow_stipple=theme["panel_stipple"]
         )
         self.panel.pack(fill="both", expand=True)
+        theme.on_change(lambda t: self.panel.restyle(t["card_bg"], t["card_border"],
+                                                     t["panel_stipple"], t["root_bg"]))
 
-        self.inner = tk.Frame(self.panel, bg=self.bg)
+        self.inner = tk.Frame(self.panel)
+        theme.bind(self.inner, bg="card_bg")
         self._inner_job = None
         self._last_wh = (0, 0)
         self.panel.bind("<Configure>", self._on_cfg)
 
-        self.city_lbl = tk.Label(self.inner, text="CLIMA", font=("Segoe UI", 12, "bold"),
-                                 fg="#1f7ab8" if is_day_theme else "#4aa3ff",
-                                 bg=self.bg, anchor="w")
+        self.city_lbl = tk.Label(self.inner, text="CLIMA", font=("Segoe UI", 12, "bold"), anchor="w")
         self.city_lbl.pack(anchor="w", padx=14, pady=(12, 2))
+        theme.bind(self.city_lbl, fg="section_title", bg="card_bg")
 
-        mid = tk.Frame(self.inner, bg=self.bg)
+        mid = tk.Frame(self.inner)
         mid.pack(fill="x", padx=14, pady=(4, 0))
+        theme.bind(mid, bg="card_bg")
 
-        self.icon_lbl = tk.Label(mid, bg=self.bg)
+        self.icon_lbl = tk.Label(mid)
         self.icon_lbl.pack(side="left", padx=(0, 10))
+        theme.bind(self.icon_lbl, bg="card_bg")
 
-        self.temp_lbl = tk.Label(mid, text="—°C", font=("Segoe UI", 26, "bold"),
-                                 fg="#0b2d4d" if is_day_theme else "#eaf2ff",
-                                 bg=self.bg, anchor="w")
+        self.temp_lbl = tk.Label(mid, text="—°C", font=("Segoe UI", 26, "bold"), anchor="w")
         self.temp_lbl.pack(side="left", anchor="w")
+        theme.bind(self.temp_lbl, fg="card_text1", bg="card_bg")
 
         self.desc_lbl = tk.Label(self.inner, text="—", font=("Segoe UI", 12, "bold"),
-                                 fg="#5c6f86" if is_day_theme else "#b9c7dd",
-                                 bg=self.bg, anchor="w", justify="left", wraplength=360)
+                                 anchor="w", justify="left", wraplength=360)
         self.desc_lbl.pack(anchor="w", padx=14, pady=(6, 10))
+        theme.bind(self.desc_lbl, fg="card_text2", bg="card_bg")
 
         self._icon_img = None
+        self._icon_base: Optional[str] = None
 
     def _on_cfg(self, _evt=None):
         w = self.panel.winfo_width()
@@ -1055,26 +1609,19 @@ class WeatherCard(tk.Frame):
         )
 
     def _set_icon(self, base: str):
-        p = _img_path_try(base)
-        if not p:
-            p = _img_path_try("clouds")
-        if not p:
-            self.icon_lbl.configure(image=None)
-            self._icon_img = None
-            return
+        self._icon_base = base
+        img = ASSETS.photo(self, base, ICON_BOX, fallbacks=("clouds",))
+        self._icon_img = img
         try:
-            img = tk.PhotoImage(file=p)
-            # padroniza tamanho (aprox 56–72) sem ficar enorme
-            if img.width() > 90:
-                factor = max(1, img.width() // 72)
-                img = img.subsample(factor, factor)
-            self._icon_img = img
-            self.icon_lbl.configure(image=self._icon_img)
+            self.icon_lbl.configure(image=img if img is not None else "")
         except Exception:
-            self.icon_lbl.configure(image=None)
             self._icon_img = None
 
     def set_weather(self, city: str, res: Any):
+        self.apply_weather(self.weather_state(city, res))
+
+    def weather_state(self, city: str, res: Any) -> Tuple[str, str, str, str]:
+        """(cidade, temperatura, descrição, ícone) já formatados — sem tocar no Tk."""
         # Extrai campos de forma robusta sem depender do formato exato do WeatherResult
         # prioriza "agora"
         now_obj = _get_any(res, "now", "current", "agora", default=res)
@@ -1101,28 +1648,37 @@ class WeatherCard(tk.Frame):
         except Exception:
             temp_s = f"{temp}°C" if temp is not None else "—°C"
 
-        icon_base = map_symbol_to_icon(sym)
-        self._set_icon(icon_base)
+        desc_s = str(desc).strip().upper() if desc else "—"
+        return str(city).upper(), temp_s, desc_s, map_symbol_to_icon(sym)
 
-        self.city_lbl.configure(text=str(city).upper())
+    def apply_weather(self, state: Tuple[str, str, str, str]):
+        city_s, temp_s, desc_s, icon_base = state
+        self._set_icon(icon_base)
+        self.city_lbl.configure(text=city_s)
         self.temp_lbl.configure(text=temp_s)
-        self.desc_lbl.configure(text=str(desc).strip().upper() if desc else "—")
+        self.desc_lbl.configure(text=desc_s)
 
 
 # -------------------------
 # Main App
 # -------------------------
 
+def _cards_state(cards: List[tuple]) -> tuple:
+    """Estado dos cards para o view-model: tudo menos o progress instantâneo (índice 6)."""
+    return tuple(c[:6] + c[7:] for c in cards)
+
+
 class SALApp(tk.Tk):
     def __init__(self):
         super().__init__()
 
         self.title("SAL - SESI Agenda Live")
         self.attributes("-fullscreen", True)
-        self.configure(bg="#f5f7fb")
-
         self.is_day_theme = theme_is_day()
-        self._apply_theme()
+        self.theme = Theme(self.is_day_theme)
+        self.theme.bind(self, bg="root_bg")
+        self._logo_theme: Optional[bool] = None
+        self._assets_gen = 0
 
         self.all_items: List[ClassItem] = []
         self.last_excel_mtime: Optional[float] = None
@@ -1133,13 +1689,37 @@ class SALApp(tk.Tk):
         self._weather_inflight = False
 
         self._last_zero_agenda_log_ts = 0.0
-        self._last_housekeeping_ts = 0.0
 
-        # UI: garante apenas 1 loop _tick ativo
-        self._tick_job = None
+        # UI: garante apenas 1 _tick ativo
         self._tick_running = False
 
-        self.bind("<Escape>", lambda e: self.destroy())
+        # UI: orçamento de frame (fases do _tick, atraso do loop, commit) → [PERF] no log
+        self.perf = FrameMonitor(logger=log)
+
+        # UI: estado desejado → Tk só recebe o que mudou (1 commit por frame)
+        self.vm = ViewModel(self, monitor=self.perf)
+        # UI: barras de progresso acordam só na próxima fronteira de pixel
+        self.progress_anim = ProgressAnimator(self)
+
+        # Uptime longo: RSS, widgets, imagens, after pendentes, threads → [HEALTH] + JSONL
+        self.health = HealthMonitor(self, logger=log, out_dir=HEALTH_DIR, interval_s=HEALTH_SAMPLE_S)
+
+        # Perfil sob demanda: nada armado → cada gancho é 1 consulta a dict vazio
+        self.prof = ProfileHooks(PROFILES_DIR, logger=log)
+        self.prof.apply_spec(os.environ.get("SAL_PROFILE", ""), source="env")
+        self.bind("<Control-Alt-Shift-Key-P>", lambda e: self.prof.arm("ticks", source="hotkey"), add="+")
+        self.bind("<Control-Alt-Shift-Key-S>", lambda e: self.prof.toggle_sampler(), add="+")
+
+        # Energia: fora do horário (HOURS_ITEMS) ou janela invisível → modo econômico
+        self.power = PowerPolicy(OpeningHours(HOURS_ITEMS))
+        self.power_mode = MODE_FULL
+        self._window_visible = True
+        self._display_blanked = False
+        self.bind("<Map>", self._on_visibility, add="+")
+        self.bind("<Unmap>", self._on_visibility, add="+")
+        self.bind("<Visibility>", self._on_visibility, add="+")
+
+        self.bind("<Escape>", lambda e: self._quit())
 
         _rotate_logs_if_needed(logger=log)
 
@@ -1150,45 +1730,165 @@ class SALApp(tk.Tk):
         log(f"[BOOT] LOG_PATH={LOG_PATH}")
         log(f"[BOOT] {SAL_UI_BUILD}")
 
+        # reinício após travamento/crash: pilhas do hang.log → sal.log; clima exibido volta do state.json
+        collect_previous_dump(HANG_DUMP_PATH, LOG_ARCHIVE_DIR, logger=log)
+        self._restore_state(read_state(STATE_PATH))
+        self.watchdog = HangWatchdog(HANG_DUMP_PATH, STATE_PATH, logger=log, state_fn=self._state_snapshot)
+
+        # Backend opcional em outro processo: a UI só aplica retratos (fallback → 1 processo)
+        self.backend: Optional[BackendClient] = None
+        self._backend_snap: Optional[dict] = None
+        self._backend_weather: Optional[dict] = None
+        if BACKEND_MODE == "process":
+            self.backend = BackendClient(dict(
+                excel_path=EXCEL_PATH, app_dir=APP_DIR, weather_kwargs=WEATHER_ARGS,
+                weather_refresh_s=WEATHER_REFRESH_S, excel_check_s=EXCEL_CHECK_INTERVAL_S,
+                housekeeping_at=HOUSEKEEPING_AT,
+            ), logger=log)
+            if not self.backend.start():
+                self.backend = None
+
         try:
             weather_mod.housekeeping(app_dir=APP_DIR, logger=log)
         except Exception as e:
             log(f"[WEATHER] Housekeeping error {type(e).__name__}: {e}")
 
+        if DNS_PREFETCH:
+            try:
+                weather_mod.start_dns_prefetch(app_dir=APP_DIR, logger=log)
+            except Exception as e:
+                log(f"[WEATHER] DNS prefetch error {type(e).__name__}: {e}")
+
+        self._preload_assets()
         self._build_ui()
 
         self._reload_excel_if_needed(force=True)
-        self._tick()
-        self.after(9000, self._rotate_hours)
 
-    def _apply_theme(self):
-        self.is_day_theme = theme_is_day()
-        self.bg_root = "#f5f7fb" if self.is_day_theme else "#06101f"
-        self.bg_header = "#f5f7fb" if self.is_day_theme else "#06101f"
-        self.fg_primary = "#0b2d4d" if self.is_day_theme else "#eaf2ff"
-        self.fg_soft = "#5c6f86" if self.is_day_theme else "#b9c7dd"
-        self.border_soft = "#cfd8e5" if self.is_day_theme else "#132744"
+        # Cadências (grade sem drift; 1 único after pendente):
+        # - tick: na virada de cada segundo (relógio do cabeçalho não pula)
+        # - tema: na virada de cada minuto (troca 06:00/18:00 no minuto certo)
+        self.sched = Scheduler(self, logger=log, monitor=self.perf, clock=clock_mod.time)
+        self.sched.every("tick", 1.0, lambda: self.prof.run("ticks", self._tick), align=True, run_now=True)
+        self.sched.every("theme", 60.0, self._tick_theme, align=True)
+        self.sched.every("excel", EXCEL_CHECK_INTERVAL_S, lambda: self._reload_excel_if_needed(force=False))
+        self.sched.every("hours_rotate", 9.0, self._rotate_hours)
+        self.sched.every("weather", WEATHER_REFRESH_S, self._tick_weather, run_now=True)
+        self.sched.daily("housekeeping", HOUSEKEEPING_AT, self._tick_housekeeping)
+        self.sched.every("power", 60.0, self._tick_power, align=True, run_now=True)
+        self.sched.every("health", self.health.interval_s, self.health.sample)
+        self.sched.every("profile", 60.0, self._tick_profile)
+        self.sched.every("heartbeat", WATCHDOG_BEAT_S, self.watchdog.beat)
+        if self.backend is not None:
+            self.sched.every("backend", BACKEND_POLL_S, self._tick_backend, run_now=True)
+        self.sched.start()
+        self.watchdog.start()
+
+    def _quit(self):
+        """Saída do operador (Esc): desarma o watchdog → supervisor não reinicia (exit 0)."""
+        try:
+            self.watchdog.stop()
+        except Exception as e:
+            log(f"[HANG] Stop error {type(e).__name__}: {e}")
+        if self.backend is not None:
+            self.backend.stop()
+        self.destroy()
+
+    def _tick_backend(self):
+        """Retrato novo do backend → cards/clima; backend desistiu → volta ao modo de 1 processo."""
+        be = self.backend
+        if be is None:
+            return
+        snap = be.poll()
+        if snap is not None:
+            self._backend_snap = snap
+            self.last_excel_mtime = snap.get("excel_mtime")
+            w = snap.get("weather")
+            if w and w != self._backend_weather:
+                self._backend_weather = w
+                try:
+                    with self._weather_lock:
+                        self.weather_res = weather_mod.WeatherResult(**w)
+                        self.weather_last_fetch = time.time()
+                except Exception as e:
+                    log(f"[BACKEND] Weather snapshot error {type(e).__name__}: {e}")
+        if not be.active:
+            self.backend = None
+            self._backend_snap = None
+            self.sched.pause("backend")
+            self._reload_excel_if_needed(force=True)
+            self._tick_weather()
 
-        self.div_hi = "#e9eef5" if self.is_day_theme else "#16365f"
-        self.div_lo = "#b7c3d4" if self.is_day_theme else "#08172c"
+    def _state_snapshot(self) -> dict:
+        """state.json (a cada ~30s pelo watchdog): o que o reinício precisa para voltar igual."""
+        with self._weather_lock:
+            res = self.weather_res
+            last_fetch = self.weather_last_fetch
+        return {
+            "weather": asdict(res) if res is not None else None,
+            "weather_last_fetch": last_fetch,
+            "excel_mtime": self.last_excel_mtime,
+            "items": len(self.all_items),
+            "power_mode": self.power_mode,
+            "theme": self.theme.name,
+        }
+
+    def _restore_state(self, state: dict):
+        if not state or state.get("clean_exit"):
+            return
+        app = state.get("app") or {}
+        w = app.get("weather")
+        if w:
+            try:
+                with self._weather_lock:
+                    self.weather_res = weather_mod.WeatherResult(**w)
+                    self.weather_last_fetch = float(app.get("weather_last_fetch") or 0.0)
+            except Exception as e:
+                log(f"[HANG] Restore weather error {type(e).__name__}: {e}")
+        log(f"[HANG] Restored state from pid={state.get('pid')} beat_ts={state.get('beat_ts')} "
+            f"weather={'yes' if w else 'no'} power={app.get('power_mode')}")
 
-        self.configure(bg=self.bg_root)
+    def _apply_theme(self):
+        """Virada dia/noite: recolore os widgets existentes (sem _build_ui)."""
+        self.is_day_theme = theme_is_day()
+        t0 = time.perf_counter()
+        if self.theme.set_day(self.is_day_theme):
+            TEXT_FIT.set_context(theme=self.theme.name)
+            self._refresh_logo()
+            log(f"[UI] Theme switched to={self.theme.name} ms={(time.perf_counter() - t0) * 1000.0:.1f}")
 
     def _refresh_logo(self):
+        if self._logo_theme == self.is_day_theme and self.logo_img is not None:
+            return
+        self._logo_theme = self.is_day_theme
         base = "logo_day" if self.is_day_theme else "logo_night"
-        p = _img_path_try(base)
-        if not p:
-            p = _img_path_try("logo_sesi") or _img_path_try("logo_day") or _img_path_try("logo_night")
-        if p:
-            try:
-                img = tk.PhotoImage(file=p)
-                if img.width() > 320:
-                    factor = max(1, img.width() // 300)
-                    img = img.subsample(factor, factor)
-                self.logo_img = img
-                self.logo_lbl.configure(image=self.logo_img)
-            except Exception:
-                self.logo_lbl.configure(image=None)
+        img = ASSETS.photo(self, base, LOGO_BOX, fallbacks=("logo_sesi", "logo_day", "logo_night"))
+        if img is not None:
+            self.logo_img = img
+            self.logo_lbl.configure(image=self.logo_img)
+        else:
+            self.logo_lbl.configure(image="")
+
+    def _preload_assets(self):
+        """Boot: logo do tema atual + ícones do clima já em memória; o logo do outro tema vai para o disco em fundo."""
+        other = "logo_night" if self.is_day_theme else "logo_day"
+        current = "logo_day" if self.is_day_theme else "logo_night"
+        ASSETS.preload(self, [(current, LOGO_BOX)] + [(b, ICON_BOX) for b in WEATHER_ICONS])
+        ASSETS.warm([(other, LOGO_BOX)])
+        removed = ASSETS.prune()
+        if removed:
+            log(f"[ASSET] Pruned stale variants n={removed}")
+        self._assets_gen = ASSETS.generation
+
+    def _check_assets(self):
+        """Variantes geradas em fundo desde o último check → troca o provisório (subsample) pelo exato."""
+        if ASSETS.generation == self._assets_gen:
+            return
+        self._assets_gen = ASSETS.generation
+        self._logo_theme = None
+        self._refresh_logo()
+        wc = getattr(self, "weather_card", None)
+        if wc is not None and wc._icon_base:
+            wc._set_icon(wc._icon_base)
 
     def _calc_header_geometry(self):
         sw = max(1280, self.winfo_screenwidth())
@@ -1224,10 +1924,17 @@ class SALApp(tk.Tk):
                 w.destroy()
             except Exception:
                 pass
+        self.vm.reset()
+        # medidas de texto valem por resolução/DPI; resultados de fit por tema também
+        TEXT_FIT.set_context(theme=self.theme.name,
+                             screen=(self.winfo_screenwidth(), self.winfo_screenheight(),
+                                     int(round(self.winfo_fpixels("1i")))))
 
         center_w, right_w, hours_w, weather_w, card_h = self._calc_header_geometry()
+        th = self.theme
 
-        self.header = tk.Frame(self, bg=self.bg_header, height=card_h + 24)
+        self.header = tk.Frame(self, height=card_h + 24)
+        th.bind(self.header, bg="root_bg")
         self.header.pack(fill="x", side="top")
         self.header.pack_propagate(False)
 
@@ -1237,22 +1944,26 @@ class SALApp(tk.Tk):
 
         # LOGO
         self.logo_img = None
-        self.logo_lbl = tk.Label(self.header, bg=self.bg_header)
+        self._logo_theme = None
+        self.logo_lbl = tk.Label(self.header)
         self.logo_lbl.grid(row=0, column=0, sticky="w", padx=18, pady=12)
+        th.bind(self.logo_lbl, bg="root_bg")
 
         # CENTRO
-        center = tk.Frame(self.header, bg=self.bg_header, width=center_w, height=card_h)
+        center = tk.Frame(self.header, width=center_w, height=card_h)
         center.grid(row=0, column=1, sticky="nsew", padx=8, pady=10)
         center.grid_propagate(False)
+        th.bind(center, bg="root_bg")
 
-        self.date_lbl = tk.Label(center, text="", font=("Segoe UI", 18, "bold"),
-                                 fg=self.fg_primary, bg=self.bg_header, anchor="w", width=10)
-        self.time_lbl = tk.Label(center, text="", font=("Segoe UI", 34, "bold"),
-                                 fg=self.fg_primary, bg=self.bg_header, anchor="w", width=8)
-        self.wd_lbl = tk.Label(center, text="", font=("Segoe UI", 16, "bold"),
-                               fg=self.fg_soft, bg=self.bg_header, anchor="w", width=20)
+        self.date_lbl = tk.Label(center, text="", font=("Segoe UI", 18, "bold"), anchor="w", width=10)
+        self.time_lbl = tk.Label(center, text="", font=("Segoe UI", 34, "bold"), anchor="w", width=8)
+        self.wd_lbl = tk.Label(center, text="", font=("Segoe UI", 16, "bold"), anchor="w", width=20)
         self.build_lbl = tk.Label(center, text=SAL_UI_BUILD, font=("Segoe UI", 10, "bold"),
-                                  fg=self.fg_soft, bg=self.bg_header, anchor="w", width=22)
+                                  anchor="w", width=22)
+        th.bind(self.date_lbl, fg="fg_primary", bg="root_bg")
+        th.bind(self.time_lbl, fg="fg_primary", bg="root_bg")
+        th.bind(self.wd_lbl, fg="fg_soft", bg="root_bg")
+        th.bind(self.build_lbl, fg="fg_soft", bg="root_bg")
 
         self.date_lbl.pack(anchor="w", pady=(6, 0))
         self.time_lbl.pack(anchor="w", pady=(0, 0))
@@ -1260,12 +1971,13 @@ class SALApp(tk.Tk):
         self.build_lbl.pack(anchor="w", pady=(2, 0))
 
         # DIREITA
-        self.header_right = tk.Frame(self.header, bg=self.bg_header, width=right_w, height=card_h)
+        self.header_right = tk.Frame(self.header, width=right_w, height=card_h)
         self.header_right.grid(row=0, column=2, sticky="e", padx=16, pady=10)
         self.header_right.grid_propagate(False)
+        th.bind(self.header_right, bg="root_bg")
 
-        self.hours_card = HoursCard(self.header_right, is_day_theme=self.is_day_theme)
-        self.weather_card = WeatherCard(self.header_right, is_day_theme=self.is_day_theme)
+        self.hours_card = HoursCard(self.header_right, theme=th)
+        self.weather_card = WeatherCard(self.header_right, theme=th)
 
         self.hours_card.configure(width=hours_w, height=card_h)
         self.weather_card.configure(width=weather_w, height=card_h)
@@ -1278,43 +1990,150 @@ class SALApp(tk.Tk):
         self._refresh_logo()
 
         # ---- DIVIDER horizontal ----
-        self.div = tk.Frame(self, bg=self.bg_root, height=3)
+        self.div = tk.Frame(self, height=3)
         self.div.pack(fill="x")
+        th.bind(self.div, bg="root_bg")
 
-        self.div_hi_line = tk.Frame(self.div, bg=self.div_hi, height=1)
+        self.div_hi_line = tk.Frame(self.div, height=1)
         self.div_hi_line.pack(fill="x", side="top")
-        self.div_lo_line = tk.Frame(self.div, bg=self.div_lo, height=2)
+        self.div_lo_line = tk.Frame(self.div, height=2)
         self.div_lo_line.pack(fill="x", side="top")
+        th.bind(self.div_hi_line, bg="div_hi")
+        th.bind(self.div_lo_line, bg="div_lo")
 
         # ---- MAIN ----
-        self.main = tk.Frame(self, bg=self.bg_root)
+        self.main = tk.Frame(self)
         self.main.pack(fill="both", expand=True)
+        th.bind(self.main, bg="root_bg")
 
         self.main.grid_columnconfigure(0, weight=1, uniform="main")
         self.main.grid_columnconfigure(1, weight=0)
         self.main.grid_columnconfigure(2, weight=1, uniform="main")
         self.main.grid_rowconfigure(0, weight=1)
 
-        self.vdiv = tk.Frame(self.main, bg="#1b3a5f", width=3)
+        self.vdiv = tk.Frame(self.main, width=3)
         self.vdiv.grid(row=0, column=1, sticky="ns", padx=6, pady=14)
+        th.bind(self.vdiv, bg="vdiv")
 
-        self.agora = SectionFrame(self.main, "AGORA", is_day_theme=self.is_day_theme)
-        self.prox = SectionFrame(self.main, "PRÓXIMAS", is_day_theme=self.is_day_theme)
+        self.agora = SectionFrame(self.main, "AGORA", theme=th, animator=self.progress_anim)
+        self.prox = SectionFrame(self.main, "PRÓXIMAS", theme=th, animator=self.progress_anim)
 
         self.agora.grid(row=0, column=0, sticky="nsew", padx=(16, 8), pady=(10, 14))
         self.prox.grid(row=0, column=2, sticky="nsew", padx=(8, 16), pady=(10, 14))
 
+        # ---- TELA MÍNIMA (modo fechado; só é exibida pelo perfil de energia) ----
+        self.lowpower = tk.Frame(self, bg="#000000")
+        self.lp_time_lbl = tk.Label(self.lowpower, text="", font=("Segoe UI", 48, "bold"),
+                                    fg="#2a3a4e", bg="#000000")
+        self.lp_msg_lbl = tk.Label(self.lowpower, text="", font=("Segoe UI", 16, "bold"),
+                                   fg="#2a3a4e", bg="#000000")
+        self.lp_time_lbl.place(relx=0.5, rely=0.45, anchor="center")
+        self.lp_msg_lbl.place(relx=0.5, rely=0.58, anchor="center")
+
     def _rotate_hours(self):
+        self.hours_card.rotate()
+        self._push_hours()
+
+    # ---- perfil de energia ----
+
+    def _on_visibility(self, evt=None):
+        if evt is not None and evt.widget is not self:
+            return   # eventos dos filhos também chegam pela bindtag do toplevel
         try:
-            self.hours_card.tick_rotate()
-        finally:
-            self.after(9000, self._rotate_hours)
+            visible = bool(self.winfo_viewable())
+            if visible and getattr(evt, "state", None) == "VisibilityFullyObscured":
+                visible = False
+        except Exception:
+            visible = True
+        if visible != self._window_visible:
+            self._window_visible = visible
+            self._tick_power()
+
+    def _tick_power(self):
+        mode = self.power.mode(clock_mod.now(), self._window_visible)
+        if mode != self.power_mode:
+            self._set_power_mode(mode)
+
+    def _set_power_mode(self, mode: str):
+        prev = self.power_mode
+        self.power_mode = mode
+        log(f"[POWER] mode {prev} -> {mode} visible={self._window_visible}")
+
+        low = mode != MODE_FULL
+        self.sched.set_interval("tick", POWER_LOW_TICK_S if low else 1.0, align=True)
+        if self.backend is not None:
+            self.backend.send({"cmd": "power", "mode": mode})
+        if low:
+            self.sched.pause("hours_rotate")
+            self.progress_anim.pause()
+        else:
+            self.sched.resume("hours_rotate")
+            self.progress_anim.resume()
+
+        if mode == MODE_CLOSED and prev != MODE_CLOSED:
+            self.sched.pause("weather")
+            self.sched.pause("excel")
+            self.sched.set_interval("backend", POWER_LOW_TICK_S)   # backend só manda keepalive
+            self._show_lowpower(True)
+        elif prev == MODE_CLOSED and mode != MODE_CLOSED:
+            self._show_lowpower(False)
+            self.sched.set_interval("backend", BACKEND_POLL_S)
+            self.sched.resume("excel", run_now=True)
+            self.sched.resume("weather", run_now=True)
+
+        if not low:
+            self._tick()   # atualiza já (não espera o próximo segundo)
+
+    def _show_lowpower(self, on: bool):
+        if on:
+            for w in (self.header, self.div, self.main):
+                w.pack_forget()
+            self.lowpower.pack(fill="both", expand=True)
+            self._tick_lowpower()
+            if POWER_BLANK and not self._display_blanked:
+                self._display_blanked = display_power(False, logger=log)
+        else:
+            self.lowpower.pack_forget()
+            self.header.pack(fill="x", side="top")
+            self.div.pack(fill="x")
+            self.main.pack(fill="both", expand=True)
+            if self._display_blanked:
+                display_power(True, logger=log)
+                self._display_blanked = False
+
+    def _tick_lowpower(self):
+        """Tela mínima: HH:MM + próxima abertura (1 atualização por minuto)."""
+        now = clock_mod.now()
+        nxt = self.power.hours.next_open(now)
+        if nxt is None:
+            msg = "FECHADO"
+        elif nxt.date() == now.date():
+            msg = f"FECHADO • ABRE ÀS {nxt.strftime('%H:%M')}"
+        else:
+            wd = ["SEG", "TER", "QUA", "QUI", "SEX", "SÁB", "DOM"][nxt.weekday()]
+            msg = f"FECHADO • ABRE {wd} ÀS {nxt.strftime('%H:%M')}"
+        self.vm.set("lp.time", now.strftime("%H:%M"), lambda v: self.lp_time_lbl.configure(text=v))
+        self.vm.set("lp.msg", msg, lambda v: self.lp_msg_lbl.configure(text=v))
+
+    def _tick_theme(self):
+        self._check_assets()
+        if theme_is_day() != self.is_day_theme:
+            # recolore no lugar (1 passe, sem destruir/recriar a árvore → sem "piscar")
+            self._apply_theme()
+
+    def _push_hours(self):
+        hc = self.hours_card
+        self.vm.set("hours.view", hc.view_state(), hc.apply_view)
+        self.vm.set("hours.status", hc.status_state(), hc.apply_status)
 
     def _reload_excel_if_needed(self, force: bool = False):
+        if self.backend is not None:
+            return   # o backend lê o Excel
         try:
             mtime = os.path.getmtime(EXCEL_PATH)
-            if force or self.last_excel_mtime is None or mtime != self.last_excel_mtime:
-                items = load_classes_from_excel(EXCEL_PATH)
+            if force or self.last_excel_mtime is None or mtime != self.last_excel_mtime \
+                    or "excel" in self.prof.pending:
+                items = self.prof.run("excel", load_classes_from_excel, EXCEL_PATH)
                 self.all_items = items
                 self.last_excel_mtime = mtime
                 log(f"[XLSX] Excel carregado: {len(self.all_items)} itens. mtime={mtime}")
@@ -1322,54 +2141,8 @@ class SALApp(tk.Tk):
             log(f"[XLSX] Falha ao carregar Excel: {type(e).__name__}: {e}")
 
     def _compute_now_next(self) -> Tuple[List[Tuple], List[Tuple]]:
-        now_dt = datetime.now()
-        window_end = now_dt + timedelta(minutes=120)
-
-        now_list = []
-        next_list = []
-
-        discard_day = 0
-        discard_time = 0
-        discard_other = 0
-
-        for it in self.all_items:
-            interval, reason = _item_interval_debug(now_dt, it)
-            if not interval:
-                if reason == "invalid_day":
-                    discard_day += 1
-                elif reason == "invalid_time":
-                    discard_time += 1
-                else:
-                    discard_other += 1
-                continue
-
-            start_dt, end_dt = interval
-
-            if start_dt <= now_dt < end_dt:
-                total = (end_dt - start_dt).total_seconds()
-                done = (now_dt - start_dt).total_seconds()
-                progress = 0.0 if total <= 0 else max(0.0, min(1.0, done / total))
-                now_list.append((it.start, it.end, it.activity, it.teacher, it.location, it.tag,
-                                 progress, end_dt, start_dt))
-
-            elif now_dt <= start_dt <= window_end:
-                total_win = (window_end - now_dt).total_seconds()
-                remaining = (start_dt - now_dt).total_seconds()
-                if total_win <= 0:
-                    progress_next = 0.0
-                else:
-                    progress_next = 1.0 - (remaining / total_win)
-                    progress_next = max(0.0, min(1.0, progress_next))
-
-                progress_next = max(0.02, progress_next)
-                next_list.append((it.start, it.end, it.activity, it.teacher, it.location, it.tag,
-                                  progress_next, end_dt, start_dt))
-
-        now_list.sort(key=lambda t: t[7])   # end_dt
-        next_list.sort(key=lambda t: t[8])  # start_dt
-
-        now_cards = [(a, b, c, d, e, f, g) for (a, b, c, d, e, f, g, _end, _start) in now_list]
-        next_cards = [(a, b, c, d, e, f, g) for (a, b, c, d, e, f, g, _end, _start) in next_list]
+        now_dt = clock_mod.now()
+        now_cards, next_cards, discards = compute_now_next(self.all_items, now_dt)
 
         if self.all_items and (len(now_cards) == 0 and len(next_cards) == 0):
             if time.time() - self._last_zero_agenda_log_ts > 60:
@@ -1377,24 +2150,19 @@ class SALApp(tk.Tk):
                 sample = self.all_items[:4]
                 log(
                     "[AGENDA] 0 em AGORA/PRÓXIMAS | "
-                    f"now={now_dt.strftime('%Y-%m-%d %H:%M:%S')} window_end={window_end.strftime('%Y-%m-%d %H:%M:%S')} "
+                    f"now={now_dt.strftime('%Y-%m-%d %H:%M:%S')} "
+                    f"window_end={(now_dt + timedelta(minutes=NEXT_WINDOW_MIN)).strftime('%Y-%m-%d %H:%M:%S')} "
                     f"today_code={today_3letters_noaccent()} "
-                    f"discard_day={discard_day} discard_time={discard_time} discard_other={discard_other} "
+                    f"discard_day={discards['invalid_day']} discard_time={discards['invalid_time']} "
+                    f"discard_other={discards['other']} "
                     f"sample_items={sample}"
                 )
 
-        return now_cards[:6], next_cards[:6]
+        return now_cards, next_cards
 
     def _weather_worker(self):
         try:
-            res = weather_mod.get_weather(
-                city_label="Alfenas",
-                lat=-21.4267,
-                lon=-45.9470,
-                app_dir=APP_DIR,
-                user_agent="SAL-SESIAgendaLive/2.0 (contact: local)",
-                logger=log,
-            )
+            res = self.prof.run("weather", weather_mod.get_weather, app_dir=APP_DIR, logger=log, **WEATHER_ARGS)
             with self._weather_lock:
                 self.weather_res = res
                 self.weather_last_fetch = time.time()
@@ -1405,9 +2173,9 @@ class SALApp(tk.Tk):
                 self._weather_inflight = False
 
     def _tick_weather(self):
-        if (time.time() - self.weather_last_fetch) < 600 and self.weather_res is not None:
-            return
-
+        # cadência (WEATHER_REFRESH_S) vem do scheduler; aqui só evita 2 fetches simultâneos
+        if self.backend is not None:
+            return   # o backend busca o clima na própria cadência
         with self._weather_lock:
             if self._weather_inflight:
                 return
@@ -1416,13 +2184,17 @@ class SALApp(tk.Tk):
         th = threading.Thread(target=self._weather_worker, daemon=True)
         th.start()
 
+    def _tick_profile(self):
+        """1x por minuto: profile.flag (arma e apaga) e tempo/gravação do amostrador."""
+        if self.prof.check_flag_file(PROFILE_FLAG_PATH) and "weather" in self.prof.pending:
+            self._tick_weather()   # não espera os 10 min do próximo fetch
+        self.prof.poll()
+
     def _tick_housekeeping(self):
-        if time.time() - self._last_housekeeping_ts < 86400:
-            return
-        self._last_housekeeping_ts = time.time()
         try:
             _rotate_logs_if_needed(logger=log)
-            weather_mod.housekeeping(app_dir=APP_DIR, logger=log)
+            if self.backend is None:   # com backend, a limpeza dos caches roda lá
+                weather_mod.housekeeping(app_dir=APP_DIR, logger=log)
         except Exception as e:
             log(f"[HK] error {type(e).__name__}: {e}")
 
@@ -1431,51 +2203,59 @@ class SALApp(tk.Tk):
             return
         self._tick_running = True
 
-        try:
-            new_theme = theme_is_day()
-            if new_theme != self.is_day_theme:
-                self._apply_theme()
-                self._build_ui()
-
-            d, t, wd = date_time_strings()
-            self.date_lbl.configure(text=d)
-            self.time_lbl.configure(text=t)
-            self.wd_lbl.configure(text=wd)
-
-            self.hours_card.update_status_only()
-
-            self._reload_excel_if_needed(force=False)
-
-            now_cards, next_cards = self._compute_now_next()
-            self.agora.set_cards(now_cards)
-            self.prox.set_cards(next_cards)
+        if self.power_mode == MODE_CLOSED:
+            try:
+                self._tick_lowpower()
+            finally:
+                self._tick_running = False
+            return
 
-            self._tick_weather()
+        perf = self.perf
+        perf.begin_tick()   # atraso do loop é medido pelo scheduler
+        try:
+            vm = self.vm
+            with perf.phase("header"):
+                d, t, wd = date_time_strings()
+                vm.set("date", d, lambda v: self.date_lbl.configure(text=v))
+                vm.set("time", t, lambda v: self.time_lbl.configure(text=v))
+                vm.set("weekday", wd, lambda v: self.wd_lbl.configure(text=v))
+
+            with perf.phase("hours"):
+                self._push_hours()
+
+            with perf.phase("now_next"):
+                snap = self._backend_snap
+                if self.backend is not None and snap is not None:
+                    now_cards, next_cards = snap["agora"], snap["proximas"]
+                else:
+                    now_cards, next_cards = self._compute_now_next()
 
-            with self._weather_lock:
-                res = self.weather_res
-            if res:
-                self.weather_card.set_weather("Alfenas", res)
+            # cards: chave sem o progress (a barra anda pelo ProgressAnimator);
+            # só troca de aula/janela gera commit
+            with perf.phase("cards"):
+                vm.set("agora.cards", _cards_state(now_cards), lambda _v, c=now_cards: self.agora.set_cards(c))
+                vm.set("prox.cards", _cards_state(next_cards), lambda _v, c=next_cards: self.prox.set_cards(c))
 
-            self._tick_housekeeping()
+            with perf.phase("weather"):
+                with self._weather_lock:
+                    res = self.weather_res
+                if res:
+                    wc = self.weather_card
+                    vm.set("weather", wc.weather_state("Alfenas", res), wc.apply_weather)
 
         except Exception:
             log("Tick error:\n" + traceback.format_exc())
 
         finally:
             self._tick_running = False
-
-            try:
-                if getattr(self, "_tick_job", None) is not None:
-                    self.after_cancel(self._tick_job)
-            except Exception:
-                pass
-
-            self._tick_job = self.after(1000, self._tick)
+            perf.end_tick()
 
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()   # .exe do PyInstaller + backend em processo (spawn)
     try:
         SALApp().mainloop()
     except Exception:
         log("Fatal error:\n" + traceback.format_exc())
+        sys.exit(1)   # != 0 → supervisor reinicia
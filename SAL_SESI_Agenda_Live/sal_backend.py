@@ -0,0 +1,347 @@
+# sal_backend.py
+# SAL - Backend em processo separado (opcional: SAL_BACKEND=process)
+# O processo do backend é dono do grade.xlsx, do clima, da limpeza diária dos caches e do cálculo de
+# AGORA/PRÓXIMAS; a UI (sal.py) só recebe retratos compactos por um multiprocessing.Pipe.
+# Leitura lenta do Excel ou handshake TLS travado não disputam o GIL com o loop Tk, e um crash
+# do backend não derruba a tela (a UI continua com o último retrato).
+# Sem tkinter aqui (spawn no Windows importa este módulo no filho).
+# Excel e clima rodam em threads do backend: o loop de retratos/keepalive nunca espera uma leitura.
+# Mensagens backend → UI:
+#   {"t": "snap", "seq", "ts", "agora", "proximas", "items", "excel_mtime", "discards", "weather"}
+#     (só quando algo muda: cards, clima, Excel)
+#   {"t": "hb", "ts"}   a cada BACKEND_KEEPALIVE_S sem retrato novo
+#   {"t": "log", "msg"} linha para o sal.log (1 único escritor: a UI)
+# Comandos UI → backend: {"cmd": "power", "mode"} | {"cmd": "weather"} | {"cmd": "stop"}
+# ✅ UI: backend morto ou mudo por BACKEND_STALE_S → reinicia; BACKEND_MAX_RESTARTS em
+#    BACKEND_RESTART_WINDOW_S → volta ao modo de 1 processo (fallback)
+# ✅ modo "closed" (madrugada): sem AGORA/PRÓXIMAS nem retratos; o loop acorda a cada
+#    BACKEND_CLOSED_TICK_S só para o keepalive (e a limpeza diária); a UI tolera BACKEND_CLOSED_STALE_S
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import clock as clock_mod
+import weather as weather_mod
+from agenda_engine import compute_now_next, load_classes_from_excel
+from power import MODE_CLOSED, POWER_LOW_TICK_S
+
+
+BACKEND_TICK_S = 1.0              # AGORA/PRÓXIMAS na virada de cada segundo (como o _tick)
+BACKEND_KEEPALIVE_S = 2.0
+BACKEND_STALE_S = 10.0            # UI: sem mensagem por isso → backend travado
+BACKEND_START_GRACE_S = 30.0      # 1ª mensagem (imports + Excel) pode demorar mais
+BACKEND_CLOSED_TICK_S = POWER_LOW_TICK_S          # fechado: 1 keepalive por minuto, nada de cálculo
+BACKEND_CLOSED_STALE_S = 3 * BACKEND_CLOSED_TICK_S
+BACKEND_MAX_RESTARTS = 3
+BACKEND_RESTART_WINDOW_S = 600.0
+BACKEND_JOIN_S = 2.0
+
+
+def _card_key(cards: List[tuple]) -> tuple:
+    """Identidade dos cards sem o progress (a barra anda pelo track no ProgressAnimator)."""
+    return tuple(c[:6] + (c[7],) for c in cards)
+
+
+def _next_daily(hhmm: str, now: datetime) -> datetime:
+    hh, mm = (int(x) for x in hhmm.split(":", 1))
+    due = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    return due if due > now else due + timedelta(days=1)
+
+
+# -------------------------
+# Processo do backend
+# -------------------------
+
+class Backend:
+    def __init__(self, conn, excel_path: str, app_dir: str, weather_kwargs: Dict[str, Any],
+                 weather_refresh_s: float, excel_check_s: float, housekeeping_at: str):
+        self.conn = conn
+        self.excel_path = excel_path
+        self.app_dir = app_dir
+        self.weather_kwargs = weather_kwargs
+        self.weather_refresh_s = weather_refresh_s
+        self.excel_check_s = excel_check_s
+        self.housekeeping_at = housekeeping_at
+
+        self.items: List = []
+        self.excel_mtime: Optional[float] = None
+        self.power_mode: Optional[str] = None
+        self.seq = 0
+
+        self._weather: Optional[Dict[str, Any]] = None
+        self._weather_lock = threading.Lock()
+        self._weather_inflight = False
+        self._weather_due = 0.0        # já no boot
+        self._excel_due = 0.0
+        self._excel_inflight = False
+        self._hk_due = _next_daily(housekeeping_at, clock_mod.now())
+        self._last_key: Optional[tuple] = None
+        self._last_sent = 0.0
+        self._send_lock = threading.Lock()
+        self._stop = False
+
+    def _send(self, msg: Dict[str, Any]) -> None:
+        with self._send_lock:
+            self.conn.send(msg)
+        self._last_sent = time.monotonic()
+
+    def log(self, msg: str) -> None:
+        try:
+            self._send({"t": "log", "msg": msg})
+        except Exception:
+            pass
+
+    # ---- tarefas ----
+
+    def _start_excel(self) -> None:
+        if self._excel_inflight:
+            return
+        self._excel_inflight = True
+        threading.Thread(target=self._excel_worker, name="sal-backend-excel", daemon=True).start()
+
+    def _excel_worker(self) -> None:
+        """mtime + leitura fora do loop; a lista nova entra inteira (troca de referência)."""
+        try:
+            mtime = os.path.getmtime(self.excel_path)
+            if mtime != self.excel_mtime:
+                t0 = time.perf_counter()
+                items = load_classes_from_excel(self.excel_path)
+                self.items, self.excel_mtime = items, mtime
+                self.log(f"[BACKEND] Excel carregado: {len(items)} itens. mtime={mtime} "
+                         f"ms={(time.perf_counter() - t0) * 1000.0:.0f}")
+        except Exception as e:
+            self.log(f"[BACKEND] Falha ao carregar Excel: {type(e).__name__}: {e}")
+        finally:
+            self._excel_inflight = False
+
+    def _start_weather(self) -> None:
+        with self._weather_lock:
+            if self._weather_inflight:
+                return
+            self._weather_inflight = True
+        threading.Thread(target=self._weather_worker, name="sal-backend-weather", daemon=True).start()
+
+    def _weather_worker(self) -> None:
+        try:
+            res = weather_mod.get_weather(app_dir=self.app_dir, logger=self.log, **self.weather_kwargs)
+            with self._weather_lock:
+                self._weather = asdict(res)
+        except Exception as e:
+            self.log(f"[BACKEND] Weather error {type(e).__name__}: {e}")
+        finally:
+            with self._weather_lock:
+                self._weather_inflight = False
+
+    def _housekeeping(self) -> None:
+        try:
+            weather_mod.housekeeping(app_dir=self.app_dir, logger=self.log)
+        except Exception as e:
+            self.log(f"[BACKEND] Housekeeping error {type(e).__name__}: {e}")
+
+    def _handle(self, msg: Dict[str, Any]) -> None:
+        cmd = msg.get("cmd")
+        if cmd == "stop":
+            self._stop = True
+        elif cmd == "power":
+            prev, self.power_mode = self.power_mode, msg.get("mode")
+            if prev == MODE_CLOSED and self.power_mode != MODE_CLOSED:
+                self._excel_due = self._weather_due = 0.0   # reabriu: atualiza já
+                self._last_key = None                        # e manda retrato novo mesmo sem mudança
+        elif cmd == "weather":
+            self._weather_due = 0.0
+
+    # ---- loop ----
+
+    def step(self) -> None:
+        mono = time.monotonic()
+        closed = self.power_mode == MODE_CLOSED
+
+        if not closed and mono >= self._excel_due:
+            self._excel_due = mono + self.excel_check_s
+            self._start_excel()
+        if not closed and mono >= self._weather_due:
+            self._weather_due = mono + self.weather_refresh_s
+            self._start_weather()
+
+        now = clock_mod.now()
+        if now >= self._hk_due:
+            self._hk_due = _next_daily(self.housekeeping_at, now)
+            threading.Thread(target=self._housekeeping, name="sal-backend-hk", daemon=True).start()
+
+        if closed:
+            if mono - self._last_sent >= BACKEND_KEEPALIVE_S:
+                self._send({"t": "hb", "ts": clock_mod.time()})
+            return
+
+        items, excel_mtime = self.items, self.excel_mtime    # mesmo par mesmo se a thread trocar agora
+        now_cards, next_cards, discards = compute_now_next(items, now)
+        with self._weather_lock:
+            w = self._weather
+        key = (_card_key(now_cards), _card_key(next_cards), excel_mtime, repr(w))
+        if key != self._last_key:
+            self._last_key = key
+            self.seq += 1
+            self._send({"t": "snap", "seq": self.seq, "ts": clock_mod.time(),
+                        "agora": now_cards, "proximas": next_cards, "items": len(items),
+                        "excel_mtime": excel_mtime, "discards": discards, "weather": w})
+        elif mono - self._last_sent >= BACKEND_KEEPALIVE_S:
+            self._send({"t": "hb", "ts": clock_mod.time()})
+
+    def run(self) -> None:
+        self.log(f"[BACKEND] Started pid={os.getpid()}")
+        while not self._stop:
+            while self.conn.poll(0):
+                self._handle(self.conn.recv())
+            if self._stop:
+                break
+            self.step()
+            # dorme até a próxima virada do segundo (fechado: BACKEND_CLOSED_TICK_S);
+            # acorda antes se chegar comando
+            if self.power_mode == MODE_CLOSED:
+                self.conn.poll(BACKEND_CLOSED_TICK_S)
+                continue
+            now = clock_mod.time()
+            self.conn.poll(max(0.005, BACKEND_TICK_S - (now % BACKEND_TICK_S) + 0.003))
+        self.log("[BACKEND] Stopped")
+
+
+def backend_main(conn, cfg: Dict[str, Any]) -> None:
+    """Alvo do multiprocessing.Process (nível de módulo: funciona com spawn)."""
+    b = Backend(conn, **cfg)
+    try:
+        b.run()
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass   # UI fechou o pipe
+
+
+# -------------------------
+# Lado da UI
+# -------------------------
+
+class BackendClient:
+    """
+    Na UI (tarefa do scheduler a cada ~0.5s):
+        snap = client.poll()      # último retrato novo (ou None); cuida de reinício/fallback
+        if not client.active: ... modo de 1 processo
+    """
+
+    def __init__(self, cfg: Dict[str, Any], logger=None):
+        self.cfg = cfg
+        self.logger = logger
+        self.active = False
+        self.proc: Optional[mp.Process] = None
+        self.conn = None
+        self.snap: Optional[Dict[str, Any]] = None
+        self.restarts: List[float] = []
+        self._started = 0.0
+        self._last_msg = 0.0
+        self._first_snap = False       # 1º retrato deste processo (prazo de boot até lá)
+        self._power: Optional[str] = None
+
+    def _log(self, msg: str) -> None:
+        if self.logger:
+            self.logger(msg)
+
+    def start(self) -> bool:
+        try:
+            ctx = mp.get_context("spawn")    # igual em Windows/Linux; nada do Tk vai para o filho
+            ui_conn, be_conn = ctx.Pipe(duplex=True)
+            proc = ctx.Process(target=backend_main, args=(be_conn, self.cfg),
+                               name="sal-backend", daemon=True)
+            proc.start()
+            be_conn.close()
+        except Exception as e:
+            self._log(f"[BACKEND] Start error {type(e).__name__}: {e}")
+            self.active = False
+            return False
+        self.proc, self.conn = proc, ui_conn
+        self._started = self._last_msg = time.monotonic()
+        self._first_snap = False
+        self.active = True
+        if self._power is not None:
+            self.send({"cmd": "power", "mode": self._power})
+        self._log(f"[BACKEND] Spawned pid={proc.pid}")
+        return True
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        if msg.get("cmd") == "power":
+            if self._power == MODE_CLOSED and msg.get("mode") != MODE_CLOSED:
+                self._last_msg = time.monotonic()   # última batida veio no ritmo lento: prazo recomeça
+            self._power = msg.get("mode")
+        if not self.active or self.conn is None:
+            return
+        try:
+            self.conn.send(msg)
+        except Exception:
+            pass   # poll() percebe o processo morto
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        if not self.active:
+            return None
+        newest = None
+        try:
+            while self.conn.poll(0):
+                msg = self.conn.recv()
+                self._last_msg = time.monotonic()
+                t = msg.get("t")
+                if t == "snap":
+                    newest = self.snap = msg
+                    self._first_snap = True
+                elif t == "log":
+                    self._log(msg.get("msg", ""))
+        except (EOFError, OSError):
+            pass
+
+        mono = time.monotonic()
+        # cada start() tem o seu prazo de boot (spawn + imports), mesmo com retrato antigo na tela
+        limit = BACKEND_CLOSED_STALE_S if self._power == MODE_CLOSED else BACKEND_STALE_S
+        if not self._first_snap:
+            limit = max(BACKEND_START_GRACE_S, limit)
+        dead = not self.proc.is_alive()
+        if dead or mono - self._last_msg > limit:
+            why = f"exit={self.proc.exitcode}" if dead else f"silent_s={mono - self._last_msg:.0f}"
+            self._restart(why)
+        return newest
+
+    def _restart(self, why: str) -> None:
+        self._terminate()
+        now = time.monotonic()
+        self.restarts = [t for t in self.restarts if now - t < BACKEND_RESTART_WINDOW_S] + [now]
+        if len(self.restarts) > BACKEND_MAX_RESTARTS:
+            self.active = False
+            self._log(f"[BACKEND] Giving up after {len(self.restarts) - 1} restarts ({why}) → single-process mode")
+            return
+        self._log(f"[BACKEND] Backend lost ({why}) → restart n={len(self.restarts)}")
+        self.start()
+
+    def _terminate(self) -> None:
+        proc, conn = self.proc, self.conn
+        self.proc = self.conn = None
+        try:
+            if conn is not None:
+                conn.close()
+        except Exception:
+            pass
+        if proc is not None and proc.is_alive():
+            proc.terminate()
+            proc.join(BACKEND_JOIN_S)
+            if proc.is_alive():
+                proc.kill()
+
+    def stop(self) -> None:
+        if self.active and self.conn is not None:
+            try:
+                self.conn.send({"cmd": "stop"})
+            except Exception:
+                pass
+            if self.proc is not None:
+                self.proc.join(BACKEND_JOIN_S)
+        self._terminate()
+        self.active = False
@@ -0,0 +1,281 @@
+# sal_bench.py
+# SAL - Microbenchmarks dos caminhos quentes (ops/s + latência p50/p95/p99 por operação)
+# Casos:
+# - excel.load.{small,medium,huge}     load_classes_from_excel (planilhas do gen_schedule numa pasta temporária)
+# - engine.now_next.{10..100k}          compute_now_next (mesmo motor do _compute_now_next da UI)
+# - engine.parse_hhmm                   parse_hhmm (lote de 1000 strings por rodada)
+# - weather.extract_summary             _extract_summary em payloads do met.no (gravados ou sintéticos)
+# - log.append / log.rotating           sal.log() sem rotação / com rotação forçada (limite pequeno)
+# - weather.cleanup_archive.{N}         _cleanup_cache_archive numa pasta com N arquivos
+# Logs/caches vão para uma pasta temporária (LOCALAPPDATA redirecionado antes do import do sal).
+#
+# Uso (na pasta do app):
+#   python -m sal_bench                                  # tudo, tabela no terminal
+#   python -m sal_bench --quick --filter engine
+#   python -m sal_bench --json bench.json                # guarda o resultado
+#   python -m sal_bench --baseline bench.json --threshold 0.2   # p50 20% pior → exit 1
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from perfstats import summarize
+
+
+BENCH_MIN_TIME_S = 0.5          # cada caso roda pelo menos isso...
+BENCH_MAX_ITERS = 10_000        # ...e no máximo isso (rodadas)
+BENCH_THRESHOLD = 0.20          # p50 até 20% pior que a linha de base
+BENCH_ABS_SLACK_US = 2.0        # diferenças abaixo disso são ruído de timer
+
+EXCEL_SIZES = {"small": 50, "medium": 2_000, "huge": 20_000}
+ENGINE_SIZES = (10, 100, 1_000, 10_000, 100_000)
+CLEANUP_SIZES = (100, 1_000, 5_000)
+
+BENCH_NOW = datetime(2026, 3, 2, 18, 45)   # segunda-feira, horário de pico
+DAYS = ("SEG", "TER", "QUA", "QUI", "SEX", "SAB", "DOM")
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None   # antes de cada rodada (fora do tempo medido)
+    inner: int = 1                              # operações por rodada (ops muito curtas)
+    min_iters: int = 5
+    max_iters: int = BENCH_MAX_ITERS
+
+
+def run_case(case: Case, min_time_s: float = BENCH_MIN_TIME_S) -> Dict[str, Any]:
+    if case.setup:
+        case.setup()
+    case.fn()   # aquecimento (imports preguiçosos, caches do SO)
+
+    per_op_us: List[float] = []
+    measured = 0.0
+    while len(per_op_us) < case.max_iters and (measured < min_time_s or len(per_op_us) < case.min_iters):
+        if case.setup:
+            case.setup()
+        t0 = time.perf_counter()
+        case.fn()
+        dt = time.perf_counter() - t0
+        measured += dt
+        per_op_us.append(dt * 1e6 / case.inner)
+
+    ops = len(per_op_us) * case.inner
+    return {
+        "iters": len(per_op_us),
+        "ops": ops,
+        "ops_per_s": round(ops / measured, 1) if measured > 0 else None,
+        "us": {k: round(v, 3) for k, v in summarize(per_op_us, pcts=(50, 95, 99)).items()},
+    }
+
+
+# -------------------------
+# Dados sintéticos
+# -------------------------
+
+def synth_items(n: int, seed: int = 7):
+    from agenda_engine import ClassItem
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        start = rnd.randrange(6 * 60, 22 * 60, 15)
+        dur = rnd.choice((45, 50, 60, 90))
+        end = (start + dur) % (24 * 60)
+        out.append(ClassItem(
+            day=rnd.choice(DAYS),
+            start=f"{start // 60:02d}:{start % 60:02d}",
+            end=f"{end // 60:02d}:{end % 60:02d}",
+            activity=f"ATIVIDADE {i % 97}",
+            teacher=f"Professor {i % 41}",
+            location=f"Sala {i % 13}",
+            tag=rnd.choice(("GERAL", "MENOR")),
+        ))
+    return out
+
+
+def write_workbook(path: str, rows: int, seed: int = 7) -> None:
+    """Planilha no layout da aba SAL (gen_schedule: write_only, determinística por seed)."""
+    from gen_schedule import GenSpec, write_schedule
+    write_schedule(path, GenSpec(rows=rows, seed=seed))
+
+
+def _payloads(payload_dir: Optional[str]) -> List[Dict[str, Any]]:
+    from metno_standin import load_recorded_payloads, synth_locationforecast
+    if payload_dir:
+        raw = load_recorded_payloads(payload_dir)
+        if raw:
+            return [json.loads(b) for b in raw]
+    return [synth_locationforecast(-21.4267, -45.9470, start_ts=int(BENCH_NOW.timestamp()))]
+
+
+# -------------------------
+# Casos
+# -------------------------
+
+def build_cases(tmp: str, quick: bool, payload_dir: Optional[str]) -> List[Case]:
+    import agenda_engine as eng
+    import weather
+    import sal
+
+    cases: List[Case] = []
+    scale = 0.2 if quick else 1.0
+
+    for label, rows in EXCEL_SIZES.items():
+        rows = max(10, int(rows * scale))
+        path = os.path.join(tmp, f"grade_{label}.xlsx")
+        write_workbook(path, rows)
+        cases.append(Case(f"excel.load.{label}", lambda p=path: eng.load_classes_from_excel(p),
+                          min_iters=2 if rows > 5_000 else 5))
+
+    for n in ENGINE_SIZES:
+        if quick and n > 10_000:
+            continue
+        items = synth_items(n)
+        cases.append(Case(f"engine.now_next.{n}", lambda it=items: eng.compute_now_next(it, BENCH_NOW),
+                          min_iters=3))
+
+    samples = ["06:00", "18:30:00", " 7:05", "23:59", "24:00", "", "xx:yy", "12"] * 125
+    cases.append(Case("engine.parse_hhmm", lambda: [eng.parse_hhmm(s) for s in samples], inner=len(samples)))
+
+    payloads = _payloads(payload_dir)
+    state = {"i": 0}
+
+    def extract():
+        p = payloads[state["i"] % len(payloads)]
+        state["i"] += 1
+        weather._extract_summary(p, 12)
+    cases.append(Case("weather.extract_summary", extract))
+
+    line = "[BENCH] tick ok phase=cards ms=1.2 items=6"
+    cases.append(Case("log.append", lambda: [sal.log(line) for _ in range(100)], inner=100))
+
+    def log_rotating():
+        old = sal.LOG_ROTATE_MAX_BYTES
+        sal.LOG_ROTATE_MAX_BYTES = 4096    # ~80 linhas → rotação a cada poucas chamadas
+        try:
+            for _ in range(100):
+                sal.log(line)
+        finally:
+            sal.LOG_ROTATE_MAX_BYTES = old
+    cases.append(Case("log.rotating", log_rotating, inner=100))
+
+    for n in CLEANUP_SIZES:
+        if quick and n > 1_000:
+            continue
+        d = os.path.join(tmp, f"cache_old_{n}")
+        os.makedirs(d, exist_ok=True)
+
+        def refill(d=d, n=n):
+            have = len(os.listdir(d))
+            for i in range(have, n):
+                with open(os.path.join(d, f"weather_cache_{i:06d}_{random.random():.6f}.json"), "wb") as f:
+                    f.write(b"{}")
+        cases.append(Case(f"weather.cleanup_archive.{n}", lambda d=d: weather._cleanup_cache_archive(d),
+                          setup=refill, min_iters=3, max_iters=50))
+    return cases
+
+
+# -------------------------
+# Relatório / linha de base
+# -------------------------
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    problems = []
+    base = baseline.get("results", {})
+    for name, r in results.items():
+        b = base.get(name)
+        if not b:
+            continue
+        new_p50, old_p50 = r["us"].get("p50"), b["us"].get("p50")
+        if new_p50 is None or old_p50 is None:
+            continue
+        r["delta_p50"] = round((new_p50 - old_p50) / old_p50, 4) if old_p50 > 0 else None
+        if new_p50 > old_p50 * (1.0 + threshold) and new_p50 - old_p50 > BENCH_ABS_SLACK_US:
+            problems.append(f"{name}: p50 {old_p50:.1f}us → {new_p50:.1f}us (+{r['delta_p50']:.0%})")
+    return problems
+
+
+def _fmt_us(v: Optional[float]) -> str:
+    if v is None:
+        return "-"
+    if v >= 1e6:
+        return f"{v / 1e6:.2f}s"
+    if v >= 1e3:
+        return f"{v / 1e3:.2f}ms"
+    return f"{v:.1f}us"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Microbenchmarks do SAL")
+    ap.add_argument("--filter", action="append", default=[], help="só casos cujo nome contém isso (repetível)")
+    ap.add_argument("--quick", action="store_true", help="tamanhos menores (CI)")
+    ap.add_argument("--min-time", type=float, default=BENCH_MIN_TIME_S, help="s mínimos por caso")
+    ap.add_argument("--payload-dir", default=None, help="payloads do met.no gravados (*.json)")
+    ap.add_argument("--json", default=None, help="salva o resultado em JSON")
+    ap.add_argument("--baseline", default=None, help="JSON de uma execução anterior")
+    ap.add_argument("--threshold", type=float, default=BENCH_THRESHOLD)
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="sal_bench_")
+    old_lad = os.environ.get("LOCALAPPDATA")
+    os.environ["LOCALAPPDATA"] = tmp     # sal.log/DATA_DIR dentro da pasta temporária
+    try:
+        cases = build_cases(tmp, args.quick, args.payload_dir)
+        if args.filter:
+            cases = [c for c in cases if any(f in c.name for f in args.filter)]
+
+        results: Dict[str, Any] = {}
+        print(f"{'case':<32} {'ops/s':>12} {'p50':>10} {'p95':>10} {'p99':>10} {'iters':>6}")
+        for c in cases:
+            r = results[c.name] = run_case(c, args.min_time)
+            us = r["us"]
+            print(f"{c.name:<32} {r['ops_per_s'] or 0:>12,.1f} {_fmt_us(us.get('p50')):>10} "
+                  f"{_fmt_us(us.get('p95')):>10} {_fmt_us(us.get('p99')):>10} {r['iters']:>6}")
+    finally:
+        if old_lad is None:
+            os.environ.pop("LOCALAPPDATA", None)
+        else:
+            os.environ["LOCALAPPDATA"] = old_lad
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "min_time_s": args.min_time,
+        },
+        "results": results,
+    }
+
+    problems: List[str] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(results, json.load(f), args.threshold)
+        report["regressions"] = problems
+        for p in problems:
+            print("REGRESSION", p)
+        if not problems:
+            print(f"baseline ok (threshold {args.threshold:.0%})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
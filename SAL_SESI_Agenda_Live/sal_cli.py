@@ -0,0 +1,160 @@
+# sal_cli.py
+# SAL - Consulta sem interface (não importa tkinter): AGORA/PRÓXIMAS + horários num instante
+# Mesmo motor da tela (agenda_engine); serve para scripts, exportação via cron e benchmark.
+#
+# Uso:
+#   python sal_cli.py --now-next                                   # agora (relógio real)
+#   python sal_cli.py --now-next --at 2026-03-02T18:30 --format json
+#   python sal_cli.py --now-next --at 2026-03-02T07:00 --at 2026-03-02T19:45 --format text
+#   type instantes.txt | python sal_cli.py --now-next --stdin      # 1 instante por linha → 1 JSON por linha
+# Em lote (--stdin ou vários --at) com --format json a saída é JSONL (1 objeto por linha, com flush).
+# O grade.xlsx é recarregado no meio do lote se o mtime mudar.
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import clock as clock_mod
+from agenda_engine import (
+    HOURS_ITEMS, compute_now_next, day_code, hours_labels, is_day_theme, load_classes_from_excel,
+)
+from power import OpeningHours, PowerPolicy
+
+
+DEFAULT_EXCEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grade.xlsx")
+
+CARD_FIELDS = ("start", "end", "activity", "teacher", "location", "tag")
+
+
+class Agenda:
+    """grade.xlsx carregado 1x (recarrega só quando o mtime muda)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.items: List = []
+        self.mtime: Optional[float] = None
+        self.loads = 0
+
+    def ensure(self) -> None:
+        mtime = os.path.getmtime(self.path)
+        if mtime != self.mtime:
+            self.items = load_classes_from_excel(self.path)
+            self.mtime = mtime
+            self.loads += 1
+
+
+def _hhmm(s: str) -> str:
+    return ":".join(str(s).strip().split(":")[:2])
+
+
+def _card(c: tuple) -> Dict[str, Any]:
+    out = {k: c[i] for i, k in enumerate(CARD_FIELDS)}
+    out["start"] = _hhmm(out["start"])
+    out["end"] = _hhmm(out["end"])
+    out["progress"] = round(float(c[6]), 4)
+    return out
+
+
+def evaluate(items, at: datetime, power: Optional[PowerPolicy] = None) -> Dict[str, Any]:
+    now_cards, next_cards, discards = compute_now_next(items, at)
+    power = power or PowerPolicy(OpeningHours(HOURS_ITEMS), enabled=True)
+    hours = []
+    for item in HOURS_ITEMS:
+        is_open, status, sub = hours_labels(item, at)
+        hours.append({"name": item["name"], "open": is_open, "status": status, "sub": sub})
+    return {
+        "at": at.isoformat(timespec="seconds"),
+        "day": day_code(at),
+        "theme": "day" if is_day_theme(at) else "night",
+        "power": power.mode(at, True),
+        "agora": [_card(c) for c in now_cards],
+        "proximas": [_card(c) for c in next_cards],
+        "hours": hours,
+        "discards": discards,
+    }
+
+
+def format_text(res: Dict[str, Any]) -> str:
+    if "error" in res:
+        return f"{res.get('at', '?')}  ERRO: {res['error']}"
+    lines = [f"{res['at']}  {res['day']}  tema={res['theme']}  energia={res['power']}"]
+    for title, key in (("AGORA", "agora"), ("PRÓXIMAS", "proximas")):
+        lines.append(f"  {title}:" + ("" if res[key] else " —"))
+        for c in res[key]:
+            extra = " | ".join(x for x in (c["teacher"], c["location"]) if x)
+            tag = f" [{c['tag']}]" if c["tag"] else ""
+            lines.append(f"    {c['start']}–{c['end']}  {c['activity']}{tag}" + (f"  ({extra})" if extra else ""))
+    lines.append("  HORÁRIOS: " + "; ".join(f"{h['name']} {h['status']} ({h['sub']})" for h in res["hours"]))
+    return "\n".join(lines)
+
+
+def _instants(ats: List[str], stdin: Optional[Iterable[str]]) -> Iterator[str]:
+    for a in ats:
+        yield a
+    if stdin is not None:
+        for line in stdin:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="SAL sem interface: AGORA/PRÓXIMAS e horários num instante")
+    ap.add_argument("--now-next", action="store_true", help="avalia AGORA/PRÓXIMAS (modo padrão)")
+    ap.add_argument("--at", action="append", default=[], help="instante local YYYY-MM-DDTHH:MM[:SS] (repetível)")
+    ap.add_argument("--stdin", action="store_true", help="lê instantes da entrada padrão (1 por linha)")
+    ap.add_argument("--format", choices=("json", "text"), default="json")
+    ap.add_argument("--excel", default=DEFAULT_EXCEL)
+    args = ap.parse_args(argv)
+
+    agenda = Agenda(args.excel)
+    try:
+        agenda.ensure()
+    except Exception as e:
+        print(f"erro ao carregar {args.excel}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+
+    power = PowerPolicy(OpeningHours(HOURS_ITEMS), enabled=True)
+    batch = args.stdin or len(args.at) > 1
+    if args.at or args.stdin:
+        source: Iterable[Optional[str]] = _instants(args.at, sys.stdin if args.stdin else None)
+    else:
+        source = [None]   # sem instante → agora
+
+    errors = 0
+    n = 0
+    t0 = time.perf_counter()
+    for spec in source:
+        try:
+            at = clock_mod.now() if spec is None else datetime.fromisoformat(spec)
+            agenda.ensure()
+            res = evaluate(agenda.items, at, power)
+        except Exception as e:
+            errors += 1
+            res = {"at": spec, "error": f"{type(e).__name__}: {e}"}
+        n += 1
+
+        if args.format == "text":
+            out = format_text(res)
+        elif batch:
+            out = json.dumps(res, ensure_ascii=False, separators=(",", ":"))
+        else:
+            out = json.dumps(res, ensure_ascii=False, indent=2)
+        sys.stdout.write(out + "\n")
+        if batch:
+            sys.stdout.flush()
+
+    if batch:
+        ms = (time.perf_counter() - t0) * 1000.0
+        print(f"instants={n} errors={errors} loads={agenda.loads} ms={ms:.1f}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
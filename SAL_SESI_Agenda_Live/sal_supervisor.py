@@ -0,0 +1,194 @@
+# sal_supervisor.py
+# SAL - Supervisor: sobe o sal.py como processo filho e reinicia se ele cair ou travar
+# - filho com SAL_SUPERVISED=1 → o watchdog do app sai sozinho (faulthandler exit) quando o loop Tk trava
+# - state.json sem batida nova por SUPERVISOR_STALE_S (ou nunca, após SUPERVISOR_BOOT_GRACE_S) → kill + reinício
+#   a execução é reconhecida pelo SAL_SUPERVISOR_RUN (token por spawn) gravado no state.json, não pelo PID:
+#   o .exe one-file do PyInstaller e o python.exe de venv sobem o app num 2º processo
+# - kill derruba a árvore inteira (taskkill /T no Windows, grupo de processos no POSIX): nada de UI órfã
+# - saída 0 (Esc / fechamento normal) → supervisor encerra junto
+# - reinícios com espera crescente (2s, 4s, ... até 2 min); volta a 2s depois de 10 min estável
+# - SAL_RESTARTS / SAL_RESTART_REASON (crash|stall|stale) repassados ao filho (aparecem no [HANG] do sal.log)
+# Log próprio: DATA_DIR/logs/supervisor.log
+#
+# Uso (atalho de inicialização do Windows apontando para cá):
+#   pythonw sal_supervisor.py
+#   python sal_supervisor.py --stale 300 -- C:\SAL\SAL_SESI_Agenda_Live.exe
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+from watchdog import (
+    ENV_RESTART_REASON, ENV_RESTARTS, ENV_RUN_TOKEN, ENV_SUPERVISED, WATCHDOG_STALL_S, read_state,
+)
+
+
+APP_NAME = "SAL_SESI_Agenda_Live"
+SUPERVISOR_POLL_S = 5.0
+SUPERVISOR_BOOT_GRACE_S = 180.0           # até a 1ª batida (Excel, logo, fontes...)
+SUPERVISOR_STALE_S = 3 * WATCHDOG_STALL_S  # faulthandler já deveria ter saído em WATCHDOG_STALL_S
+SUPERVISOR_BACKOFF_S = (2, 4, 8, 15, 30, 60, 120)
+SUPERVISOR_HEALTHY_S = 600.0              # rodou isso → zera a espera
+SUPERVISOR_KILL_WAIT_S = 10.0
+
+
+def data_dir() -> str:
+    """Mesma regra do sal.data_dir() (sem importar o app/tkinter)."""
+    base = os.environ.get("LOCALAPPDATA")
+    if not base:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "_data")
+    return os.path.join(base, APP_NAME)
+
+
+class Supervisor:
+    def __init__(self, cmd: List[str], data: str, stale_s: float = SUPERVISOR_STALE_S,
+                 boot_grace_s: float = SUPERVISOR_BOOT_GRACE_S):
+        self.cmd = cmd
+        self.state_path = os.path.join(data, "state.json")
+        self.hang_path = os.path.join(data, "logs", "hang.log")
+        self.log_path = os.path.join(data, "logs", "supervisor.log")
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        self.stale_s = stale_s
+        self.boot_grace_s = boot_grace_s
+        self.restarts = 0
+        self._backoff_i = 0
+        self._run = ""
+
+    def log(self, msg: str) -> None:
+        try:
+            ts = time.strftime("%Y-%m-%d %H:%M:%S")
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"[{ts}] {msg}\n")
+        except Exception:
+            pass
+
+    def _hang_size(self) -> int:
+        try:
+            return os.path.getsize(self.hang_path)
+        except OSError:
+            return 0
+
+    def _spawn(self, reason: Optional[str]) -> subprocess.Popen:
+        env = dict(os.environ)
+        env[ENV_SUPERVISED] = "1"
+        env[ENV_RESTARTS] = str(self.restarts)
+        self._run = uuid.uuid4().hex
+        env[ENV_RUN_TOKEN] = self._run
+        if reason:
+            env[ENV_RESTART_REASON] = reason
+        else:
+            env.pop(ENV_RESTART_REASON, None)
+        if os.name == "nt":
+            child = subprocess.Popen(self.cmd, env=env)
+        else:
+            child = subprocess.Popen(self.cmd, env=env, start_new_session=True)   # grupo próprio → killpg
+        self.log(f"[SUP] Started pid={child.pid} run={self._run[:8]} restarts={self.restarts} "
+                 f"reason={reason or '-'}")
+        return child
+
+    def _stale(self, child: subprocess.Popen, started: float) -> Optional[float]:
+        """Segundos sem batida (None se ainda está no prazo)."""
+        st = read_state(self.state_path)
+        now = time.time()
+        if st.get("run") != self._run:
+            age = now - started
+            return age if age > self.boot_grace_s else None
+        age = now - float(st.get("beat_ts") or 0)
+        return age if age > self.stale_s else None
+
+    def _kill_tree(self, child: subprocess.Popen, force: bool) -> None:
+        """Filho + descendentes (bootloader do PyInstaller / launcher do venv + o app de verdade)."""
+        try:
+            if os.name == "nt":
+                cmd = ["taskkill", "/PID", str(child.pid), "/T"] + (["/F"] if force else [])
+                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               timeout=SUPERVISOR_KILL_WAIT_S)
+            else:
+                os.killpg(child.pid, signal.SIGKILL if force else signal.SIGTERM)
+        except ProcessLookupError:
+            pass                                  # grupo já vazio
+        except Exception as e:
+            self.log(f"[SUP] Kill tree error pid={child.pid} force={force} {type(e).__name__}: {e}")
+            if force:
+                child.kill()
+            else:
+                child.terminate()
+
+    def _kill(self, child: subprocess.Popen) -> None:
+        self._kill_tree(child, force=False)
+        try:
+            child.wait(SUPERVISOR_KILL_WAIT_S)
+        except subprocess.TimeoutExpired:
+            pass
+        # o que sobrou da árvore (o líder pode sair antes do app de verdade)
+        self._kill_tree(child, force=True)
+        child.wait()
+
+    def run(self) -> int:
+        reason: Optional[str] = None
+        while True:
+            hang0 = self._hang_size()
+            started = time.time()
+            child = self._spawn(reason)
+            rc: Optional[int] = None
+            try:
+                while rc is None:
+                    time.sleep(SUPERVISOR_POLL_S)
+                    rc = child.poll()
+                    if rc is None:
+                        stale = self._stale(child, started)
+                        if stale is not None:
+                            self.log(f"[SUP] No heartbeat for {stale:.0f}s pid={child.pid} → kill")
+                            self._kill(child)
+                            rc = child.returncode
+                            reason = "stale"
+                            break
+                else:
+                    reason = "stall" if self._hang_size() > hang0 else "crash"
+            except KeyboardInterrupt:
+                self.log("[SUP] Interrupted → stopping child")
+                self._kill(child)
+                return 130
+
+            ran = time.time() - started
+            if rc == 0 and reason != "stale":
+                self.log(f"[SUP] Child exited cleanly after {ran:.0f}s → stop")
+                return 0
+
+            if ran >= SUPERVISOR_HEALTHY_S:
+                self._backoff_i = 0
+            wait = SUPERVISOR_BACKOFF_S[min(self._backoff_i, len(SUPERVISOR_BACKOFF_S) - 1)]
+            self._backoff_i += 1
+            self.restarts += 1
+            self.log(f"[SUP] Child exited rc={rc} reason={reason} after {ran:.0f}s → restart in {wait}s")
+            time.sleep(wait)
+
+
+def default_cmd() -> List[str]:
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [sys.executable, os.path.join(here, "sal.py")]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Supervisor do SAL (reinicia em crash/travamento)")
+    ap.add_argument("--stale", type=float, default=SUPERVISOR_STALE_S, help="s sem batida no state.json → kill")
+    ap.add_argument("--boot-grace", type=float, default=SUPERVISOR_BOOT_GRACE_S, help="s até a 1ª batida")
+    ap.add_argument("--data-dir", default=None, help="padrão: %%LOCALAPPDATA%%\\SAL_SESI_Agenda_Live")
+    ap.add_argument("cmd", nargs=argparse.REMAINDER, help="-- comando do app (padrão: python sal.py)")
+    args = ap.parse_args(argv)
+
+    cmd = [c for c in args.cmd if c != "--"] or default_cmd()
+    sup = Supervisor(cmd, args.data_dir or data_dir(), stale_s=args.stale, boot_grace_s=args.boot_grace)
+    sup.log(f"[SUP] Boot cmd={cmd} stale_s={args.stale:.0f}")
+    return sup.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
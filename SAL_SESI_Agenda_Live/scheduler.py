@@ -0,0 +1,267 @@
+# scheduler.py
+# SAL - Agendador central de tarefas (multi-cadência, sem drift) sobre o after() do Tk
+# - every(name, intervalo, fn, align=True)  → grade alinhada ao relógio (segundo, minuto, ...)
+# - every(name, intervalo, fn)              → grade a partir do start (sem acumular atraso)
+# - daily(name, "HH:MM", fn)                → horário local fixo, 1x por dia
+# - pause/resume/set_interval                → perfis de energia (tick lento, clima suspenso)
+# O próximo vencimento sai da grade (vencimento anterior + intervalo), nunca de "agora + intervalo":
+# o tempo gasto pela tarefa não empurra as próximas, e o relógio do cabeçalho cai logo após
+# a virada do segundo (sem pular segundos).
+# ✅ 1 único after() pendente (até a próxima tarefa que vence)
+# ✅ tempo por tarefa (runs, total/max ms) + atraso do loop no FrameMonitor
+# ✅ relógio do sistema mudou (NTP/horário de verão) → grade recalculada
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+
+SCHED_SLACK_MS = 3               # acorda um pouco depois da fronteira (strftime já vê o segundo novo)
+SCHED_MAX_SLEEP_MS = 60_000      # nunca dorme mais que isso (reavalia a grade após saltos do relógio)
+SCHED_SLOW_TASK_MS = 100.0       # tarefa acima disso → log (com cooldown)
+SCHED_SLOW_LOG_COOLDOWN_S = 300
+
+
+@dataclass
+class Task:
+    name: str
+    fn: Callable[[], Any]
+    interval_s: float = 0.0            # 0 → tarefa diária (daily_at)
+    align: bool = False                # grade em múltiplos do intervalo desde a época (wall clock)
+    daily_at: Optional[str] = None     # "HH:MM" local
+    next_due: float = 0.0              # epoch (s)
+    paused: bool = False
+
+    runs: int = 0
+    skipped: int = 0                   # vencimentos perdidos (loop travado / máquina suspensa)
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    last_slow_log: float = field(default=-1e9)
+
+
+def _next_daily(hhmm: str, now: float) -> float:
+    hh, mm = (int(x) for x in hhmm.split(":", 1))
+    base = datetime.fromtimestamp(now)
+    due = base.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    if due.timestamp() <= now:
+        due = due + timedelta(days=1)
+    return due.timestamp()
+
+
+class Scheduler:
+    """
+    Agendador sobre um widget Tk (usa widget.after / after_cancel).
+    Tarefas rodam na thread do Tk, em ordem de vencimento; exceções são logadas e não param a grade.
+    """
+
+    def __init__(self, widget, logger=None, monitor=None, clock: Callable[[], float] = time.time):
+        self._widget = widget
+        self.logger = logger
+        self.monitor = monitor       # perfmon.FrameMonitor (opcional)
+        self.clock = clock
+
+        self._tasks: Dict[str, Task] = {}
+        self._job = None
+        self._running = False
+        self._in_run = False
+
+    # ---- registro ----
+
+    def every(self, name: str, interval_s: float, fn: Callable[[], Any],
+              align: bool = False, run_now: bool = False) -> Task:
+        if interval_s <= 0:
+            raise ValueError(f"interval_s must be > 0 (task {name})")
+        t = Task(name=name, fn=fn, interval_s=float(interval_s), align=align)
+        now = self.clock()
+        if run_now:
+            t.next_due = now
+        elif align:
+            t.next_due = self._aligned_after(t, now)
+        else:
+            t.next_due = now + t.interval_s
+        return self._add(t)
+
+    def daily(self, name: str, hhmm: str, fn: Callable[[], Any]) -> Task:
+        t = Task(name=name, fn=fn, daily_at=hhmm)
+        t.next_due = _next_daily(hhmm, self.clock())
+        return self._add(t)
+
+    def cancel(self, name: str) -> None:
+        self._tasks.pop(name, None)
+        self._rearm()
+
+    def pause(self, name: str) -> None:
+        t = self._tasks.get(name)
+        if t is not None and not t.paused:
+            t.paused = True
+            self._rearm()
+
+    def resume(self, name: str, run_now: bool = False) -> None:
+        t = self._tasks.get(name)
+        if t is None or not t.paused:
+            return
+        t.paused = False
+        now = self.clock()
+        if run_now:
+            t.next_due = now
+        elif t.next_due <= now:
+            self._advance(t, now)   # sem rajada pelos vencimentos perdidos durante a pausa
+        self._rearm()
+
+    def set_interval(self, name: str, interval_s: float, align: Optional[bool] = None) -> None:
+        """Troca a cadência (ex.: tick 1s ↔ 60s no modo econômico); a grade recomeça a partir de agora."""
+        t = self._tasks.get(name)
+        if t is None or interval_s <= 0:
+            return
+        if t.interval_s == float(interval_s) and (align is None or align == t.align):
+            return
+        t.interval_s = float(interval_s)
+        if align is not None:
+            t.align = align
+        now = self.clock()
+        t.next_due = self._aligned_after(t, now) if t.align else now + t.interval_s
+        self._rearm()
+
+    def _rearm(self) -> None:
+        if self._running and not self._in_run:
+            self._arm()
+
+    def tasks(self) -> List[Task]:
+        return sorted(self._tasks.values(), key=lambda t: t.next_due)
+
+    def _add(self, t: Task) -> Task:
+        self._tasks[t.name] = t
+        self._rearm()
+        return t
+
+    # ---- ciclo ----
+
+    def start(self) -> None:
+        self._running = True
+        self._arm()
+
+    def stop(self) -> None:
+        self._running = False
+        self._cancel_job()
+
+    def _cancel_job(self) -> None:
+        if self._job is not None:
+            try:
+                self._widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _arm(self) -> None:
+        self._cancel_job()
+        active = [t.next_due for t in self._tasks.values() if not t.paused]
+        if not self._running or not active:
+            return
+        nxt = min(active)
+        delay_ms = int(math.ceil(max(0.0, nxt - self.clock()) * 1000.0)) + SCHED_SLACK_MS
+        self._job = self._widget.after(min(SCHED_MAX_SLEEP_MS, delay_ms), self._run)
+
+    def _run(self) -> None:
+        self._job = None
+        self._in_run = True
+        try:
+            now = self.clock()
+            due = sorted((t for t in self._tasks.values() if not t.paused and t.next_due <= now),
+                         key=lambda t: t.next_due)
+
+            if due and self.monitor is not None:
+                self.monitor.record("lag", max(0.0, (now - due[0].next_due) * 1000.0))
+
+            for t in due:
+                if self._tasks.get(t.name) is not t or t.paused:
+                    continue   # cancelada/pausada por outra tarefa neste mesmo ciclo
+                self._run_task(t)
+                self._advance(t, self.clock())
+
+            # relógio do sistema voltou → vencimentos longe demais no futuro
+            now = self.clock()
+            for t in self._tasks.values():
+                if t.paused:
+                    continue
+                horizon = t.interval_s if t.interval_s > 0 else 86400.0
+                if t.next_due - now > horizon + 1.0:
+                    self._reset(t, now)
+        finally:
+            self._in_run = False
+            if self._running:
+                self._arm()
+
+    def _run_task(self, t: Task) -> None:
+        t0 = time.perf_counter()
+        try:
+            t.fn()
+        except Exception as e:
+            t.errors += 1
+            if self.logger:
+                self.logger(f"[SCHED] Task error name={t.name} {type(e).__name__}: {e}")
+        ms = (time.perf_counter() - t0) * 1000.0
+        t.runs += 1
+        t.last_ms = ms
+        t.total_ms += ms
+        t.max_ms = max(t.max_ms, ms)
+
+        if self.monitor is not None:
+            self.monitor.record(f"task.{t.name}", ms)
+        if ms > SCHED_SLOW_TASK_MS and self.logger:
+            now = time.monotonic()
+            if now - t.last_slow_log >= SCHED_SLOW_LOG_COOLDOWN_S:
+                t.last_slow_log = now
+                self.logger(f"[SCHED] Slow task name={t.name} ms={ms:.1f}")
+
+    # ---- grade ----
+
+    @staticmethod
+    def _aligned_after(t: Task, now: float) -> float:
+        return (math.floor(now / t.interval_s) + 1) * t.interval_s
+
+    def _advance(self, t: Task, now: float) -> None:
+        if t.daily_at:
+            t.next_due = _next_daily(t.daily_at, max(now, t.next_due))
+            return
+        if t.align:
+            nxt = self._aligned_after(t, t.next_due)   # também devolve à grade quem rodou com run_now
+        else:
+            nxt = t.next_due + t.interval_s
+        if nxt <= now:
+            # atrasou mais que 1 intervalo: pula para o próximo slot da grade (sem rajada de execuções)
+            missed = int((now - nxt) // t.interval_s) + 1
+            t.skipped += missed
+            nxt += missed * t.interval_s
+        t.next_due = nxt
+
+    def _reset(self, t: Task, now: float) -> None:
+        if t.daily_at:
+            t.next_due = _next_daily(t.daily_at, now)
+        elif t.align:
+            t.next_due = self._aligned_after(t, now)
+        else:
+            t.next_due = now + t.interval_s
+        if self.logger:
+            self.logger(f"[SCHED] Clock jump detected, rescheduled name={t.name}")
+
+    # ---- relatório ----
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for t in self.tasks():
+            out[t.name] = {
+                "paused": t.paused,
+                "runs": t.runs,
+                "skipped": t.skipped,
+                "errors": t.errors,
+                "avg_ms": round(t.total_ms / t.runs, 2) if t.runs else 0.0,
+                "max_ms": round(t.max_ms, 2),
+                "next_due": t.next_due,
+            }
+        return out
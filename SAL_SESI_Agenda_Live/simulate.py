@@ -0,0 +1,181 @@
+# simulate.py
+# SAL - Simulador: avança uma semana inteira do grade.xlsx em segundos (sem Tk, relógio manual)
+# A cada passo (padrão 60s) roda o mesmo motor da UI (agenda_engine) e emite as transições:
+# - agora+/agora-   aula entrou/saiu de AGORA
+# - prox+/prox-     aula entrou/saiu de PRÓXIMAS
+# - open/closed     item de HOURS_ITEMS abriu/fechou (CLUBE, SECRETARIA, ACADEMIA)
+# - power           modo de energia (full/closed) do power.py
+# - theme           virada dia/noite
+# No fim: throughput do motor (chamadas/s, itens avaliados/s, µs por chamada p50/p95/max).
+#
+# Uso:
+#   python simulate.py                              # semana começando na segunda desta semana
+#   python simulate.py --start 2026-03-02 --days 7 --step 60
+#   python simulate.py --excel grade_grande.xlsx --quiet --json sim.json
+#   python simulate.py --events eventos.jsonl       # 1 evento JSON por linha
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import clock as clock_mod
+from agenda_engine import (
+    HOURS_ITEMS, compute_now_next, hours_status, is_day_theme, load_classes_from_excel,
+)
+from perfstats import summarize
+from power import OpeningHours, PowerPolicy
+
+
+DEFAULT_EXCEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grade.xlsx")
+
+
+def _card_key(card: Tuple) -> Tuple[str, str, str, str]:
+    """Identidade de um card: (início, fim, atividade, local)."""
+    return card[0], card[1], card[2], card[4]
+
+
+def _week_start(day: Optional[str]) -> datetime:
+    if day:
+        return datetime.fromisoformat(day)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=today.weekday())
+
+
+class Simulator:
+    """Repete o ciclo da UI (AGORA/PRÓXIMAS, horários, energia, tema) sobre um ManualClock."""
+
+    def __init__(self, items, start: datetime, step_s: float = 60.0, hours_items=HOURS_ITEMS):
+        self.items = items
+        self.step_s = float(step_s)
+        self.hours_items = hours_items
+        self.power = PowerPolicy(OpeningHours(hours_items), enabled=True)
+        self.clock = clock_mod.ManualClock(start)
+
+        self.events: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self.call_us: List[float] = []
+
+        self._now: set = set()
+        self._next: set = set()
+        self._open: Dict[str, bool] = {}
+        self._power: Optional[str] = None
+        self._day: Optional[bool] = None
+
+    def _emit(self, at: datetime, kind: str, **data) -> None:
+        ev = {"at": at.isoformat(timespec="minutes"), "kind": kind}
+        ev.update(data)
+        self.events.append(ev)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def step(self) -> None:
+        now = clock_mod.now()
+
+        t0 = time.perf_counter()
+        now_cards, next_cards, _discards = compute_now_next(self.items, now)
+        self.call_us.append((time.perf_counter() - t0) * 1e6)
+
+        cur_now = {_card_key(c) for c in now_cards}
+        cur_next = {_card_key(c) for c in next_cards}
+        for kind, old, new in (("agora", self._now, cur_now), ("prox", self._next, cur_next)):
+            for k in sorted(new - old):
+                self._emit(now, kind + "+", start=k[0], end=k[1], activity=k[2], location=k[3])
+            for k in sorted(old - new):
+                self._emit(now, kind + "-", start=k[0], end=k[1], activity=k[2], location=k[3])
+        self._now, self._next = cur_now, cur_next
+
+        for item in self.hours_items:
+            is_open = hours_status(item, now)[0]
+            if self._open.get(item["name"]) != is_open:
+                if item["name"] in self._open:
+                    self._emit(now, "open" if is_open else "closed", name=item["name"])
+                self._open[item["name"]] = is_open
+
+        mode = self.power.mode(now, True)
+        if mode != self._power:
+            if self._power is not None:
+                self._emit(now, "power", mode=mode)
+            self._power = mode
+
+        day = is_day_theme(now)
+        if day != self._day:
+            if self._day is not None:
+                self._emit(now, "theme", to="day" if day else "night")
+            self._day = day
+
+    def run(self, duration_s: float) -> Dict[str, Any]:
+        prev = clock_mod.install(self.clock)
+        try:
+            steps = int(duration_s // self.step_s) + 1
+            wall0 = time.perf_counter()
+            for _ in range(steps):
+                self.step()
+                self.clock.advance(self.step_s)
+            wall = time.perf_counter() - wall0
+        finally:
+            clock_mod.install(prev)
+
+        engine_s = sum(self.call_us) / 1e6
+        return {
+            "items": len(self.items),
+            "steps": steps,
+            "step_s": self.step_s,
+            "simulated_s": duration_s,
+            "wall_s": round(wall, 4),
+            "speedup": round(duration_s / wall, 1) if wall > 0 else None,
+            "engine_calls_per_s": round(steps / engine_s, 1) if engine_s > 0 else None,
+            "engine_items_per_s": round(steps * len(self.items) / engine_s, 1) if engine_s > 0 else None,
+            "engine_call_us": summarize(self.call_us, pcts=(50, 95, 99)),
+            "events": dict(sorted(self.counts.items())),
+        }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Simula uma semana do SAL em modo acelerado")
+    ap.add_argument("--excel", default=DEFAULT_EXCEL)
+    ap.add_argument("--start", default=None, help="YYYY-MM-DD[THH:MM] (padrão: segunda-feira desta semana)")
+    ap.add_argument("--days", type=float, default=7.0)
+    ap.add_argument("--step", type=float, default=60.0, help="passo do relógio (s)")
+    ap.add_argument("--events", default=None, help="grava os eventos em JSONL")
+    ap.add_argument("--json", default=None, help="grava o resumo em JSON")
+    ap.add_argument("--quiet", action="store_true", help="não imprime cada evento")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    items = load_classes_from_excel(args.excel)
+    load_ms = (time.perf_counter() - t0) * 1000.0
+
+    sim = Simulator(items, _week_start(args.start), step_s=args.step)
+    report = sim.run(args.days * 86400.0)
+    report["excel"] = os.path.abspath(args.excel)
+    report["excel_load_ms"] = round(load_ms, 1)
+
+    if not args.quiet:
+        for ev in sim.events:
+            extra = " ".join(f"{k}={v}" for k, v in ev.items() if k not in ("at", "kind"))
+            print(f"{ev['at']}  {ev['kind']:<7} {extra}")
+
+    if args.events:
+        with open(args.events, "w", encoding="utf-8") as f:
+            for ev in sim.events:
+                f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    c = report["engine_call_us"]
+    print(f"items={report['items']} steps={report['steps']} wall={report['wall_s']:.2f}s "
+          f"speedup={report['speedup']}x excel_load={report['excel_load_ms']:.0f}ms")
+    print(f"engine calls/s={report['engine_calls_per_s']} items/s={report['engine_items_per_s']} "
+          f"call_us p50={c.get('p50', 0):.1f} p95={c.get('p95', 0):.1f} max={c.get('max', 0):.1f}")
+    print("events " + " ".join(f"{k}={v}" for k, v in report["events"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# watchdog.py
+# SAL - Detector de travamento do loop Tk (heartbeat + faulthandler) e estado para reinício
+# Só stdlib (sem tkinter aqui: o app chama beat() numa tarefa do scheduler).
+# - beat() a cada WATCHDOG_BEAT_S rearma faulthandler.dump_traceback_later(stall_s):
+#   se o loop parar de bater (Tk preso, leitura bloqueante na thread da UI), a thread C do
+#   faulthandler grava a pilha de TODAS as threads em logs/hang.log — funciona mesmo com o GIL preso
+# - com supervisor (SAL_SUPERVISED=1, sal_supervisor.py): exit=True → o processo sai e o supervisor
+#   reinicia; sem supervisor: só o dump, e uma thread Python reexecuta o app (os.execv) quando
+#   consegue rodar depois de WATCHDOG_RESTART_FACTOR × stall_s
+# - state.json (DATA_DIR): batida + estado mínimo para o reinício voltar igual (clima exibido,
+#   mtime do Excel, modo de energia); gravado atômico a cada WATCHDOG_STATE_EVERY_S
+# - no boot seguinte: o dump do hang.log vai para o sal.log ([HANG]) e é arquivado em logs/archive
+# ✅ o supervisor também usa o state.json: sem batida por muito tempo → mata e reinicia
+#    (reconhece a execução pelo SAL_SUPERVISOR_RUN gravado no estado, não pelo PID: o .exe one-file do
+#    PyInstaller e o python.exe de venv rodam o app num processo filho)
+
+from __future__ import annotations
+
+import faulthandler
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+WATCHDOG_BEAT_S = 5.0              # tarefa "heartbeat" do scheduler
+WATCHDOG_STALL_S = 90.0            # sem batida por isso → dump das pilhas (e saída, se supervisionado)
+WATCHDOG_RESTART_FACTOR = 2.0      # sem supervisor: reexecuta após 2× o limite
+WATCHDOG_STATE_EVERY_S = 30.0      # grava o state.json no máx. a cada 30s
+WATCHDOG_EXIT_CODE = 70            # saída por travamento (o supervisor distingue de crash comum)
+WATCHDOG_DUMP_LOG_MAX_LINES = 400  # linhas do dump copiadas para o sal.log no boot seguinte
+
+ENV_SUPERVISED = "SAL_SUPERVISED"
+ENV_RESTARTS = "SAL_RESTARTS"
+ENV_RESTART_REASON = "SAL_RESTART_REASON"
+ENV_RUN_TOKEN = "SAL_SUPERVISOR_RUN"
+
+
+def supervised() -> bool:
+    return os.environ.get(ENV_SUPERVISED, "").strip() == "1"
+
+
+def relaunch_argv() -> list:
+    """Linha de comando para subir o app de novo (python sal.py ... ou o .exe do PyInstaller)."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable] + sys.argv[1:]
+    return [sys.executable] + sys.argv
+
+
+def read_state(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def write_state(path: str, data: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def collect_previous_dump(dump_path: str, archive_dir: str, logger=None) -> Optional[str]:
+    """hang.log com conteúdo → linhas [HANG] no log + arquivo movido para o archive. Retorna o destino."""
+    try:
+        if not os.path.exists(dump_path) or os.path.getsize(dump_path) == 0:
+            return None
+        with open(dump_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+        os.makedirs(archive_dir, exist_ok=True)
+        dst = os.path.join(archive_dir, time.strftime("hang_%Y%m%d_%H%M%S.log"))
+        os.replace(dump_path, dst)
+        if logger:
+            logger(f"[HANG] Previous run stalled; thread dump lines={len(lines)} archived={dst}")
+            for line in lines[:WATCHDOG_DUMP_LOG_MAX_LINES]:
+                logger(f"[HANG] {line}")
+        return dst
+    except Exception as e:
+        if logger:
+            logger(f"[HANG] Collect dump error {type(e).__name__}: {e}")
+        return None
+
+
+class HangWatchdog:
+    """
+    No app:
+        wd = HangWatchdog(dump_path, state_path, logger=log, state_fn=self._state_snapshot)
+        sched.every("heartbeat", WATCHDOG_BEAT_S, wd.beat)
+        wd.start()
+    """
+
+    def __init__(self, dump_path: str, state_path: str, logger=None,
+                 state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 stall_s: float = WATCHDOG_STALL_S,
+                 exit_on_stall: Optional[bool] = None,
+                 restart_argv: Optional[list] = None):
+        self.dump_path = dump_path
+        self.state_path = state_path
+        self.logger = logger
+        self.state_fn = state_fn
+        self.stall_s = float(stall_s)
+        self.exit_on_stall = supervised() if exit_on_stall is None else exit_on_stall
+        self.restart_argv = restart_argv or relaunch_argv()
+
+        self.beats = 0
+        self.last_beat = time.monotonic()
+        self.boot_ts = time.time()
+        self.restarts = int(os.environ.get(ENV_RESTARTS, "0") or 0)
+        self.run_token = os.environ.get(ENV_RUN_TOKEN, "")
+        self._dump_file = None
+        self._last_state = -1e9
+        self._stop = threading.Event()
+        self._th: Optional[threading.Thread] = None
+
+    def _log(self, msg: str) -> None:
+        if self.logger:
+            self.logger(msg)
+
+    def start(self) -> None:
+        try:
+            self._dump_file = open(self.dump_path, "a", encoding="utf-8")
+        except Exception as e:
+            self._log(f"[HANG] Dump file error {type(e).__name__}: {e}")
+        self.beat()
+        if not self.exit_on_stall:
+            self._th = threading.Thread(target=self._run, name="sal-watchdog", daemon=True)
+            self._th.start()
+        self._log(f"[HANG] Watchdog on stall_s={self.stall_s:.0f} supervised={self.exit_on_stall} "
+                  f"restarts={self.restarts} reason={os.environ.get(ENV_RESTART_REASON, '-')}")
+
+    def stop(self) -> None:
+        """Saída normal (Esc): desarma o dump e marca o estado como encerrado limpo."""
+        self._stop.set()
+        try:
+            faulthandler.cancel_dump_traceback_later()
+        except Exception:
+            pass
+        self._save_state(clean_exit=True)
+        if self._dump_file is not None:
+            try:
+                self._dump_file.close()
+            except Exception:
+                pass
+            self._dump_file = None
+
+    # ---- batida (thread do Tk) ----
+
+    def beat(self) -> None:
+        self.beats += 1
+        self.last_beat = time.monotonic()
+        if self._dump_file is not None:
+            try:
+                faulthandler.dump_traceback_later(self.stall_s, repeat=False, file=self._dump_file,
+                                                  exit=self.exit_on_stall)
+            except Exception as e:
+                self._log(f"[HANG] Arm error {type(e).__name__}: {e}")
+                self._dump_file = None
+        if self.last_beat - self._last_state >= WATCHDOG_STATE_EVERY_S:
+            self._last_state = self.last_beat
+            self._save_state()
+
+    def _save_state(self, clean_exit: bool = False) -> None:
+        data: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "boot_ts": round(self.boot_ts, 1),
+            "beat_ts": round(time.time(), 1),
+            "beats": self.beats,
+            "restarts": self.restarts,
+            "clean_exit": clean_exit,
+            "run": self.run_token,
+        }
+        if self.state_fn is not None:
+            try:
+                data["app"] = self.state_fn()
+            except Exception as e:
+                self._log(f"[HANG] State snapshot error {type(e).__name__}: {e}")
+        try:
+            write_state(self.state_path, data)
+        except Exception as e:
+            self._log(f"[HANG] State write error {type(e).__name__}: {e}")
+
+    # ---- sem supervisor: reexecuta quando o Python volta a rodar ----
+
+    def _run(self) -> None:
+        limit = self.stall_s * WATCHDOG_RESTART_FACTOR
+        while not self._stop.wait(min(5.0, self.stall_s / 4.0)):
+            stalled = time.monotonic() - self.last_beat
+            if stalled < limit:
+                continue
+            self._log(f"[HANG] UI loop stalled for {stalled:.0f}s → restarting (execv)")
+            try:
+                if self._dump_file is not None:
+                    faulthandler.dump_traceback(file=self._dump_file, all_threads=True)
+                    self._dump_file.flush()
+            except Exception:
+                pass
+            os.environ[ENV_RESTARTS] = str(self.restarts + 1)
+            os.environ[ENV_RESTART_REASON] = "stall"
+            try:
+                os.execv(self.restart_argv[0], self.restart_argv)
+            except Exception as e:
+                self._log(f"[HANG] execv error {type(e).__name__}: {e}")
+                os._exit(WATCHDOG_EXIT_CODE)
@@ -2,25 +2,44 @@
 # SAL - Weather module (online + cache fallback)
 # Cache gravável (preferência): %LOCALAPPDATA%/SAL_SESI_Agenda_Live/package/weather_cache.json
 # ✅ Refinamentos:
-# - Rotação/arquivo de caches antigos em package/cache_old/
-# - Limite por quantidade + idade (auto-limpeza)
+# - Histórico append-only comprimido em package/weather_history/ (weather_history.py)
+# - Retenção do histórico por bytes (segmentos rotacionados)
+# - cache_old/ legado: só limpeza (quantidade + idade), não recebe mais arquivos
 # - Escrita atômica
 # SSL robusto:
 # 1) truststore (usa certificados do Windows)
 # 2) certifi (fallback)
 # 3) default SSL
+# DNS: pré-resolução em background + último endereço bom (sem proxy)
+# Transferência: gzip + extração em fluxo só dos campos usados (forecast compacto)
+# Diagnóstico: tempos por fase de cada requisição (proxy/DNS/TCP/TLS/TTFB/corpo/JSON)
+# Providers: met.no + Open-Meteo (mesmo forecast compacto), requisição com hedge
 # Nunca trava UI – sempre cai pro cache se falhar (e sal.py chama em thread)
 
 from __future__ import annotations
 
+import codecs
+import functools
+import http.client
 import json
 import os
+import queue
+import re
+import socket
 import ssl
+import threading
 import time
+import zlib
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import urllib.request
 import urllib.error
+from urllib.parse import urlparse
+
+import clock as clock_mod
+from perfstats import RollingStats
+from weather_history import WeatherHistory, history_for
 
 
 @dataclass
@@ -38,11 +57,16 @@ class WeatherResult:
 # Cache policy (refinamentos)
 # -------------------------
 
-CACHE_ARCHIVE_DIRNAME = "cache_old"
+CACHE_ARCHIVE_DIRNAME = "cache_old"     # legado (antes do weather_history/)
 CACHE_ARCHIVE_KEEP = 10                 # mantém últimos N caches antigos
 CACHE_ARCHIVE_MAX_AGE_DAYS = 7          # apaga cache_old com mais de N dias
 CACHE_STALE_WARN_SECONDS = 6 * 3600     # (opcional) definir "velho" > 6h (UI já mostra horário)
 
+# Endpoint met.no (SAL_WEATHER_BASE_URL aponta para o stand-in local nos testes/benchmarks)
+METNO_BASE_URL = "https://api.met.no"
+METNO_FORECAST_PATH = "/weatherapi/locationforecast/2.0/compact"
+HTTP_TIMEOUT_SECONDS = 6
+
 
 def _safe_int(x: Any) -> Optional[int]:
     try:
@@ -95,48 +119,47 @@ def _cache_paths(app_dir: str) -> Tuple[str, str]:
     root = _cache_root(app_dir)
     current = os.path.join(root, "weather_cache.json")
     archive = os.path.join(root, CACHE_ARCHIVE_DIRNAME)
-    _safe_mkdir(archive)
     return current, archive
 
 
-def _archive_existing_cache(current_path: str, archive_dir: str, logger=None) -> None:
+def _history(app_dir: str, logger=None) -> WeatherHistory:
+    return history_for(_cache_root(app_dir), logger=logger)
+
+
+def _record_history(history: WeatherHistory, res: WeatherResult, forecast: Optional[Dict[str, Any]],
+                    city_label: str, logger=None, provider: str = "metno") -> None:
     """
-    Move o cache atual para cache_old com timestamp no nome, antes de gravar um novo.
-    Isso separa “cache usual” do histórico e facilita limpeza.
+    Acrescenta o fetch ao histórico (1 registro comprimido, sem cópia por arquivo).
+    Guarda o que foi exibido (resumo) + o forecast compacto (None quando veio 304).
     """
     try:
-        if not os.path.exists(current_path):
-            return
-
-        cached = _read_json(current_path) or {}
-        ts = cached.get("ts")
-        if isinstance(ts, int) and ts > 0:
-            stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(ts))
-        else:
-            stamp = time.strftime("%Y%m%d_%H%M%S")
-
-        dst = os.path.join(archive_dir, f"weather_cache_{stamp}.json")
-
-        # evita sobrescrever se já existir
-        if os.path.exists(dst):
-            dst = os.path.join(archive_dir, f"weather_cache_{stamp}_{int(time.time())}.json")
-
-        os.replace(current_path, dst)
-        if logger:
-            logger(f"[WEATHER] Archived old cache -> {dst}")
-
+        ts = res.cache_ts if isinstance(res.cache_ts, int) else int(time.time())
+        history.append(ts, {
+            "ts": ts,
+            "city": city_label,
+            "temp_c": res.temp_c,
+            "today_label": res.today_label,
+            "tomorrow_label": res.tomorrow_label,
+            "symbol_code": res.symbol_code,
+            "source": res.source,
+            "provider": provider,
+            "forecast": forecast,
+        })
     except Exception as e:
         if logger:
-            logger(f"[WEATHER] Archive cache error {type(e).__name__}: {e}")
+            logger(f"[WEATHER] History append error {type(e).__name__}: {e}")
 
 
 def _cleanup_cache_archive(archive_dir: str, logger=None) -> None:
     """
-    Limpa cache_old por:
+    Limpa o cache_old legado por:
     - idade (CACHE_ARCHIVE_MAX_AGE_DAYS)
     - quantidade (CACHE_ARCHIVE_KEEP)
     """
     try:
+        if not os.path.isdir(archive_dir):
+            return
+
         now = time.time()
         max_age = CACHE_ARCHIVE_MAX_AGE_DAYS * 86400
 
@@ -182,6 +205,12 @@ def housekeeping(app_dir: str, logger=None) -> None:
     current, archive = _cache_paths(app_dir)
     _cleanup_cache_archive(archive, logger=logger)
 
+    try:
+        _history(app_dir, logger=logger).enforce_retention()
+    except Exception as e:
+        if logger:
+            logger(f"[WEATHER] History retention error {type(e).__name__}: {e}")
+
     # também remove tmp velho se existir
     try:
         tmp = current + ".tmp"
@@ -218,7 +247,357 @@ def _ssl_context_best_effort() -> ssl.SSLContext:
     return ssl.create_default_context()
 
 
-def _build_opener(logger=None) -> urllib.request.OpenerDirector:
+# -------------------------
+# DNS cache (pré-resolução + último endereço bom)
+# -------------------------
+# Em algumas redes o DNS do api.met.no demora segundos ou falha de vez em quando.
+# - start_dns_prefetch() resolve em background a cada DNS_REFRESH_INTERVAL_SECONDS
+# - conexão sem proxy usa o cache se estiver dentro do TTL
+# - fora do TTL resolve na hora (com limite de tempo); se falhar, usa o último
+#   endereço bom (persistido em package/dns_cache.json, sobrevive a reboot)
+# Com proxy o DNS do destino é problema do proxy: o cache não é usado.
+
+DNS_CACHE_TTL_SECONDS = 300
+DNS_REFRESH_INTERVAL_SECONDS = 240
+DNS_LIVE_TIMEOUT_SECONDS = 2.5
+DNS_CACHE_FILENAME = "dns_cache.json"
+
+
+def _addrinfo_to_json(infos) -> list:
+    return [[af, st, proto, list(sa)] for af, st, proto, _canon, sa in infos]
+
+
+def _addrinfo_from_json(rows) -> list:
+    out = []
+    for row in rows or []:
+        try:
+            af, st, proto, sa = row
+            out.append((int(af), int(st), int(proto), "", tuple(sa)))
+        except Exception:
+            continue
+    return out
+
+
+class _DnsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}   # "host:port" → {"infos": [...], "ts": epoch}
+        self._path: Optional[str] = None
+
+    def attach(self, path: str) -> None:
+        """Define onde persistir e carrega os últimos endereços bons (1x)."""
+        with self._lock:
+            if self._path == path:
+                return
+            self._path = path
+            data = _read_json(path) or {}
+            for key, ent in (data.get("entries") or {}).items():
+                infos = _addrinfo_from_json(ent.get("infos"))
+                if infos and key not in self._entries:
+                    # carregado do disco: vale como último bom, não como fresco
+                    self._entries[key] = {"infos": infos, "ts": 0.0}
+
+    def _persist_locked(self) -> None:
+        if not self._path:
+            return
+        try:
+            _write_json_atomic(self._path, {"entries": {
+                k: {"infos": _addrinfo_to_json(v["infos"]), "ts": v["ts"]}
+                for k, v in self._entries.items()
+            }})
+        except Exception:
+            pass
+
+    def _store(self, key: str, infos) -> None:
+        with self._lock:
+            old = self._entries.get(key)
+            self._entries[key] = {"infos": list(infos), "ts": time.time()}
+            changed = old is None or old["infos"] != list(infos)
+            if changed:
+                self._persist_locked()
+
+    def resolve(self, host: str, port: int, timeout: Optional[float] = DNS_LIVE_TIMEOUT_SECONDS):
+        """
+        getaddrinfo com limite de tempo (roda em thread; se estourar, a thread
+        termina sozinha e ainda atualiza o cache quando o resolvedor responder).
+        """
+        key = f"{host}:{port}"
+        box: Dict[str, Any] = {}
+        done = threading.Event()
+
+        def run():
+            try:
+                infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+                if infos:
+                    self._store(key, infos)
+                box["infos"] = infos
+            except Exception as e:
+                box["error"] = e
+            finally:
+                done.set()
+
+        th = threading.Thread(target=run, name="sal-dns", daemon=True)
+        th.start()
+        if not done.wait(timeout):
+            raise socket.timeout(f"DNS timeout ({timeout}s) for {host}")
+        if "error" in box:
+            raise box["error"]
+        return box["infos"]
+
+    def lookup(self, host: str, port: int) -> Tuple[list, str]:
+        """→ (addrinfos, origem) com origem em cache | live | last_known."""
+        key = f"{host}:{port}"
+        with self._lock:
+            ent = self._entries.get(key)
+        if ent and (time.time() - ent["ts"]) < DNS_CACHE_TTL_SECONDS:
+            return list(ent["infos"]), "cache"
+        try:
+            return list(self.resolve(host, port)), "live"
+        except Exception:
+            if ent:
+                return list(ent["infos"]), "last_known"
+            raise
+
+
+_DNS = _DnsCache()
+_DNS_PREFETCH_THREAD: Optional[threading.Thread] = None
+
+
+def _url_host_port(url: str) -> Tuple[str, int]:
+    u = urlparse(url)
+    port = u.port or (443 if u.scheme == "https" else 80)
+    return u.hostname or "", port
+
+
+def start_dns_prefetch(app_dir: str, base_url: Optional[str] = None,
+                       interval: float = DNS_REFRESH_INTERVAL_SECONDS, logger=None) -> None:
+    """
+    Mantém o endereço do host de clima sempre resolvido (thread daemon, idempotente).
+    Chamado no boot do app.
+    """
+    global _DNS_PREFETCH_THREAD
+    _DNS.attach(os.path.join(_cache_root(app_dir), DNS_CACHE_FILENAME))
+    if _DNS_PREFETCH_THREAD is not None and _DNS_PREFETCH_THREAD.is_alive():
+        return
+
+    targets = []
+    for p in _provider_chain():
+        hp = _url_host_port(p.base_url(base_url))
+        if hp[0] and hp not in targets:
+            targets.append(hp)
+    if not targets:
+        return
+
+    def loop():
+        last_err: Dict[str, str] = {}
+        while True:
+            for host, port in targets:
+                t0 = time.perf_counter()
+                try:
+                    infos = _DNS.resolve(host, port, timeout=None)
+                    if logger and last_err.get(host):
+                        logger(f"[WEATHER] DNS prefetch recovered host={host} addrs={len(infos)}")
+                    last_err[host] = ""
+                except Exception as e:
+                    err = f"{type(e).__name__}: {e}"
+                    if logger and err != last_err.get(host):
+                        logger(f"[WEATHER] DNS prefetch error host={host} {err} "
+                               f"ms={(time.perf_counter() - t0) * 1000.0:.0f}")
+                    last_err[host] = err
+            time.sleep(max(5.0, interval))
+
+    _DNS_PREFETCH_THREAD = threading.Thread(target=loop, name="sal-dns-prefetch", daemon=True)
+    _DNS_PREFETCH_THREAD.start()
+    if logger:
+        logger(f"[WEATHER] DNS prefetch started hosts={[h for h, _p in targets]} "
+               f"interval={interval:.0f}s ttl={DNS_CACHE_TTL_SECONDS}s")
+
+
+# -------------------------
+# HTTP phase timings
+# -------------------------
+# Cada tentativa registra (ms): proxy (detecção), dns, connect (TCP), tunnel (CONNECT
+# no proxy), tls, ttfb (requisição enviada → cabeçalho da resposta), body, json.
+# Vai para o log como campos key=value e para uma janela móvel de percentis.
+
+HTTP_PHASES = ("proxy", "dns", "connect", "tunnel", "tls", "ttfb", "body", "json", "total")
+HTTP_PHASE_WINDOW = 50          # últimos N fetches na janela móvel
+
+_PHASE_STATS: Dict[str, RollingStats] = {p: RollingStats(HTTP_PHASE_WINDOW) for p in HTTP_PHASES}
+_PHASE_STATS_LOCK = threading.Lock()
+
+
+class _PhaseTimer:
+    """Tempos de uma tentativa + fase em andamento (para saber onde falhou)."""
+
+    def __init__(self):
+        self.ms: Dict[str, float] = {}
+        self.notes: Dict[str, str] = {}
+        self.current: Optional[str] = None
+        self._t0 = 0.0
+
+    def start(self, phase: str) -> None:
+        self.current = phase
+        self._t0 = time.perf_counter()
+
+    def stop(self) -> None:
+        if self.current is not None:
+            self.ms[self.current] = self.ms.get(self.current, 0.0) + (time.perf_counter() - self._t0) * 1000.0
+            self.current = None
+
+    def reset(self, keep_ms: Optional[Dict[str, float]] = None) -> None:
+        self.ms = dict(keep_ms or {})
+        self.notes = {}
+        self.current = None
+
+    def fields(self) -> str:
+        parts = [f"{p}_ms={self.ms[p]:.1f}" for p in HTTP_PHASES if p in self.ms]
+        parts.extend(f"{k}={v}" for k, v in self.notes.items())
+        return " ".join(parts)
+
+
+class _TimedConnectionMixin:
+    """
+    Instrumenta http.client: DNS e TCP separados (em vez de socket.create_connection),
+    CONNECT do proxy e o tempo até o primeiro byte da resposta.
+    """
+    _sal_timer: _PhaseTimer
+
+    def _sal_init(self, sal_timer: Optional[_PhaseTimer], sal_dns_cache: bool = False) -> None:
+        self._sal_timer = sal_timer or _PhaseTimer()
+        self._sal_dns_cache = sal_dns_cache
+        self._create_connection = self._sal_create_connection
+        self._sal_sent = 0.0
+
+    def _sal_create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+        host, port = address
+        t = self._sal_timer
+
+        t.start("dns")
+        if self._sal_dns_cache:
+            # só sem proxy: o host aqui é o destino final. SNI/certificado continuam
+            # usando o hostname (self.host); o cache só escolhe o endereço IP.
+            infos, src = _DNS.lookup(host, port)
+            t.notes["dns_src"] = src
+        else:
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        t.stop()
+
+        t.start("connect")
+        err: Optional[Exception] = None
+        for af, socktype, proto, _canon, sa in infos:
+            sock = None
+            try:
+                sock = socket.socket(af, socktype, proto)
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sa)
+                t.stop()
+                return sock
+            except OSError as e:
+                err = e
+                if sock is not None:
+                    sock.close()
+        raise err if err else OSError(f"getaddrinfo returned no addresses for {host}")
+
+    def _tunnel(self):
+        t = self._sal_timer
+        t.start("tunnel")
+        super()._tunnel()  # type: ignore[misc]
+        t.stop()
+
+    def request(self, *args, **kwargs):
+        super().request(*args, **kwargs)  # type: ignore[misc]
+        self._sal_sent = time.perf_counter()
+
+    def getresponse(self):
+        t = self._sal_timer
+        t.current = "ttfb"
+        t._t0 = self._sal_sent or time.perf_counter()
+        resp = super().getresponse()  # type: ignore[misc]
+        t.stop()
+        return resp
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, http.client.HTTPConnection):
+    def __init__(self, *args, sal_timer: Optional[_PhaseTimer] = None, sal_dns_cache: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sal_init(sal_timer, sal_dns_cache)
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, http.client.HTTPSConnection):
+    def __init__(self, *args, sal_timer: Optional[_PhaseTimer] = None, sal_dns_cache: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sal_init(sal_timer, sal_dns_cache)
+
+    def connect(self):
+        # igual ao HTTPSConnection.connect, com o handshake cronometrado à parte
+        http.client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host if self._tunnel_host else self.host
+        t = self._sal_timer
+        t.start("tls")
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname)
+        t.stop()
+
+
+class _TimedHTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, timer: _PhaseTimer):
+        super().__init__()
+        self.timer = timer
+
+    def http_open(self, req):
+        return self.do_open(functools.partial(_TimedHTTPConnection, sal_timer=self.timer,
+                                              sal_dns_cache=not _req_uses_proxy(req)), req)
+
+
+class _TimedHTTPSHandler(urllib.request.HTTPSHandler):
+    def __init__(self, timer: _PhaseTimer, context: ssl.SSLContext):
+        super().__init__(context=context)
+        self.timer = timer
+
+    def https_open(self, req):
+        return self.do_open(functools.partial(_TimedHTTPSConnection, sal_timer=self.timer,
+                                              sal_dns_cache=not _req_uses_proxy(req)), req,
+                            context=self._context)
+
+
+def _req_uses_proxy(req: urllib.request.Request) -> bool:
+    # http via proxy → selector vira a URL completa; https via proxy → túnel CONNECT
+    return bool(req.has_proxy() or getattr(req, "_tunnel_host", None))
+
+
+def _record_phases(timer: _PhaseTimer) -> None:
+    with _PHASE_STATS_LOCK:
+        for p, v in timer.ms.items():
+            st = _PHASE_STATS.get(p)
+            if st is not None:
+                st.add(v)
+
+
+def http_phase_summary() -> Dict[str, Dict[str, float]]:
+    """Percentis da janela móvel por fase (ms)."""
+    with _PHASE_STATS_LOCK:
+        return {p: st.summary() for p, st in _PHASE_STATS.items() if len(st)}
+
+
+def _log_phase_summary(logger) -> None:
+    summ = http_phase_summary()
+    if not summ:
+        return
+    parts = []
+    for p in HTTP_PHASES:
+        s = summ.get(p)
+        if s and s.get("n"):
+            parts.append(f"{p}={s['p50']:.0f}/{s['p95']:.0f}")
+    n = int(summ.get("total", {}).get("n", 0))
+    logger(f"[WEATHER] HTTP phases rolling n={n} p50/p95_ms " + " ".join(parts))
+
+
+def _build_opener(logger=None, timer: Optional[_PhaseTimer] = None) -> urllib.request.OpenerDirector:
+    timer = timer or _PhaseTimer()
+    timer.start("proxy")
     proxies: Dict[str, str] = {}
 
     try:
@@ -232,38 +611,124 @@ def _build_opener(logger=None) -> urllib.request.OpenerDirector:
         proxies.update({k.lower(): v for k, v in p_reg.items() if v})
     except Exception:
         pass
+    timer.stop()
 
     if logger:
         logger(f"[WEATHER] Proxies detectados: {proxies if proxies else 'nenhum'}")
 
     proxy_handler = urllib.request.ProxyHandler(proxies) if proxies else urllib.request.ProxyHandler({})
-    https_handler = urllib.request.HTTPSHandler(context=_ssl_context_best_effort())
-    return urllib.request.build_opener(proxy_handler, https_handler)
+    http_handler = _TimedHTTPHandler(timer)
+    https_handler = _TimedHTTPSHandler(timer, context=_ssl_context_best_effort())
+    return urllib.request.build_opener(proxy_handler, http_handler, https_handler)
 
 
-def _http_get_json(url: str, user_agent: str, timeout: int = 6, logger=None) -> Dict[str, Any]:
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": user_agent, "Accept": "application/json"},
-        method="GET",
-    )
+HTTP_READ_CHUNK = 16 * 1024
+
+
+class _NotModified(Exception):
+    """304 – o servidor confirmou que o dado em cache continua atual."""
 
-    opener = _build_opener(logger=logger)
+
+def _body_chunks(resp, timer: _PhaseTimer):
+    """
+    Lê o corpo em blocos e descomprime gzip em fluxo (nunca o corpo inteiro na memória).
+    Tempo de rede → "body"; descompressão conta junto do parse ("json").
+    """
+    gz = "gzip" in (resp.headers.get("Content-Encoding") or "").lower()
+    dec = zlib.decompressobj(16 + zlib.MAX_WBITS) if gz else None
+    wire = 0
+    while True:
+        timer.start("body")
+        chunk = resp.read(HTTP_READ_CHUNK)
+        timer.stop()
+        if not chunk:
+            break
+        wire += len(chunk)
+        timer.notes["wire_bytes"] = str(wire)
+        if dec is not None:
+            timer.start("json")
+            out = dec.decompress(chunk)
+            timer.stop()
+            if out:
+                yield out
+        else:
+            yield chunk
+    if dec is not None:
+        tail = dec.flush()
+        if tail:
+            yield tail
+        if not dec.eof:
+            raise ValueError("gzip body truncated")
+
+
+def _read_json_body(resp, timer: _PhaseTimer) -> Dict[str, Any]:
+    """Corpo inteiro → json.loads (para respostas pequenas / provedores genéricos)."""
+    parts = list(_body_chunks(resp, timer))
+    timer.start("json")
+    data = json.loads(b"".join(parts).decode("utf-8", errors="replace"))
+    timer.stop()
+    return data
+
+
+def _read_metno_forecast(resp, timer: _PhaseTimer) -> Dict[str, Any]:
+    """Corpo do locationforecast → forecast compacto, em fluxo (_ForecastStream)."""
+    stream = _ForecastStream()
+    text_dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in _body_chunks(resp, timer):
+        timer.start("json")
+        stream.feed(text_dec.decode(chunk))
+        timer.stop()
+    timer.start("json")
+    stream.feed(text_dec.decode(b"", final=True))
+    forecast = stream.finish()
+    timer.stop()
+    lm = resp.headers.get("Last-Modified")
+    if lm:
+        forecast["last_modified"] = lm   # get_weather tira daqui e guarda no cache
+    return forecast
+
+
+def _http_get(url: str, user_agent: str, timeout: int = 6, logger=None,
+              reader=_read_json_body, headers: Optional[Dict[str, str]] = None) -> Any:
+    """
+    GET com retry simples, tempos por fase e corpo comprimido (gzip).
+    reader(resp, timer) consome o corpo. 304 → _NotModified.
+    """
+    hdrs = {"User-Agent": user_agent, "Accept": "application/json", "Accept-Encoding": "gzip"}
+    hdrs.update(headers or {})
+    req = urllib.request.Request(url, headers=hdrs, method="GET")
+
+    timer = _PhaseTimer()
+    opener = _build_opener(logger=logger, timer=timer)
+    proxy_ms = timer.ms.get("proxy", 0.0)
 
     # retry simples (ajuda oscilação)
     last_exc: Optional[Exception] = None
     for attempt in (1, 2):
+        # cada tentativa tem seus próprios tempos (a detecção de proxy conta na 1ª)
+        timer.reset({"proxy": proxy_ms} if attempt == 1 else None)
+        t_start = time.perf_counter()
         try:
             if logger:
                 logger(f"[WEATHER] HTTP attempt {attempt} timeout={timeout}s")
             with opener.open(req, timeout=timeout) as resp:
-                raw = resp.read().decode("utf-8", errors="replace")
+                data = reader(resp, timer)
+
+                timer.ms["total"] = (time.perf_counter() - t_start) * 1000.0 + timer.ms.get("proxy", 0.0)
+                _record_phases(timer)
                 if logger:
                     status = getattr(resp, "status", None) or getattr(resp, "code", "?")
-                    logger(f"[WEATHER] HTTP {status} len={len(raw)}")
-                return json.loads(raw)
+                    enc = resp.headers.get("Content-Encoding") or "identity"
+                    logger(f"[WEATHER] HTTP {status} wire={timer.notes.get('wire_bytes', '?')} enc={enc}")
+                    logger(f"[WEATHER] HTTP phases attempt={attempt} outcome=ok {timer.fields()}")
+                    _log_phase_summary(logger)
+                return data
 
         except urllib.error.HTTPError as e:
+            if e.code == 304:
+                if logger:
+                    logger(f"[WEATHER] HTTP 304 not modified {timer.fields()}")
+                raise _NotModified() from None
             body = ""
             try:
                 body = e.read(200).decode("utf-8", errors="replace")
@@ -271,12 +736,17 @@ def _http_get_json(url: str, user_agent: str, timeout: int = 6, logger=None) ->
                 pass
             if logger:
                 logger(f"[WEATHER] HTTPError {e.code} {e.reason} body='{body}'")
+                logger(f"[WEATHER] HTTP phases attempt={attempt} outcome=http_{e.code} {timer.fields()}")
             raise
 
         except urllib.error.URLError as e:
             last_exc = e
+            failed_in = timer.current or "?"
+            timer.stop()
             if logger:
                 logger(f"[WEATHER] URLError reason={repr(getattr(e, 'reason', e))}")
+                logger(f"[WEATHER] HTTP phases attempt={attempt} outcome=error failed_in={failed_in} "
+                       f"{timer.fields()}")
             if attempt == 1:
                 time.sleep(0.4)
                 continue
@@ -284,8 +754,12 @@ def _http_get_json(url: str, user_agent: str, timeout: int = 6, logger=None) ->
 
         except Exception as e:
             last_exc = e
+            failed_in = timer.current or "?"
+            timer.stop()
             if logger:
                 logger(f"[WEATHER] Exception {type(e).__name__}: {e}")
+                logger(f"[WEATHER] HTTP phases attempt={attempt} outcome=error failed_in={failed_in} "
+                       f"{timer.fields()}")
             if attempt == 1:
                 time.sleep(0.4)
                 continue
@@ -294,6 +768,333 @@ def _http_get_json(url: str, user_agent: str, timeout: int = 6, logger=None) ->
     raise last_exc if last_exc else RuntimeError("HTTP failed")
 
 
+def _http_get_json(url: str, user_agent: str, timeout: int = 6, logger=None) -> Dict[str, Any]:
+    return _http_get(url, user_agent, timeout=timeout, logger=logger, reader=_read_json_body)
+
+
+# -------------------------
+# Forecast compacto
+# -------------------------
+# O payload do met.no tem ~90 entradas com vários campos cada; a UI usa só
+# temperatura e símbolo. O forecast compacto guarda apenas isso, em arrays:
+# {"v": 1, "updated_at": ..., "times": [...], "temp": [...], "sym1": [...], "sym6": [...]}
+# É o que vai para o cache e para o histórico.
+
+FORECAST_VERSION = 1
+
+
+def _new_forecast(updated_at: Optional[str] = None) -> Dict[str, Any]:
+    return {"v": FORECAST_VERSION, "updated_at": updated_at, "times": [], "temp": [], "sym1": [], "sym6": []}
+
+
+def _forecast_add(fc: Dict[str, Any], item: Any) -> None:
+    if not isinstance(item, dict):
+        return
+    data = item.get("data", {}) or {}
+    inst = (data.get("instant", {}) or {}).get("details", {}) or {}
+    fc["times"].append(item.get("time"))
+    fc["temp"].append(inst.get("air_temperature"))
+    fc["sym1"].append(((data.get("next_1_hours", {}) or {}).get("summary", {}) or {}).get("symbol_code"))
+    fc["sym6"].append(((data.get("next_6_hours", {}) or {}).get("summary", {}) or {}).get("symbol_code"))
+
+
+def _compact_from_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload completo (json.loads) → forecast compacto. Usado p/ cache legado e benchmarks."""
+    props = payload.get("properties", {}) or {}
+    fc = _new_forecast((props.get("meta", {}) or {}).get("updated_at"))
+    for item in props.get("timeseries", []) or []:
+        _forecast_add(fc, item)
+    return fc
+
+
+_RE_UPDATED_AT = re.compile(r'"updated_at"\s*:\s*"([^"]*)"')
+_RE_TIMESERIES = re.compile(r'"timeseries"\s*:\s*\[')
+_JSON_DECODER = json.JSONDecoder()
+_SEEK_TAIL = 64             # antes da timeseries: só o final (a chave pode estar cortada entre blocos)
+_UPDATED_AT_TAIL = 256      # janela própria para "updated_at" (idem)
+
+
+class _ForecastStream:
+    """
+    Extração em fluxo do locationforecast: acha "timeseries": [ e decodifica
+    1 entrada por vez (raw_decode), guardando só os campos do forecast compacto.
+    A árvore completa do payload nunca existe na memória; o buffer guarda no
+    máximo a entrada incompleta atual (antes da timeseries, só _SEEK_TAIL).
+    "updated_at" é procurado numa janela separada, só fora da timeseries.
+    """
+    _SEEK, _ITEMS, _DONE = 0, 1, 2
+
+    def __init__(self):
+        self.fc = _new_forecast()
+        self._buf = ""
+        self._win = ""
+        self._state = self._SEEK
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        if self._state != self._ITEMS and self.fc["updated_at"] is None:
+            self._find_updated_at(text)
+        if self._state == self._DONE:
+            return
+        self._buf += text
+        if self._state == self._SEEK:
+            m = _RE_TIMESERIES.search(self._buf)
+            if not m:
+                self._buf = self._buf[-_SEEK_TAIL:]
+                return
+            self._buf = self._buf[m.end():]
+            self._state = self._ITEMS
+        self._drain(final=False)
+
+    def _find_updated_at(self, text: str) -> None:
+        win = self._win + text
+        m = _RE_UPDATED_AT.search(win)
+        if m:
+            self.fc["updated_at"] = m.group(1)
+            self._win = ""
+        else:
+            self._win = win[-_UPDATED_AT_TAIL:]
+
+    def _drain(self, final: bool) -> None:
+        buf = self._buf
+        pos = 0
+        n = len(buf)
+        while True:
+            while pos < n and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= n:
+                break
+            if buf[pos] == "]":
+                self._state = self._DONE
+                pos += 1
+                break
+            try:
+                item, end = _JSON_DECODER.raw_decode(buf, pos)
+            except ValueError:
+                if final:
+                    raise
+                break   # entrada incompleta: espera o próximo bloco
+            _forecast_add(self.fc, item)
+            pos = end
+        self._buf = buf[pos:]
+        if self._state == self._DONE and self.fc["updated_at"] is None:
+            # meta.updated_at pode vir depois da timeseries em outro produtor
+            self._win = ""
+            self._find_updated_at(self._buf)
+
+    def finish(self) -> Dict[str, Any]:
+        if self._state == self._ITEMS:
+            self._drain(final=True)
+        if self._state != self._DONE:
+            raise ValueError("forecast stream incomplete (timeseries not closed)")
+        self._buf = ""
+        self._win = ""
+        return self.fc
+
+
+def _forecast_from_cache(cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Cache novo ("forecast") ou legado ("payload" completo)."""
+    if not cached:
+        return None
+    fc = cached.get("forecast")
+    if isinstance(fc, dict) and isinstance(fc.get("times"), list):
+        return fc
+    payload = cached.get("payload")
+    if isinstance(payload, dict):
+        return _compact_from_payload(payload)
+    return None
+
+
+# -------------------------
+# Providers (met.no + alternativas, mesmo forecast compacto)
+# -------------------------
+# Cada provider sabe montar a URL e ler a resposta como forecast compacto.
+# get_weather tenta o primeiro da lista; se ele não responder em HEDGE_DELAY_SECONDS
+# (ou falhar antes disso), dispara o próximo em paralelo e fica com quem chegar
+# primeiro com dado válido.
+# Ordem configurável: SAL_WEATHER_PROVIDERS=metno,openmeteo
+# Host por provider: SAL_WEATHER_BASE_URL_<NOME> (ou SAL_WEATHER_BASE_URL p/ todos).
+
+WEATHER_PROVIDERS = ("metno", "openmeteo")
+HEDGE_DELAY_SECONDS = 1.5
+
+
+class WeatherProvider(ABC):
+    name = "base"
+    default_base_url = ""
+    supports_conditional = False      # If-Modified-Since / 304
+
+    def base_url(self, override: Optional[str] = None) -> str:
+        return (
+            override
+            or os.environ.get(f"SAL_WEATHER_BASE_URL_{self.name.upper()}")
+            or os.environ.get("SAL_WEATHER_BASE_URL")
+            or self.default_base_url
+        ).rstrip("/")
+
+    @abstractmethod
+    def url(self, lat: float, lon: float, base_url: Optional[str] = None) -> str:
+        ...
+
+    @abstractmethod
+    def fetch(self, lat: float, lon: float, user_agent: str, timeout: float, logger=None,
+              base_url: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        ...
+
+
+class MetNoProvider(WeatherProvider):
+    name = "metno"
+    default_base_url = METNO_BASE_URL
+    supports_conditional = True
+
+    def url(self, lat: float, lon: float, base_url: Optional[str] = None) -> str:
+        return f"{self.base_url(base_url)}{METNO_FORECAST_PATH}?lat={lat:.4f}&lon={lon:.4f}"
+
+    def fetch(self, lat, lon, user_agent, timeout, logger=None, base_url=None, headers=None):
+        return _http_get(self.url(lat, lon, base_url), user_agent=user_agent, timeout=timeout,
+                         logger=logger, reader=_read_metno_forecast, headers=headers)
+
+
+# WMO weather code (Open-Meteo) → symbol_code no vocabulário do met.no
+_WMO_TO_SYMBOL = {
+    0: "clearsky_day", 1: "fair_day", 2: "partlycloudy_day", 3: "cloudy",
+    45: "fog", 48: "fog",
+    51: "lightrain", 53: "lightrain", 55: "rain", 56: "lightsleet", 57: "sleet",
+    61: "lightrain", 63: "rain", 65: "heavyrain", 66: "lightsleet", 67: "sleet",
+    71: "lightsnow", 73: "snow", 75: "heavysnow", 77: "snow",
+    80: "lightrainshowers_day", 81: "rainshowers_day", 82: "heavyrainshowers_day",
+    85: "lightsnowshowers_day", 86: "heavysnowshowers_day",
+    95: "rainandthunder", 96: "heavyrainandthunder", 99: "heavyrainandthunder",
+}
+
+
+class OpenMeteoProvider(WeatherProvider):
+    name = "openmeteo"
+    default_base_url = "https://api.open-meteo.com"
+    path = "/v1/forecast"
+
+    def url(self, lat: float, lon: float, base_url: Optional[str] = None) -> str:
+        return (
+            f"{self.base_url(base_url)}{self.path}?latitude={lat:.4f}&longitude={lon:.4f}"
+            "&hourly=temperature_2m,weather_code&forecast_days=3&timezone=UTC"
+        )
+
+    def fetch(self, lat, lon, user_agent, timeout, logger=None, base_url=None, headers=None):
+        data = _http_get(self.url(lat, lon, base_url), user_agent=user_agent, timeout=timeout,
+                         logger=logger, reader=_read_json_body)
+        return self.normalize(data)
+
+    @staticmethod
+    def normalize(data: Dict[str, Any], now_ts: Optional[float] = None) -> Dict[str, Any]:
+        hourly = data.get("hourly", {}) or {}
+        times = hourly.get("time") or []
+        temps = hourly.get("temperature_2m") or []
+        codes = hourly.get("weather_code") or hourly.get("weathercode") or []
+        if not times:
+            raise ValueError("open-meteo: hourly vazio")
+
+        # hourly começa à 00:00 UTC de hoje; o met.no começa na hora atual
+        now_s = time.strftime("%Y-%m-%dT%H:00", time.gmtime(now_ts if now_ts is not None else clock_mod.time()))
+        first = 0
+        while first < len(times) - 1 and str(times[first])[:16] < now_s:
+            first += 1
+
+        fc = _new_forecast(None)
+        for i in range(first, len(times)):
+            code = codes[i] if i < len(codes) else None
+            sym = _WMO_TO_SYMBOL.get(int(code)) if isinstance(code, (int, float)) else None
+            fc["times"].append(f"{str(times[i])[:16]}:00Z")
+            fc["temp"].append(temps[i] if i < len(temps) else None)
+            fc["sym1"].append(sym)
+            fc["sym6"].append(None)
+        return fc
+
+
+_PROVIDERS: Dict[str, WeatherProvider] = {p.name: p for p in (MetNoProvider(), OpenMeteoProvider())}
+
+
+def register_provider(provider: WeatherProvider) -> None:
+    """Extensão: adiciona/substitui um provider pelo nome."""
+    _PROVIDERS[provider.name] = provider
+
+
+def _provider_chain(names: Optional[Sequence[str]] = None) -> List[WeatherProvider]:
+    if names is None:
+        env = os.environ.get("SAL_WEATHER_PROVIDERS")
+        names = [n.strip() for n in env.split(",")] if env else list(WEATHER_PROVIDERS)
+    out = [_PROVIDERS[n] for n in names if n in _PROVIDERS]
+    return out or [_PROVIDERS["metno"]]
+
+
+def _hedged_fetch(providers: List[WeatherProvider], lat: float, lon: float, user_agent: str,
+                  timeout: float, logger=None, base_url: Optional[str] = None,
+                  headers_for=None, hedge_delay: float = HEDGE_DELAY_SECONDS) -> Tuple[Dict[str, Any], str]:
+    """
+    Requisição com hedge: dispara providers[0]; o próximo sai quando o anterior falha
+    ou não respondeu em hedge_delay. Retorna (forecast, nome) do primeiro sucesso.
+    304 conta como sucesso (forecast = {"not_modified": True}).
+    Threads perdedoras seguem em background (daemon) e o resultado é descartado.
+    """
+    results: "queue.Queue[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]" = queue.Queue()
+    t0 = time.perf_counter()
+
+    def run(p: WeatherProvider):
+        try:
+            hdrs = headers_for(p) if headers_for else None
+            try:
+                fc = p.fetch(lat, lon, user_agent, timeout, logger=logger, base_url=base_url, headers=hdrs)
+            except _NotModified:
+                fc = {"not_modified": True}
+            results.put((p.name, fc, None))
+        except Exception as e:
+            results.put((p.name, None, e))
+
+    # pior caso de 1 provider: 2 tentativas de timeout + pausa do retry
+    deadline = t0 + timeout * 2 + 1.0
+    pending = list(providers)
+    in_flight = 0
+    last_exc: Optional[Exception] = None
+
+    def launch():
+        nonlocal in_flight
+        p = pending.pop(0)
+        if logger and in_flight:
+            logger(f"[WEATHER] HEDGE start provider={p.name} "
+                   f"after_ms={(time.perf_counter() - t0) * 1000.0:.0f} in_flight={in_flight}")
+        threading.Thread(target=run, args=(p,), name=f"sal-weather-{p.name}", daemon=True).start()
+        in_flight += 1
+
+    launch()
+    while in_flight:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        wait = deadline - now
+        if pending:
+            wait = min(wait, hedge_delay)
+        try:
+            name, fc, exc = results.get(timeout=wait)
+        except queue.Empty:
+            if pending:
+                launch()     # ninguém respondeu a tempo → hedge
+            continue
+
+        in_flight -= 1
+        if exc is None and fc is not None:
+            if logger:
+                logger(f"[WEATHER] WIN provider={name} ms={(time.perf_counter() - t0) * 1000.0:.0f}")
+            return fc, name
+
+        last_exc = exc
+        if logger:
+            logger(f"[WEATHER] Provider {name} failed {type(exc).__name__}: {exc}")
+        if pending:
+            launch()         # falhou rápido → próximo sem esperar o hedge_delay
+
+    raise last_exc if last_exc else TimeoutError("weather providers: no answer before deadline")
+
+
 # -------------------------
 # Parsing / Labels
 # -------------------------
@@ -306,12 +1107,11 @@ def _pick_period(now_hour: int) -> str:
     return "noite"
 
 
-def _minmax_tomorrow(timeseries: list) -> Tuple[Optional[int], Optional[int]]:
+def _minmax_tomorrow(temps: list) -> Tuple[Optional[int], Optional[int]]:
     tmin = None
     tmax = None
-    for item in timeseries:
-        inst = item.get("data", {}).get("instant", {}).get("details", {})
-        temp = _safe_int(inst.get("air_temperature"))
+    for t in temps:
+        temp = _safe_int(t)
         if temp is None:
             continue
         tmin = temp if tmin is None else min(tmin, temp)
@@ -319,45 +1119,43 @@ def _minmax_tomorrow(timeseries: list) -> Tuple[Optional[int], Optional[int]]:
     return tmin, tmax
 
 
-def _extract_summary(payload: Dict[str, Any], now_hour: int) -> WeatherResult:
-    props = payload.get("properties", {})
-    timeseries = props.get("timeseries", [])
+def _humanize(sym: Optional[str]) -> str:
+    if not sym:
+        return "Sem dados"
+    s = sym.lower()
+    if "thunder" in s:
+        return "Tempestade"
+    if "snow" in s:
+        return "Neve"
+    if "rain" in s or "sleet" in s:
+        if "heavyrain" in s or "rainshowersandthunder" in s or "heavyrainshowers" in s:
+            return "Chuva forte"
+        if "lightrain" in s or "lightrainshowers" in s:
+            return "Chuva fraca"
+        return "Chuva"
+    if "cloudy" in s:
+        return "Parcialmente nublado" if "partly" in s else "Nublado"
+    if "clearsky" in s or "fair" in s:
+        return "Céu limpo"
+    return "Tempo instável"
+
+
+def _summary_from_forecast(fc: Dict[str, Any], now_hour: int) -> WeatherResult:
+    temps = fc.get("temp") or []
 
     temp_now = None
     symbol_code = None
 
-    if timeseries:
-        first = timeseries[0].get("data", {})
-        temp_now = _safe_int(first.get("instant", {}).get("details", {}).get("air_temperature"))
-        n1 = first.get("next_1_hours", {}).get("summary", {}).get("symbol_code")
-        n6 = first.get("next_6_hours", {}).get("summary", {}).get("symbol_code")
+    if temps:
+        temp_now = _safe_int(temps[0])
+        n1 = (fc.get("sym1") or [None])[0]
+        n6 = (fc.get("sym6") or [None])[0]
         symbol_code = n1 or n6
 
     period = _pick_period(now_hour)
+    today_label = f"Hoje ({period}): {_humanize(symbol_code)}"
 
-    def humanize(sym: Optional[str]) -> str:
-        if not sym:
-            return "Sem dados"
-        s = sym.lower()
-        if "thunder" in s:
-            return "Tempestade"
-        if "snow" in s:
-            return "Neve"
-        if "rain" in s or "sleet" in s:
-            if "heavyrain" in s or "rainshowersandthunder" in s or "heavyrainshowers" in s:
-                return "Chuva forte"
-            if "lightrain" in s or "lightrainshowers" in s:
-                return "Chuva fraca"
-            return "Chuva"
-        if "cloudy" in s:
-            return "Parcialmente nublado" if "partly" in s else "Nublado"
-        if "clearsky" in s or "fair" in s:
-            return "Céu limpo"
-        return "Tempo instável"
-
-    today_label = f"Hoje ({period}): {humanize(symbol_code)}"
-
-    tmin, tmax = _minmax_tomorrow(timeseries)
+    tmin, tmax = _minmax_tomorrow(temps)
     tomorrow_label = f"Amanhã: {tmin}–{tmax}°C" if (tmin is not None and tmax is not None) else "Amanhã: —"
 
     return WeatherResult(
@@ -371,6 +1169,11 @@ def _extract_summary(payload: Dict[str, Any], now_hour: int) -> WeatherResult:
     )
 
 
+def _extract_summary(payload: Dict[str, Any], now_hour: int) -> WeatherResult:
+    """Payload completo do met.no → WeatherResult (via forecast compacto)."""
+    return _summary_from_forecast(_compact_from_payload(payload), now_hour)
+
+
 # -------------------------
 # Public API
 # -------------------------
@@ -382,48 +1185,75 @@ def get_weather(
     app_dir: str,
     user_agent: str = "SAL-SESIAgendaLive/2.0 (contact: gui@sesi.local)",
     logger=None,
+    base_url: Optional[str] = None,
+    timeout: int = HTTP_TIMEOUT_SECONDS,
+    providers: Optional[Sequence[str]] = None,
+    hedge_delay: float = HEDGE_DELAY_SECONDS,
 ) -> WeatherResult:
     """
     Returns WeatherResult.
-    - Tries online from met.no
+    - Tries online: providers em ordem (met.no primeiro) com hedge entre eles
+    - gzip + extração em fluxo; If-Modified-Since (304 reaproveita o cache)
     - Falls back to cache
-    - ✅ rotates old cache to cache_old/ (with limits)
+    - ✅ appends each online fetch to the compressed history (weather_history/)
     """
-    current_cache_path, archive_dir = _cache_paths(app_dir)
-    now_hour = time.localtime().tm_hour
-
-    url = (
-        "https://api.met.no/weatherapi/locationforecast/2.0/compact"
-        f"?lat={lat:.4f}&lon={lon:.4f}"
-    )
+    current_cache_path, _archive_dir = _cache_paths(app_dir)
+    _DNS.attach(os.path.join(_cache_root(app_dir), DNS_CACHE_FILENAME))
+    now_hour = clock_mod.localtime().tm_hour   # hora exibida (relógio injetável)
+    chain = _provider_chain(providers)
+
+    cached = _read_json(current_cache_path)
+    cached_fc = _forecast_from_cache(cached)
+    cached_provider = (cached or {}).get("provider", "metno")
+
+    def headers_for(p: WeatherProvider) -> Dict[str, str]:
+        # 304 só vale se o cache veio deste mesmo provider/cidade
+        lm = (cached or {}).get("last_modified")
+        if (p.supports_conditional and cached_fc is not None and lm
+                and cached_provider == p.name and (cached or {}).get("city") == city_label):
+            return {"If-Modified-Since": lm}
+        return {}
 
     try:
         if logger:
-            logger(f"[WEATHER] Fetch start url={url}")
-
-        payload = _http_get_json(url, user_agent=user_agent, timeout=6, logger=logger)
-        res = _extract_summary(payload, now_hour=now_hour)
+            logger(f"[WEATHER] Fetch start providers={[p.name for p in chain]} "
+                   f"url={chain[0].url(lat, lon, base_url)}")
+
+        forecast, provider = _hedged_fetch(chain, lat, lon, user_agent, timeout, logger=logger,
+                                           base_url=base_url, headers_for=headers_for,
+                                           hedge_delay=hedge_delay)
+
+        not_modified = bool(forecast.get("not_modified"))
+        if not_modified:
+            if cached_fc is None:
+                raise RuntimeError("304 sem cache")
+            forecast = cached_fc
+            lm = (cached or {}).get("last_modified")
+        else:
+            lm = forecast.pop("last_modified", None)
 
-        # ✅ antes de escrever o novo cache, arquiva o atual
-        _archive_existing_cache(current_cache_path, archive_dir, logger=logger)
+        res = _summary_from_forecast(forecast, now_hour=now_hour)
 
-        _write_json_atomic(current_cache_path, {"ts": res.cache_ts, "payload": payload, "city": city_label})
+        _write_json_atomic(current_cache_path, {
+            "ts": res.cache_ts, "forecast": forecast, "city": city_label,
+            "provider": provider, "last_modified": lm,
+        })
 
-        # ✅ limpa histórico velho (auto-manutenção)
-        _cleanup_cache_archive(archive_dir, logger=logger)
+        # ✅ histórico append-only (retenção por bytes acontece na rotação de segmento)
+        _record_history(_history(app_dir, logger=logger), res, None if not_modified else forecast,
+                        city_label, logger=logger, provider=provider)
 
         if logger:
-            logger(f"[WEATHER] ONLINE ok temp={res.temp_c} sym={res.symbol_code} cache_path={current_cache_path}")
+            logger(f"[WEATHER] ONLINE ok provider={provider} temp={res.temp_c} sym={res.symbol_code} "
+                   f"not_modified={not_modified} cache_path={current_cache_path}")
 
         return res
 
     except Exception:
-        cached = _read_json(current_cache_path)
-        if cached and isinstance(cached.get("payload"), dict):
-            payload = cached["payload"]
-            res = _extract_summary(payload, now_hour=now_hour)
+        if cached_fc is not None:
+            res = _summary_from_forecast(cached_fc, now_hour=now_hour)
             res.source = "cache"
-            res.cache_ts = cached.get("ts")
+            res.cache_ts = cached.get("ts") if cached else None
             res.ok = True
 
             if logger:
@@ -443,3 +1273,17 @@ def get_weather(
             source="cache",
             cache_ts=None,
         )
+
+
+def weather_displayed_at(app_dir: str, ts: int) -> Optional[Dict[str, Any]]:
+    """
+    Consulta o histórico: registro vigente no instante ts (epoch).
+    Ex.: o que estava na tela às 14:00 de ontem.
+    """
+    got = _history(app_dir).at(int(ts))
+    return got[1] if got else None
+
+
+def weather_history_range(app_dir: str, ts_from: int, ts_to: int) -> list:
+    """Registros do histórico com ts em [ts_from, ts_to] (ordem crescente)."""
+    return [rec for _ts, rec in _history(app_dir).query(int(ts_from), int(ts_to))]
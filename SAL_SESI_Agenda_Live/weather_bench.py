@@ -0,0 +1,234 @@
+# weather_bench.py
+# SAL - Benchmark offline do cliente de clima (weather.py) contra o metno_standin
+# Mede, por cenário de falha:
+# - latência do get_weather (percentis)
+# - tempo até cair no cache (time-to-fallback)
+# - CPU gasta no parse (árvore completa vs extração em fluxo)
+# Cache/histórico vão para uma pasta temporária (LOCALAPPDATA redirecionado).
+#
+# Uso:
+#   python weather_bench.py                       # cenários padrão
+#   python weather_bench.py --runs 20 --json out.json
+#   python weather_bench.py --scenario 5xx --scenario latency_1s
+#   python weather_bench.py --providers metno        # sem hedge (linha de base)
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from metno_standin import (
+    FORECAST_PATH, OPENMETEO_PATH, FaultPlan, StandinServer,
+    load_recorded_payloads, parse_fault, synth_locationforecast,
+)
+from perfstats import summarize
+
+
+LAT, LON = -21.4267, -45.9470
+
+# nome → plano de falhas do met.no (cíclico, 1 passo por requisição HTTP; o cliente faz até 2 tentativas)
+# O provider alternativo (Open-Meteo) responde ok, salvo indicação em ALT_FAULTS.
+SCENARIOS: Dict[str, List[str]] = {
+    "ok": ["ok"],
+    "latency_1s": ["latency:1.0"],
+    "5xx": ["status:503"],
+    "429": ["status:429"],
+    "timeout": ["timeout"],
+    "truncated": ["truncate"],
+    "not_modified": ["304"],
+    "flaky_then_ok": ["timeout", "ok"],
+    "slow_metno": ["latency:4.0"],
+    "all_down": ["status:503"],
+}
+
+ALT_FAULTS: Dict[str, List[str]] = {
+    "all_down": ["status:503"],
+}
+
+
+def _prime_cache(base_url: str, app_dir: str, timeout: float) -> None:
+    import weather
+    weather.get_weather("Bench", LAT, LON, app_dir=app_dir, base_url=base_url, timeout=timeout,
+                        providers=["metno"])
+
+
+def bench_scenario(name: str, faults: List[str], runs: int, timeout: float,
+                   payloads: Optional[List[bytes]] = None,
+                   providers: Optional[List[str]] = None,
+                   hedge_delay: Optional[float] = None) -> Dict[str, Any]:
+    import weather
+
+    # dado "novo" a cada requisição: mede a transferência completa (304 só no cenário próprio)
+    srv = StandinServer(payloads=payloads, hang_seconds=timeout * 3 + 5, bump_last_modified=True).start()
+    app_dir = tempfile.mkdtemp(prefix="sal_wbench_")
+    os.environ["LOCALAPPDATA"] = app_dir   # cache/histórico isolados por cenário
+    try:
+        # cache válido antes dos cenários de falha (para medir o fallback)
+        _prime_cache(srv.base_url, app_dir, timeout)
+        srv.route_plans[FORECAST_PATH] = FaultPlan([parse_fault(f) for f in faults])
+        srv.route_plans[OPENMETEO_PATH] = FaultPlan([parse_fault(f) for f in ALT_FAULTS.get(name, ["ok"])])
+        kw: Dict[str, Any] = {"providers": providers}
+        if hedge_delay is not None:
+            kw["hedge_delay"] = hedge_delay
+
+        wall: List[float] = []
+        fallback: List[float] = []
+        online = 0
+        failed = 0
+        req0 = srv.requests
+
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            res = weather.get_weather("Bench", LAT, LON, app_dir=app_dir,
+                                      base_url=srv.base_url, timeout=timeout, **kw)
+            dt = (time.perf_counter() - t0) * 1000.0
+            wall.append(dt)
+            if not res.ok:
+                failed += 1
+            elif res.source == "online":
+                online += 1
+            else:
+                fallback.append(dt)
+
+        return {
+            "scenario": name,
+            "faults": faults,
+            "providers": providers,
+            "runs": runs,
+            "online": online,
+            "fallback": len(fallback),
+            "failed": failed,
+            "http_requests": srv.requests - req0,
+            "latency_ms": summarize(wall),
+            "time_to_fallback_ms": summarize(fallback),
+        }
+    finally:
+        srv.stop()
+        shutil.rmtree(app_dir, ignore_errors=True)
+
+
+def bench_parse(payload: bytes, runs: int) -> Dict[str, Any]:
+    """
+    CPU (process_time) por parse:
+    - full:   json.loads + _extract_summary (árvore completa)
+    - stream: _ForecastStream em blocos + _summary_from_forecast (caminho do get_weather)
+    """
+    import weather
+
+    cpu_full: List[float] = []
+    cpu_stream: List[float] = []
+    step = weather.HTTP_READ_CHUNK
+
+    def full_once():
+        weather._extract_summary(json.loads(payload.decode("utf-8")), now_hour=14)
+
+    def stream_once():
+        st = weather._ForecastStream()
+        for i in range(0, len(payload), step):
+            st.feed(payload[i:i + step].decode("utf-8"))
+        weather._summary_from_forecast(st.finish(), now_hour=14)
+
+    peak_full = _peak_kb(full_once)
+    peak_stream = _peak_kb(stream_once)
+
+    for _ in range(runs):
+        c0 = time.process_time()
+        full_once()
+        cpu_full.append((time.process_time() - c0) * 1000.0)
+
+        c0 = time.process_time()
+        stream_once()
+        cpu_stream.append((time.process_time() - c0) * 1000.0)
+
+    return {
+        "payload_bytes": len(payload),
+        "gzip_bytes": len(gzip.compress(payload)),
+        "runs": runs,
+        "cpu_ms": summarize(cpu_full),
+        "cpu_stream_ms": summarize(cpu_stream),
+        "peak_kb": peak_full,
+        "peak_stream_kb": peak_stream,
+    }
+
+
+def _peak_kb(fn) -> float:
+    """Pico de memória alocada (tracemalloc) durante fn()."""
+    tracemalloc.start()
+    try:
+        fn()
+        _cur, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def _fmt(s: Dict[str, Any]) -> str:
+    if not s.get("n"):
+        return "—"
+    return f"p50={s['p50']:.1f} p95={s['p95']:.1f} max={s['max']:.1f}"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark offline do cliente de clima")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--parse-runs", type=int, default=50)
+    ap.add_argument("--timeout", type=float, default=6.0, help="timeout HTTP do cliente (s)")
+    ap.add_argument("--scenario", action="append", default=[], help=f"um de {sorted(SCENARIOS)}")
+    ap.add_argument("--providers", default="metno,openmeteo",
+                    help="ordem dos providers (ex.: 'metno' mede sem hedge)")
+    ap.add_argument("--hedge-delay", type=float, default=None, help="s até disparar o próximo provider")
+    ap.add_argument("--payload-dir", default=None, help="payloads gravados (*.json)")
+    ap.add_argument("--json", default=None, help="salva o resultado em JSON")
+    args = ap.parse_args(argv)
+
+    # isola cache e evita que proxy corporativo intercepte 127.0.0.1
+    os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1,localhost"
+    saved_lad = os.environ.get("LOCALAPPDATA")
+
+    try:
+        payloads = load_recorded_payloads(args.payload_dir) if args.payload_dir else None
+        names = args.scenario or list(SCENARIOS)
+
+        providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+        results: Dict[str, Any] = {"timeout_s": args.timeout, "providers": providers, "scenarios": []}
+        for name in names:
+            if name not in SCENARIOS:
+                raise SystemExit(f"cenário desconhecido: {name}")
+            r = bench_scenario(name, SCENARIOS[name], args.runs, args.timeout, payloads,
+                               providers=providers, hedge_delay=args.hedge_delay)
+            results["scenarios"].append(r)
+            print(f"{name:<14} online={r['online']:<3} fallback={r['fallback']:<3} failed={r['failed']:<3} "
+                  f"req={r['http_requests']:<3} latency_ms[{_fmt(r['latency_ms'])}] "
+                  f"fallback_ms[{_fmt(r['time_to_fallback_ms'])}]")
+
+        if payloads:
+            sample = payloads[0]
+        else:
+            sample = json.dumps(synth_locationforecast(LAT, LON)).encode("utf-8")
+        parse = bench_parse(sample, args.parse_runs)
+        results["parse"] = parse
+        print(f"parse          bytes={parse['payload_bytes']} gzip={parse['gzip_bytes']} "
+              f"full_cpu_ms[{_fmt(parse['cpu_ms'])}] stream_cpu_ms[{_fmt(parse['cpu_stream_ms'])}] "
+              f"peak_kb full={parse['peak_kb']:.0f} stream={parse['peak_stream_kb']:.0f}")
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+        return 0
+
+    finally:
+        if saved_lad is None:
+            os.environ.pop("LOCALAPPDATA", None)
+        else:
+            os.environ["LOCALAPPDATA"] = saved_lad
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
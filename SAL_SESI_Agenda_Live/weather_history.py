@@ -0,0 +1,286 @@
+# weather_history.py
+# SAL - Histórico de clima (append-only, comprimido, segmentado)
+# Local (gravável): %LOCALAPPDATA%/SAL_SESI_Agenda_Live/package/weather_history/
+# Formato:
+# - seg_<ts>.gz  → membros gzip concatenados, 1 membro = 1 registro JSON (1 fetch)
+# - seg_<ts>.idx → linhas "ts offset length" (texto), 1 por registro
+# Cada membro gzip é independente: uma consulta abre o .idx, faz seek no offset
+# e descomprime só os registros do intervalo pedido.
+# ✅ Sem 1 arquivo por fetch (nada de listdir/stat a cada 10 min)
+# ✅ Rotação por tamanho de segmento + retenção total por bytes
+# ✅ Tolerante a queda de energia: registro sem linha no .idx é ignorado
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+HISTORY_DIRNAME = "weather_history"
+HISTORY_SEGMENT_MAX_BYTES = 512 * 1024        # fecha o segmento ao passar disso
+HISTORY_MAX_TOTAL_BYTES = 8 * 1024 * 1024     # retenção total (apaga segmentos mais antigos)
+
+_SEG_PREFIX = "seg_"
+_SEG_DATA_EXT = ".gz"
+_SEG_INDEX_EXT = ".idx"
+
+
+def _seg_key(name: str) -> Optional[int]:
+    if not (name.startswith(_SEG_PREFIX) and name.endswith(_SEG_DATA_EXT)):
+        return None
+    try:
+        return int(name[len(_SEG_PREFIX):-len(_SEG_DATA_EXT)])
+    except Exception:
+        return None
+
+
+def _read_index(path: str) -> List[Tuple[int, int, int]]:
+    """
+    Lê o .idx → [(ts, offset, length)].
+    Linhas quebradas (escrita interrompida) são ignoradas.
+    """
+    out: List[Tuple[int, int, int]] = []
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 3:
+                    continue
+                try:
+                    out.append((int(parts[0]), int(parts[1]), int(parts[2])))
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return out
+
+
+class WeatherHistory:
+    """
+    Store append-only de registros de clima indexado por timestamp (epoch, s).
+
+    - append(ts, record)     → grava 1 registro (membro gzip) no segmento ativo
+    - query(ts_from, ts_to)  → registros com ts no intervalo [ts_from, ts_to]
+    - at(ts)                 → último registro com ts <= ts ("o que mostramos às 14h de ontem?")
+    - enforce_retention()    → apaga segmentos mais antigos até caber em max_total_bytes
+    """
+
+    def __init__(self, root: str,
+                 segment_max_bytes: int = HISTORY_SEGMENT_MAX_BYTES,
+                 max_total_bytes: int = HISTORY_MAX_TOTAL_BYTES,
+                 logger=None):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._segments: Optional[List[int]] = None   # chaves (ts inicial), ordenadas
+        self._active_size = 0
+
+        try:
+            os.makedirs(root, exist_ok=True)
+        except Exception:
+            pass
+
+    # ---- paths / segment list ----
+
+    def _data_path(self, key: int) -> str:
+        return os.path.join(self.root, f"{_SEG_PREFIX}{key}{_SEG_DATA_EXT}")
+
+    def _index_path(self, key: int) -> str:
+        return os.path.join(self.root, f"{_SEG_PREFIX}{key}{_SEG_INDEX_EXT}")
+
+    def _load_segments(self) -> List[int]:
+        # listdir só 1x por processo (e após retenção), não a cada fetch
+        if self._segments is None:
+            keys = []
+            try:
+                for name in os.listdir(self.root):
+                    k = _seg_key(name)
+                    if k is not None:
+                        keys.append(k)
+            except Exception:
+                pass
+            keys.sort()
+            self._segments = keys
+            self._active_size = 0
+            if keys:
+                try:
+                    self._active_size = os.path.getsize(self._data_path(keys[-1]))
+                except Exception:
+                    self._active_size = 0
+        return self._segments
+
+    def segment_files(self) -> List[str]:
+        with self._lock:
+            return [self._data_path(k) for k in self._load_segments()]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes_locked()
+
+    def _total_bytes_locked(self) -> int:
+        total = 0
+        for k in self._load_segments():
+            for p in (self._data_path(k), self._index_path(k)):
+                try:
+                    total += os.path.getsize(p)
+                except Exception:
+                    pass
+        return total
+
+    # ---- write ----
+
+    def append(self, ts: int, record: Dict[str, Any]) -> None:
+        """
+        Grava 1 registro. ts deve ser crescente (fetches em sequência);
+        se vier fora de ordem, ainda é gravado, e query() ordena o resultado.
+        """
+        blob = gzip.compress(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            compresslevel=6,
+        )
+
+        with self._lock:
+            segs = self._load_segments()
+            rotated = False
+            if not segs or self._active_size >= self.segment_max_bytes:
+                key = int(ts)
+                if segs and key <= segs[-1]:
+                    key = segs[-1] + 1
+                segs.append(key)
+                self._active_size = 0
+                rotated = True
+
+            key = segs[-1]
+            data_path = self._data_path(key)
+
+            with open(data_path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+                f.flush()
+                try:
+                    os.fsync(f.fileno())
+                except Exception:
+                    pass
+
+            # índice só depois dos dados: se cair a energia no meio, o registro
+            # incompleto simplesmente não existe para as consultas
+            with open(self._index_path(key), "a", encoding="ascii") as f:
+                f.write(f"{int(ts)} {offset} {len(blob)}\n")
+
+            self._active_size = offset + len(blob)
+
+            if rotated:
+                if self.logger:
+                    self.logger(f"[WEATHER] History new segment {data_path}")
+                self._enforce_retention_locked()
+
+    # ---- retention ----
+
+    def enforce_retention(self) -> None:
+        with self._lock:
+            self._enforce_retention_locked()
+
+    def _enforce_retention_locked(self) -> None:
+        if self.max_total_bytes <= 0:
+            return
+        segs = self._load_segments()
+        total = self._total_bytes_locked()
+        # nunca apaga o segmento ativo
+        while total > self.max_total_bytes and len(segs) > 1:
+            key = segs.pop(0)
+            freed = 0
+            for p in (self._data_path(key), self._index_path(key)):
+                try:
+                    freed += os.path.getsize(p)
+                    os.remove(p)
+                except Exception:
+                    pass
+            total -= freed
+            if self.logger:
+                self.logger(f"[WEATHER] History pruned segment {self._data_path(key)} freed={freed}")
+
+    # ---- read ----
+
+    def _read_entries(self, key: int, entries: List[Tuple[int, int, int]]) -> List[Tuple[int, Dict[str, Any]]]:
+        out: List[Tuple[int, Dict[str, Any]]] = []
+        if not entries:
+            return out
+        try:
+            with open(self._data_path(key), "rb") as f:
+                for ts, offset, length in entries:
+                    try:
+                        f.seek(offset)
+                        blob = f.read(length)
+                        if len(blob) != length:
+                            continue
+                        rec = json.loads(gzip.decompress(blob).decode("utf-8"))
+                        if isinstance(rec, dict):
+                            out.append((ts, rec))
+                    except Exception:
+                        continue
+        except Exception:
+            pass
+        return out
+
+    def query(self, ts_from: int, ts_to: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Registros com ts_from <= ts <= ts_to, em ordem de ts."""
+        with self._lock:
+            segs = list(self._load_segments())
+
+        out: List[Tuple[int, Dict[str, Any]]] = []
+        for i, key in enumerate(segs):
+            # segmento cobre [key, próximo key); pula os que não tocam o intervalo
+            nxt = segs[i + 1] if i + 1 < len(segs) else None
+            if key > ts_to:
+                break
+            if nxt is not None and nxt <= ts_from:
+                continue
+            idx = [e for e in _read_index(self._index_path(key)) if ts_from <= e[0] <= ts_to]
+            out.extend(self._read_entries(key, idx))
+
+        out.sort(key=lambda t: t[0])
+        return out
+
+    def at(self, ts: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Último registro gravado em ou antes de ts (o que estava na tela naquele instante)."""
+        with self._lock:
+            segs = list(self._load_segments())
+
+        for key in reversed(segs):
+            if key > ts:
+                continue
+            idx = [e for e in _read_index(self._index_path(key)) if e[0] <= ts]
+            if not idx:
+                continue
+            best = max(idx, key=lambda e: e[0])
+            got = self._read_entries(key, [best])
+            if got:
+                return got[0]
+        return None
+
+    def latest(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        return self.at(int(time.time()) + 365 * 86400)
+
+
+_STORES: Dict[str, WeatherHistory] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def history_for(cache_root: str, logger=None) -> WeatherHistory:
+    """Instância única por raiz (o índice de segmentos fica em memória)."""
+    root = os.path.join(cache_root, HISTORY_DIRNAME)
+    with _STORES_LOCK:
+        st = _STORES.get(root)
+        if st is None:
+            st = WeatherHistory(root, logger=logger)
+            _STORES[root] = st
+        elif logger is not None and st.logger is None:
+            st.logger = logger
+        return st